@@ -0,0 +1 @@
+# CLI package — maintenance commands, run with `python -m app.cli.<command>`
@@ -0,0 +1,67 @@
+"""
+Pick the bcrypt cost (BCRYPT_ROUNDS) for a target hashing latency on this host.
+
+Usage:
+    python -m app.cli.calibrate_bcrypt [--target-ms 250] [--samples 5]
+
+Times one hash at each cost from --min-rounds up and recommends the
+highest cost whose median stays within the target. Run it on the machine
+the API is deployed to; existing hashes are upgraded to the new cost as
+users log in.
+"""
+import argparse
+import statistics
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.hashing import bcrypt_hash
+
+SAMPLE_PASSWORD = "calibration-password-123"
+
+
+def time_rounds(rounds: int, samples: int) -> float:
+    """Median milliseconds to hash one password at this cost"""
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt_hash(SAMPLE_PASSWORD, rounds)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, samples: int, min_rounds: int, max_rounds: int) -> Optional[int]:
+    """Highest cost within the target, or None if even min_rounds is too slow"""
+    chosen = None
+    for rounds in range(min_rounds, max_rounds + 1):
+        elapsed = time_rounds(rounds, samples)
+        fits = elapsed <= target_ms
+        print(f"  rounds={rounds:2d}  {elapsed:8.1f} ms  {'✅' if fits else '❌'}")
+        if not fits:
+            break
+        chosen = rounds
+    return chosen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250, help="acceptable time for one hash")
+    parser.add_argument("--samples", type=int, default=5, help="hashes timed per cost")
+    parser.add_argument("--min-rounds", type=int, default=10, help="never recommend less than this")
+    parser.add_argument("--max-rounds", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"Timing bcrypt against a {args.target_ms:.0f} ms target (current BCRYPT_ROUNDS={settings.BCRYPT_ROUNDS}):")
+    rounds = calibrate(args.target_ms, args.samples, args.min_rounds, args.max_rounds)
+
+    if rounds is None:
+        print(f"\n⚠️ Even {args.min_rounds} rounds exceed the target on this host")
+        rounds = args.min_rounds
+
+    print(f"\nRecommended: BCRYPT_ROUNDS={rounds}")
+    if rounds != settings.BCRYPT_ROUNDS:
+        print("Existing hashes are upgraded to the new cost on each user's next login.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Merge duplicate newsletter subscribers and build the unique email index.
+
+Usage:
+    python -m app.cli.dedupe_subscribers [--dry-run]
+
+Subscribing relies on the unique index on newsletter.email, which cannot
+be built while two subscribers share an address — something the old
+read-then-insert subscribe could leave behind under concurrent signups.
+Each group of duplicates is merged into its earliest subscriber: it keeps
+the first name given, and stays unsubscribed if any copy was unsubscribed,
+so an unsubscribe is never undone. The other copies are deleted.
+
+Safe to re-run: once there are no duplicates it only (re)creates the index.
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.models.indexes import INDEXES, apply_indexes
+
+SUBSCRIBERS = "newsletter"
+
+
+def merge(copies: list) -> dict:
+    """The $set for the surviving subscriber of a duplicate group"""
+    unsubscribed = [c for c in copies if c.get("is_active") is False]
+    update = {
+        "name": next((c["name"] for c in copies if c.get("name")), None),
+        "is_active": not unsubscribed,
+        "unsubscribed_at": max(
+            (c["unsubscribed_at"] for c in unsubscribed if c.get("unsubscribed_at")),
+            default=None,
+        ),
+    }
+    if unsubscribed and update["unsubscribed_at"] is None:
+        update["unsubscribed_at"] = datetime.now(timezone.utc)
+    return update
+
+
+async def dedupe(db, dry_run: bool = False) -> int:
+    """Merge every group of duplicates; returns how many documents were (or would be) removed"""
+    collection = db[SUBSCRIBERS]
+    groups = collection.aggregate([
+        {"$group": {"_id": "$email", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+    removed = 0
+    async for group in groups:
+        copies = await collection.find({"_id": {"$in": group["ids"]}}) \
+            .sort([("subscribed_at", 1), ("_id", 1)]).to_list(length=None)
+        keep, extra = copies[0], [c["_id"] for c in copies[1:]]
+        update = merge(copies)
+        removed += len(extra)
+        if dry_run:
+            state = "active" if update["is_active"] else "unsubscribed"
+            print(f"  would merge {len(copies)} copies of {group['_id']} into {keep['_id']} ({state})")
+            continue
+        await collection.update_one({"_id": keep["_id"]}, {"$set": update})
+        await collection.delete_many({"_id": {"$in": extra}})
+    return removed
+
+
+async def main(dry_run: bool) -> int:
+    # The index is built below, once the duplicates are gone
+    settings.MONGODB_APPLY_INDEXES = False
+    await connect_to_mongo()
+    try:
+        db = await get_database()
+        removed = await dedupe(db, dry_run)
+        print(f"{'Would remove' if dry_run else '✅ Removed'} {removed} duplicate subscribers")
+        if dry_run:
+            return 0
+        failed = await apply_indexes(db, [spec for spec in INDEXES if spec.collection == SUBSCRIBERS])
+        for spec in failed:
+            print(f"  ❌ {spec}")
+        return 1 if failed else 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="only report the duplicates")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.dry_run)))
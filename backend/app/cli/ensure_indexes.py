@@ -0,0 +1,54 @@
+"""
+Create the MongoDB indexes registered in app.models.indexes.
+
+Usage:
+    python -m app.cli.ensure_indexes [--check] [--no-apply]
+
+Safe to re-run: existing indexes are left alone. With --check, every hot
+query in HOT_QUERIES is explained afterwards and the command exits
+non-zero if any index failed to build or any hot query would scan a whole
+collection — run it in CI or before a deploy that sets
+MONGODB_APPLY_INDEXES=false.
+"""
+import argparse
+import asyncio
+import sys
+
+from app.core.config import settings
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.models.indexes import INDEXES, HOT_QUERIES, apply_indexes, check_hot_queries, explain_stages
+
+
+async def main(check: bool, apply: bool) -> int:
+    # Applied explicitly below, so failures can be reported
+    settings.MONGODB_APPLY_INDEXES = False
+    await connect_to_mongo()
+    try:
+        db = await get_database()
+        failed = []
+        if apply:
+            failed = await apply_indexes(db)
+            print(f"✅ {len(INDEXES) - len(failed)}/{len(INDEXES)} indexes in place")
+            for spec in failed:
+                print(f"  ❌ {spec}")
+        if not check:
+            return 1 if failed else 0
+
+        scans = await check_hot_queries(db)
+        for query in HOT_QUERIES:
+            stages = " → ".join(await explain_stages(db, query))
+            mark = "❌" if query.name in scans else "✅"
+            print(f"  {mark} {query.name:<22} {query.collection:<24} {stages}")
+        if scans:
+            print(f"❌ {len(scans)} hot queries fall back to COLLSCAN")
+        return 1 if failed or scans else 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="explain the hot queries and fail on collection scans")
+    parser.add_argument("--no-apply", dest="apply", action="store_false", help="only run the check")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.check, args.apply)))
@@ -0,0 +1,101 @@
+"""
+Move embedded chat_sessions.messages arrays into chat_message_buckets.
+
+Usage:
+    python -m app.cli.migrate_chat_buckets [--dry-run] [--limit N]
+
+Safe to re-run: already-bucketed sessions are skipped, and a session that
+receives new messages while it is being migrated is left embedded and
+picked up on the next run.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.services import chat_store
+
+
+async def migrate_session(db, session: dict, dry_run: bool = False) -> bool:
+    session_id = session["session_id"]
+    messages = session.get("messages", [])
+    buckets = chat_store.split_into_buckets(0, messages)
+
+    if dry_run:
+        print(f"  would migrate {session_id}: {len(messages)} messages → {len(buckets)} buckets")
+        return True
+
+    now = datetime.now(timezone.utc)
+    # Clear leftovers from an interrupted earlier run before writing
+    await db[chat_store.BUCKETS].delete_many({"session_id": session_id})
+    if buckets:
+        await db[chat_store.BUCKETS].insert_many([
+            {
+                "session_id": session_id,
+                "seq": seq,
+                "count": len(chunk),
+                "messages": chunk,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for seq, chunk in buckets
+        ])
+
+    # Only flip the layout if no message was pushed in the meantime
+    result = await db[chat_store.SESSIONS].update_one(
+        {
+            "_id": session["_id"],
+            "storage": {"$ne": chat_store.STORAGE_BUCKETED},
+            "messages": {"$size": len(messages)},
+        },
+        {
+            "$set": {
+                "storage": chat_store.STORAGE_BUCKETED,
+                "message_count": len(messages),
+                "updated_at": now,
+            },
+            "$unset": {"messages": ""},
+        }
+    )
+    if result.modified_count == 0:
+        await db[chat_store.BUCKETS].delete_many({"session_id": session_id})
+        print(f"  skipped {session_id}: changed during migration, re-run to retry")
+        return False
+
+    print(f"  migrated {session_id}: {len(messages)} messages → {len(buckets)} buckets")
+    return True
+
+
+async def main(dry_run: bool, limit: int) -> None:
+    await connect_to_mongo()
+    try:
+        db = await get_database()
+
+        cursor = db[chat_store.SESSIONS].find(
+            {"storage": {"$ne": chat_store.STORAGE_BUCKETED}}
+        )
+        if limit:
+            cursor = cursor.limit(limit)
+
+        migrated = skipped = 0
+        async for session in cursor:
+            if await migrate_session(db, session, dry_run=dry_run):
+                migrated += 1
+            else:
+                skipped += 1
+
+        print(f"✅ Done — {migrated} migrated, {skipped} skipped "
+              f"(bucket size {settings.CHAT_BUCKET_SIZE})")
+        if settings.CHAT_STORAGE_MODE != chat_store.STORAGE_BUCKETED:
+            print("💡 Set CHAT_STORAGE_MODE=bucketed so new sessions use buckets too")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report what would be migrated")
+    parser.add_argument("--limit", type=int, default=0, help="migrate at most N sessions")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run, args.limit))
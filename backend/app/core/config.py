@@ -1,5 +1,6 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 from dotenv import load_dotenv
 
 # Load .env file
@@ -13,14 +14,36 @@ class Settings(BaseSettings):
 
     MONGODB_URL: str
     MONGODB_DB_NAME: str = "dph_db"
+    # Create the indexes registered in app.models.indexes on connect;
+    # turn off to manage them with `python -m app.cli.ensure_indexes` instead
+    MONGODB_APPLY_INDEXES: bool = True
 
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Stateless mode: access tokens carry active/admin/token-version claims and
+    # are authorized without MongoDB, checked against an in-memory revocation
+    # list refreshed every AUTH_REVOCATION_REFRESH_SECONDS
+    AUTH_STATELESS_TOKENS: bool = False
+    AUTH_REVOCATION_REFRESH_SECONDS: float = 5
+
+    # Password hashing — bcrypt cost (see python -m app.cli.calibrate_bcrypt)
+    # and the thread pool that keeps it off the event loop
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 100
+
+    # Cache of authenticated users — invalidated on profile changes in this
+    # process, so the TTL bounds how stale other workers can be
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-3.5-turbo"
+    # Point at an OpenAI-compatible server, e.g. benchmarks.mock_llm for load tests
+    OPENAI_BASE_URL: Optional[str] = None
 
     LOLA_SYSTEM_PROMPT: str = (
         "You are Lola, a friendly and professional AI assistant for Deutsche Philips Holdings (DPH), "
@@ -33,6 +56,56 @@ class Settings(BaseSettings):
         "If you don't know something specific, direct the user to contact DPH directly."
     )
 
+    # Lola context window — only the most recent messages are sent upstream
+    LOLA_CONTEXT_MAX_MESSAGES: int = 20
+    LOLA_CONTEXT_TOKEN_BUDGET: int = 2000
+
+    # Background compaction — older turns of long sessions are folded into a
+    # rolling summary that is sent in place of them
+    CHAT_COMPACT_ENABLED: bool = True
+    CHAT_COMPACT_TRIGGER_MESSAGES: int = 16  # unsummarized messages that trigger a compaction
+    CHAT_COMPACT_TRIGGER_TOKENS: int = 1500  # ...or unsummarized tokens in the context window
+    CHAT_COMPACT_KEEP_RECENT: int = 6  # newest messages always left out of the summary
+    CHAT_SUMMARY_MAX_TOKENS: int = 300
+    CHAT_SUMMARY_PROMPT: str = (
+        "You maintain a running summary of a conversation between a website visitor and Lola, "
+        "the assistant of Deutsche Philips Holdings (DPH). "
+        "Update the summary with the new messages. Keep the visitor's name, goals, questions, "
+        "stated facts and any answers or contacts Lola gave. "
+        "Write at most a short paragraph, in the third person."
+    )
+
+    # Chat message storage — "embedded" (messages array on the session document)
+    # or "bucketed" (fixed-size bucket documents in chat_message_buckets)
+    CHAT_STORAGE_MODE: str = "embedded"
+    CHAT_BUCKET_SIZE: int = 100
+
+    # Write-behind persistence of chat messages (false = write on every turn)
+    CHAT_WRITE_BEHIND: bool = True
+    CHAT_WRITE_FLUSH_INTERVAL_MS: int = 250
+    CHAT_WRITE_FLUSH_SIZE: int = 200
+    CHAT_WRITE_MAX_PENDING: int = 10000
+
+    # In-memory LRU of recently active chat sessions (estimated bytes)
+    SESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # WebSocket chunk coalescing — opt-in per connection with "coalesce": true
+    WS_COALESCE_MAX_CHARS: int = 64
+    WS_COALESCE_WINDOW_MS: int = 30
+
+    # Admission control for OpenAI calls — shared by every chat connection
+    LLM_MAX_CONCURRENCY: int = 20
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_TOKENS_PER_MINUTE: int = 60000
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 20
+
+    # Cache of Lola answers to repeated questions
+    LOLA_CACHE_ENABLED: bool = True
+    LOLA_CACHE_MAX_ENTRIES: int = 500
+    LOLA_CACHE_TTL_SECONDS: int = 86400
+    LOLA_CACHE_CONTEXT_MESSAGES: int = 1  # preceding messages that are part of the key
+    LOLA_CACHE_REPLAY_CHARS_PER_SEC: int = 400
+
     # SMTP Email Settings
     SMTP_HOST: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
@@ -40,6 +113,51 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = ""
     SMTP_FROM_EMAIL: str = "info@deutschepartners.com"
     SMTP_NOTIFY_EMAIL: str = "info@deutschepartners.com"
+    SMTP_USE_TLS: bool = True  # STARTTLS — off only for local sinks (benchmarks.smtp_sink)
+    SMTP_TIMEOUT_SECONDS: float = 10
+
+    # Pooled mail transport — persistent connections shared by every sender
+    SMTP_POOL_SIZE: int = 2
+    SMTP_KEEPALIVE_SECONDS: float = 60  # NOOP on idle connections this often
+    SMTP_IDLE_TIMEOUT_SECONDS: float = 240  # then close them after this long unused
+    MAIL_QUEUE_MAX: int = 1000
+    MAIL_MAX_ATTEMPTS: int = 3
+
+    # Admin notification digests — contact and consultation submissions are
+    # batched into one email per window (or per N items); urgent ones still
+    # go out immediately
+    NOTIFY_DIGEST_ENABLED: bool = False
+    NOTIFY_DIGEST_WINDOW_SECONDS: int = 300
+    NOTIFY_DIGEST_MAX_ITEMS: int = 50
+    NOTIFY_URGENT_KEYWORDS: List[str] = ["urgent", "asap", "emergency", "complaint", "fraud"]
+
+    # Admin lists
+    ADMIN_PAGE_SIZE: int = 50
+    ADMIN_PAGE_MAX: int = 200
+    # Rows fetched per round trip by the CSV / NDJSON exports
+    EXPORT_BATCH_SIZE: int = 1000
+    # CSV subscriber import — upserts per bulk_write, and how many problem rows the report lists
+    SUBSCRIBER_IMPORT_BATCH_SIZE: int = 1000
+    SUBSCRIBER_IMPORT_MAX_ERRORS: int = 1000
+    COUNTERS_CACHE_TTL_SECONDS: float = 10
+    COUNTERS_RECONCILE_SECONDS: int = 600
+
+    # Public articles
+    ARTICLE_SNAPSHOT_ENABLED: bool = True
+    # Other workers' article edits reach this worker's snapshot within this
+    ARTICLE_SNAPSHOT_REFRESH_SECONDS: int = 60
+    ARTICLES_CACHE_CONTROL: str = "public, max-age=60, stale-while-revalidate=300"
+    # Where the search index is saved between restarts; empty to rebuild on every start
+    ARTICLE_SEARCH_SNAPSHOT_PATH: str = "data/article_search.json.gz"
+
+    # Newsletter campaigns
+    NEWSLETTER_SENDS_PER_SECOND: float = Field(10, gt=0)  # stay under the SMTP provider's sending limit
+    NEWSLETTER_BATCH_SIZE: int = 100  # recipients claimed and checkpointed together
+    # Tries per recipient across runs; failed deliveries are retried at the end of each run and on resume
+    NEWSLETTER_DELIVERY_ATTEMPTS: int = 3
+    NEWSLETTER_UNSUBSCRIBE_URL: str = "https://dph-website-qeq8.vercel.app/unsubscribe?email={email}"
+    # Signups accepted per POST /newsletter/subscribe/batch
+    NEWSLETTER_SUBSCRIBE_BATCH_MAX: int = 500
 
     ALLOWED_ORIGINS: List[str] = [
         "http://localhost:5173",
@@ -2,8 +2,11 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from bson import ObjectId
 
-from app.core.security import decode_token
+from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.core.revocation import revocations
 from app.db.mongodb import get_database
+from app.models.user import user_helper
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -15,7 +18,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    payload = decode_token(token)
+    # Decoded tokens and their users are cached — see PrincipalCache
+    payload, fp = principal_cache.decode(token)
     if payload is None:
         raise credentials_exception
 
@@ -23,6 +27,17 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     if user_id is None:
         raise credentials_exception
 
+    # Stateless mode trusts the token's claims unless the user's tokens were revoked;
+    # tokens issued before the claims existed fall through to the lookup below
+    if settings.AUTH_STATELESS_TOKENS and "ver" in payload:
+        if revocations.is_revoked(user_id, payload["ver"]):
+            raise credentials_exception
+        return principal_from_claims(payload)
+
+    cached = principal_cache.get(user_id, fp)
+    if cached is not None:
+        return cached
+
     db = await get_database()
     try:
         # ✅ ObjectId fix — this was the bug in the original file
@@ -33,7 +48,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     if user is None:
         raise credentials_exception
 
-    return user
+    # Same shape as the profile endpoints return — never the password hash
+    principal = user_helper(user)
+    principal_cache.put(user_id, fp, principal)
+    return principal
+
+
+def principal_from_claims(payload: dict) -> dict:
+    return {
+        "id": payload["sub"],
+        "is_active": payload.get("active", True),
+        "is_admin": payload.get("admin", False),
+        "token_version": payload["ver"],
+    }
 
 
 async def get_current_active_user(current_user=Depends(get_current_user)):
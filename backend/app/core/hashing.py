@@ -0,0 +1,130 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+import bcrypt
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+# bcrypt only uses the first 72 bytes; bcrypt>=5 raises instead of truncating
+BCRYPT_MAX_BYTES = 72
+
+
+class HashingBusy(Exception):
+    """Raised when PASSWORD_HASH_MAX_QUEUE hashing jobs are already waiting"""
+
+
+def _secret(plain_password: str) -> bytes:
+    return plain_password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash ("$2b$12$..." → 12), or None if unreadable"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def bcrypt_hash(plain_password: str, rounds: int) -> str:
+    return bcrypt.hashpw(_secret(plain_password), bcrypt.gensalt(rounds)).decode("ascii")
+
+
+def bcrypt_verify(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return bcrypt.checkpw(_secret(plain_password), hashed_password.encode("ascii"))
+    except ValueError:
+        # Malformed hash in the database
+        return False
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so PASSWORD_HASH_WORKERS threads
+    hash in parallel. At most that many jobs run at once; further callers
+    wait in line, and once PASSWORD_HASH_MAX_QUEUE are waiting new ones get
+    HashingBusy instead of piling up.
+    """
+
+    def __init__(
+        self,
+        rounds: Optional[int] = None,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+    ):
+        self.rounds = rounds or settings.BCRYPT_ROUNDS
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_queue = max_queue or settings.PASSWORD_HASH_MAX_QUEUE
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = asyncio.Semaphore(self.workers)
+        self._waiting = 0
+
+    # ─── POOL ────────────────────────────────────────────────────────────────
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self._waiting >= self.max_queue:
+            metrics.inc("password_hash.rejected")
+            raise HashingBusy()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+        queued_at = time.monotonic()
+        self._waiting += 1
+        metrics.set_gauge("password_hash.queue_depth", self._waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+            metrics.set_gauge("password_hash.queue_depth", self._waiting)
+
+        started = time.monotonic()
+        metrics.inc("password_hash.queue_wait_ms", (started - queued_at) * 1000)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._slots.release()
+            metrics.inc("password_hash.jobs")
+            metrics.inc("password_hash.busy_ms", (time.monotonic() - started) * 1000)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    # ─── OPERATIONS ──────────────────────────────────────────────────────────
+
+    def needs_update(self, hashed_password: str) -> bool:
+        return hash_rounds(hashed_password) != self.rounds
+
+    async def hash(self, plain_password: str) -> str:
+        return await self._run(bcrypt_hash, plain_password, self.rounds)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(bcrypt_verify, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and, if its hash uses a different cost than
+        BCRYPT_ROUNDS, rehash it in the same pool job.
+
+        Returns:
+            (valid, new hash to store or None)
+        """
+        return await self._run(self._verify_and_update, plain_password, hashed_password)
+
+    def _verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        if not bcrypt_verify(plain_password, hashed_password):
+            return False, None
+        if not self.needs_update(hashed_password):
+            return True, None
+        return True, bcrypt_hash(plain_password, self.rounds)
+
+
+password_hasher = PasswordHasher()
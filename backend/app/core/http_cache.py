@@ -0,0 +1,64 @@
+"""
+Conditional GET support for cacheable JSON responses.
+
+A Representation is a response body rendered once together with its
+validators: a strong ETag (a hash of the exact bytes, so every worker
+computes the same one) and a Last-Modified time. conditional_response()
+answers 304 Not Modified when the browser or CDN already holds that body.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.core.metrics import metrics
+
+
+class Representation:
+    __slots__ = ("body", "etag", "last_modified")
+
+    def __init__(self, body: bytes, last_modified: Optional[datetime] = None):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        if last_modified is not None:
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            # HTTP dates have whole-second precision
+            last_modified = last_modified.replace(microsecond=0)
+        self.last_modified = last_modified
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def is_not_modified(request: Request, representation: Representation) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when an ETag was sent (RFC 9110 §13.1.3)
+        return _etag_matches(if_none_match, representation.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and representation.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return representation.last_modified <= since
+    return False
+
+
+def conditional_response(request: Request, representation: Representation, cache_control: str) -> Response:
+    """200 with the body, or an empty 304 if the client's copy is current"""
+    headers = {"ETag": representation.etag, "Cache-Control": cache_control}
+    if representation.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(representation.last_modified, usegmt=True)
+    if is_not_modified(request, representation):
+        metrics.inc("http.not_modified")
+        return Response(status_code=304, headers=headers)
+    return Response(content=representation.body, media_type="application/json", headers=headers)
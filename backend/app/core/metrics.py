@@ -0,0 +1,46 @@
+import threading
+from collections import defaultdict
+from typing import Callable, Dict
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry.
+    Counters only ever go up; gauges hold the latest value; derived values
+    are computed from the other two whenever a snapshot is taken.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._derived: Dict[str, Callable[["Metrics"], float]] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, self._gauges.get(name, 0))
+
+    def derive(self, name: str, fn: Callable[["Metrics"], float]) -> None:
+        self._derived[name] = fn
+
+    def ratio(self, numerator: str, denominator: str) -> float:
+        total = self.get(denominator)
+        return round(self.get(numerator) / total, 4) if total else 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        derived = {name: fn(self) for name, fn in self._derived.items()}
+        return {"counters": counters, "gauges": gauges, "derived": derived}
+
+
+metrics = Metrics()
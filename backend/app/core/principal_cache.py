@@ -0,0 +1,114 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.security import decode_token
+
+metrics.derive("principal_cache.hit_ratio", lambda m: m.ratio("principal_cache.hits", "principal_cache.lookups"))
+
+
+def fingerprint(token: str) -> str:
+    """Stable short digest of a bearer token, so raw tokens are never kept as keys"""
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+class PrincipalCache:
+    """
+    Bounded LRU of decoded tokens and the users they authenticate.
+
+    Decoded tokens are kept until they expire. Users are keyed by the
+    token's "sub" claim plus its fingerprint and kept for
+    PRINCIPAL_CACHE_TTL_SECONDS, so a request with a known token is
+    authenticated without MongoDB.
+
+    invalidate() drops every cached entry of a user; it only reaches this
+    process, so the TTL bounds how long other workers may serve a stale user.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[int] = None):
+        self.max_entries = max_entries or settings.PRINCIPAL_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.PRINCIPAL_CACHE_TTL_SECONDS
+        self._tokens: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()  # fingerprint → (payload, expires_at)
+        self._principals: "OrderedDict[Tuple[str, str], Tuple[dict, float]]" = OrderedDict()  # (sub, fingerprint) → (user, expires_at)
+        self._by_sub: Dict[str, Set[str]] = {}
+
+    # ─── TOKENS ──────────────────────────────────────────────────────────────
+
+    def decode(self, token: str) -> Tuple[Optional[dict], str]:
+        """Return (payload or None if invalid, fingerprint) for a bearer token"""
+        fp = fingerprint(token)
+        entry = self._tokens.get(fp)
+        if entry is not None:
+            if entry[1] > time.time():
+                self._tokens.move_to_end(fp)
+                metrics.inc("principal_cache.token_hits")
+                return entry[0], fp
+            del self._tokens[fp]
+
+        payload = decode_token(token)
+        if payload is not None:
+            self._tokens[fp] = (payload, payload.get("exp", time.time() + self.ttl))
+            while len(self._tokens) > self.max_entries:
+                self._tokens.popitem(last=False)
+        return payload, fp
+
+    # ─── PRINCIPALS ──────────────────────────────────────────────────────────
+
+    def get(self, sub: str, fp: str) -> Optional[dict]:
+        metrics.inc("principal_cache.lookups")
+        key = (sub, fp)
+        entry = self._principals.get(key)
+        if entry is not None and entry[1] <= time.monotonic():
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            metrics.inc("principal_cache.misses")
+            return None
+
+        self._principals.move_to_end(key)
+        metrics.inc("principal_cache.hits")
+        return entry[0]
+
+    def get_user(self, sub: str) -> Optional[dict]:
+        """Any fresh cached copy of a user, whichever token it came with"""
+        now = time.monotonic()
+        for fp in self._by_sub.get(sub, ()):
+            entry = self._principals.get((sub, fp))
+            if entry is not None and entry[1] > now:
+                return entry[0]
+        return None
+
+    def put(self, sub: str, fp: str, user: dict) -> None:
+        key = (sub, fp)
+        self._principals[key] = (user, time.monotonic() + self.ttl)
+        self._principals.move_to_end(key)
+        self._by_sub.setdefault(sub, set()).add(fp)
+        while len(self._principals) > self.max_entries:
+            self._remove(next(iter(self._principals)))
+            metrics.inc("principal_cache.evictions")
+        metrics.set_gauge("principal_cache.entries", len(self._principals))
+
+    def put_user(self, sub: str, user: dict) -> None:
+        """Cache a user loaded without a token at hand (see get_user)"""
+        self.put(sub, "", user)
+
+    def invalidate(self, sub: str) -> None:
+        """Forget a user after their profile or status changed"""
+        for fp in self._by_sub.pop(sub, set()):
+            self._principals.pop((sub, fp), None)
+        metrics.set_gauge("principal_cache.entries", len(self._principals))
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        self._principals.pop(key, None)
+        fps = self._by_sub.get(key[0])
+        if fps is not None:
+            fps.discard(key[1])
+            if not fps:
+                del self._by_sub[key[0]]
+
+
+principal_cache = PrincipalCache()
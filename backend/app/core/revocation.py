@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "token_revocations"
+
+# Re-read this far back on each refresh, so a revocation written by a worker
+# whose clock lags slightly behind ours is still picked up
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class RevocationList:
+    """
+    In-memory list of revoked access tokens for stateless mode.
+
+    Revoking a user bumps users.token_version and records the new version in
+    token_revocations; tokens whose "ver" claim is older are rejected. Only
+    revocations younger than ACCESS_TOKEN_EXPIRE_MINUTES matter — every
+    token issued before them has expired since — so the list stays small,
+    and a TTL index removes old entries from MongoDB too.
+
+    Each worker reads new revocations every AUTH_REVOCATION_REFRESH_SECONDS;
+    revocations made by this worker apply immediately.
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        self.refresh_interval = refresh_interval or settings.AUTH_REVOCATION_REFRESH_SECONDS
+        # user_id → (oldest token version still valid, when it was revoked)
+        self._entries: Dict[str, tuple] = {}
+        self._synced_until: Optional[datetime] = None
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def lifetime(self) -> timedelta:
+        return timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    # ─── CHECKS ──────────────────────────────────────────────────────────────
+
+    def is_revoked(self, user_id: str, token_version: int) -> bool:
+        entry = self._entries.get(user_id)
+        return entry is not None and token_version < entry[0]
+
+    def _apply(self, user_id: str, min_version: int, revoked_at: datetime) -> None:
+        current = self._entries.get(user_id)
+        if current is None or min_version > current[0]:
+            self._entries[user_id] = (min_version, _aware(revoked_at))
+        metrics.set_gauge("auth.revocations", len(self._entries))
+
+    # ─── REVOKING ────────────────────────────────────────────────────────────
+
+    async def revoke(self, db: AsyncIOMotorDatabase, user_id: str, reason: str) -> Optional[int]:
+        """Invalidate every token issued to a user so far; returns the new token version"""
+        user = await db["users"].find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$inc": {"token_version": 1}},
+            projection={"token_version": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if user is None:
+            return None
+
+        now = datetime.now(timezone.utc)
+        version = user["token_version"]
+        await db[COLLECTION].insert_one({
+            "user_id": user_id,
+            "min_version": version,
+            "reason": reason,
+            "created_at": now,
+            "expires_at": now + self.lifetime,
+        })
+        self._apply(user_id, version, now)
+        metrics.inc("auth.revoked")
+        return version
+
+    # ─── SYNC ────────────────────────────────────────────────────────────────
+
+    async def refresh(self) -> int:
+        """Apply revocations recorded since the last refresh; returns how many were read"""
+        if self._db is None:
+            return 0
+        now = datetime.now(timezone.utc)
+        query = {"expires_at": {"$gt": now}}
+        if self._synced_until is not None:
+            query["created_at"] = {"$gte": self._synced_until - REFRESH_OVERLAP}
+
+        read = 0
+        newest = self._synced_until
+        cursor = self._db[COLLECTION].find(
+            query, {"_id": 0, "user_id": 1, "min_version": 1, "created_at": 1}
+        )
+        async for doc in cursor:
+            read += 1
+            created_at = _aware(doc["created_at"])
+            self._apply(doc["user_id"], doc["min_version"], created_at)
+            if newest is None or created_at > newest:
+                newest = created_at
+        self._synced_until = newest or now
+
+        # Tokens older than the newest revocation of a user have all expired
+        cutoff = now - self.lifetime
+        for user_id in [u for u, (_, revoked_at) in self._entries.items() if revoked_at < cutoff]:
+            del self._entries[user_id]
+        metrics.set_gauge("auth.revocations", len(self._entries))
+        metrics.inc("auth.revocation_refreshes")
+        return read
+
+    async def load(self, db: AsyncIOMotorDatabase) -> None:
+        """Attach to MongoDB and read every revocation still in force"""
+        self._db = db
+        try:
+            count = await self.refresh()
+            logger.info(f"✅ Loaded {count} token revocations")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load token revocations: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"⚠️ Token revocation refresh failed: {e}")
+
+
+revocations = RevocationList()
@@ -2,6 +2,7 @@
 import motor.motor_asyncio
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from app.core.config import settings
+from app.models.indexes import apply_indexes
 import certifi
 import logging
 from typing import Optional
@@ -48,6 +49,9 @@ async def connect_to_mongo():
         # Set database
         mongodb.database = mongodb.client[settings.MONGODB_DB_NAME]
 
+        if settings.MONGODB_APPLY_INDEXES:
+            await apply_indexes(mongodb.database)
+
         logger.info(f"✅ Successfully connected to MongoDB → {settings.MONGODB_DB_NAME}")
 
     except Exception as e:
@@ -0,0 +1,142 @@
+"""
+Keyset pagination for newest-first listings.
+
+Pages are ordered by (key, _id) descending and continue from an opaque
+cursor naming the last row of the previous page, so every page is an index
+range scan of `limit` rows — page 1000 costs the same as page 1, unlike
+skip(). Each paginated collection needs a matching (key: -1, _id: -1) index.
+"""
+import base64
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# A decoded cursor: the last row's sort key (None if it had none) and _id
+Position = Tuple[Optional[datetime], ObjectId]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value: Optional[datetime], _id: ObjectId) -> str:
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    ms = round(value.timestamp() * 1000) if value is not None else None
+    raw = json.dumps({"t": ms, "id": str(_id)}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Position:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        value = datetime.fromtimestamp(data["t"] / 1000, tz=timezone.utc) if data["t"] is not None else None
+        return value, ObjectId(data["id"])
+    except (ValueError, TypeError, KeyError, InvalidId) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def cursor_for(doc: dict, key: str = "created_at") -> str:
+    return encode_cursor(doc.get(key), doc["_id"])
+
+
+def after_filter(after: Position, key: str = "created_at") -> dict:
+    """Rows that come after `after` in (key, _id) descending order"""
+    value, _id = after
+    if value is None:
+        # Rows without the key sort last; only those with a lower _id remain
+        return {key: None, "_id": {"$lt": _id}}
+    return {"$or": [
+        {key: {"$lt": value}},
+        {key: value, "_id": {"$lt": _id}},
+        {key: None},
+    ]}
+
+
+def _page_cursor(collection, limit: int, after: Optional[Position], query: Optional[dict], key: str, projection: Optional[dict]):
+    query = dict(query or {})
+    if after is not None:
+        query = {"$and": [query, after_filter(after, key)]} if query else after_filter(after, key)
+    # One batch holds the whole page, so reading stops after a single round trip
+    return collection.find(query, projection) \
+        .sort([(key, -1), ("_id", -1)]).limit(limit + 1).batch_size(limit + 1)
+
+
+def _sort_key(doc: dict, key: str):
+    value = doc.get(key)
+    return value is not None, value or datetime.min, doc["_id"]
+
+
+async def _next(cursor) -> Optional[dict]:
+    try:
+        return await cursor.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def keyset_page(
+    collection,
+    limit: int,
+    after: Optional[Position] = None,
+    query: Optional[dict] = None,
+    key: str = "created_at",
+    projection: Optional[dict] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Up to `limit` documents after the cursor position, and the cursor for the next page"""
+    docs = await _page_cursor(collection, limit, after, query, key, projection).to_list(length=limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, cursor_for(docs[-1], key)
+    return docs, None
+
+
+async def merged_page(
+    collections: Sequence,
+    limit: int,
+    after: Optional[Position] = None,
+    query: Optional[dict] = None,
+    key: str = "created_at",
+    projections: Optional[Sequence[Optional[dict]]] = None,
+) -> Tuple[List[Tuple[int, dict]], Optional[str]]:
+    """
+    One keyset page across several collections, newest first.
+
+    Each collection is read through its own sorted cursor and the heads
+    are merged as they stream in, so no more than limit + 1 documents per
+    collection are ever fetched. `projections`, if given, holds one
+    projection per collection. Returns (index of the source collection,
+    document) pairs and the cursor for the next page.
+    """
+    projections = projections or [None] * len(collections)
+    cursors = [
+        _page_cursor(collection, limit, after, query, key, projection)
+        for collection, projection in zip(collections, projections)
+    ]
+    page: List[Tuple[int, dict]] = []
+    async for item in merge_newest(cursors, key):
+        page.append(item)
+        if len(page) > limit:
+            break
+    if len(page) > limit:
+        page = page[:limit]
+        return page, cursor_for(page[-1][1], key)
+    return page, None
+
+
+async def merge_newest(cursors: Sequence, key: str = "created_at") -> AsyncIterator[Tuple[int, dict]]:
+    """
+    Interleave cursors that are each sorted by (key, _id) descending,
+    yielding (index of the source cursor, document) newest first. Only the
+    current head of each cursor is held.
+    """
+    heads = [await _next(cursor) for cursor in cursors]
+    while True:
+        live = [i for i, head in enumerate(heads) if head is not None]
+        if not live:
+            return
+        newest = max(live, key=lambda i: _sort_key(heads[i], key))
+        yield newest, heads[newest]
+        heads[newest] = await _next(cursors[newest])
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
@@ -7,12 +7,24 @@ import logging
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.db.mongodb import connect_to_mongo, close_mongo_connection, check_connection_health
-from app.routers import auth, users, chat, newsletter
+from app.core.metrics import metrics
+from app.core.hashing import password_hasher, HashingBusy
+from app.core.revocation import revocations
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, check_connection_health, get_database
+from app.routers import auth, users, chat, newsletter, articles
 from app.routers.contact import router as contact_router
 from app.routers.consultation import router as consultation_router
-from app.routers.admin import router as admin_router
+from app.routers.admin import router as admin_router, require_admin
 from app.websockets.chat_ws import router as ws_router
+from app.services import newsletter_campaign
+from app.services.chat_writer import write_buffer
+from app.services.chat_compactor import chat_compactor
+from app.services.mailer import mailer
+from app.services.notification_digest import notification_digest
+from app.services.answer_cache import answer_cache
+from app.services.counters import dashboard_counters
+from app.services.article_snapshot import article_snapshot
+from app.services.article_search import article_search
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +47,19 @@ async def lifespan(app: FastAPI):
 
     try:
         await connect_to_mongo()
+        db = await get_database()
+        dashboard_counters.start()
+        await article_snapshot.start()
+        await article_search.start()
+        await answer_cache.load(db)
+        write_buffer.start()
+        chat_compactor.start()
+        mailer.start()
+        await notification_digest.start(db)
+        await newsletter_campaign.resume_interrupted(db)
+        if settings.AUTH_STATELESS_TOKENS:
+            await revocations.load(db)
+            revocations.start()
         logger.info("✅ Application startup complete")
         yield
     except Exception as e:
@@ -43,7 +68,17 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown
         logger.info("🛑 Shutting down application...")
+        await revocations.stop()
+        await dashboard_counters.stop()
+        await article_snapshot.stop()
+        await article_search.stop()
+        await notification_digest.stop()
+        await newsletter_campaign.stop_all()
+        await mailer.stop()
+        await chat_compactor.stop()
+        await write_buffer.stop()
         await close_mongo_connection()
+        password_hasher.shutdown()
         logger.info("✅ Application shutdown complete")
 
 
@@ -96,6 +131,17 @@ async def validation_exception_handler(request, exc):
     )
 
 
+@app.exception_handler(HashingBusy)
+async def hashing_busy_handler(request, exc):
+    """Password hashing queue is full — ask the client to retry"""
+    logger.warning("Password hashing queue full")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many sign-in attempts right now. Please try again shortly.", "success": False},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Catch-all exception handler"""
@@ -117,6 +163,7 @@ app.include_router(auth.router, prefix=f"{API_PREFIX}/auth", tags=["Authenticati
 app.include_router(users.router, prefix=f"{API_PREFIX}/users", tags=["Users"])
 app.include_router(chat.router, prefix=f"{API_PREFIX}/chat", tags=["Chat"])
 app.include_router(newsletter.router, prefix=f"{API_PREFIX}/newsletter", tags=["Newsletter"])
+app.include_router(articles.router, prefix=f"{API_PREFIX}/articles", tags=["Articles"])
 app.include_router(ws_router, prefix="/ws", tags=["WebSocket"])
 app.include_router(contact_router, prefix="/api/v1")
 app.include_router(consultation_router, prefix="/api/v1")
@@ -183,6 +230,12 @@ async def detailed_health_check():
     }
 
 
+@app.get("/api/metrics", tags=["Health"])
+async def read_metrics(admin: dict = Depends(require_admin)):
+    """In-process counters, gauges and derived ratios (admin only)"""
+    return {"success": True, "data": metrics.snapshot()}
+
+
 @app.middleware("http")
 async def log_requests(request, call_next):
     """Log all requests in debug mode"""
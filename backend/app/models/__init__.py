@@ -1,11 +1,12 @@
 # Models package — MongoDB document shapes and helpers
 from app.models.user import UserModel, user_helper
-from app.models.chat import ChatSessionModel, MessageModel, chat_session_helper
+from app.models.chat import ChatSessionModel, MessageModel, MessageBucketModel, chat_session_helper
 
 __all__ = [
     "UserModel",
     "user_helper",
     "ChatSessionModel",
     "MessageModel",
+    "MessageBucketModel",
     "chat_session_helper",
 ]
\ No newline at end of file
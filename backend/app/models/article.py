@@ -4,6 +4,9 @@ from pydantic import BaseModel, Field
 from bson import ObjectId
 
 
+EXCERPT_CHARS = 200
+
+
 class ArticleModel(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
     title: str
@@ -45,4 +48,16 @@ def article_helper(article: dict) -> dict:
         else str(article.get("created_at", "")),
         "created_at": article.get("created_at"),
         "updated_at": article.get("updated_at"),
-    }
\ No newline at end of file
+    }
+
+def public_article_helper(article: dict, full: bool = True) -> dict:
+    """Published article as shown to site visitors; list entries carry an excerpt instead of the content"""
+    data = article_helper(article)
+    del data["status"]
+    if not full:
+        content = data.pop("content")
+        excerpt = content[:EXCERPT_CHARS]
+        if len(content) > EXCERPT_CHARS:
+            excerpt = excerpt.rsplit(" ", 1)[0] + "…"
+        data["excerpt"] = excerpt
+    return data
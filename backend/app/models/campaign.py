@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class CampaignCreate(BaseModel):
+    article_id: str
+
+
+def campaign_helper(campaign: dict) -> dict:
+    started_at: Optional[datetime] = campaign.get("started_at")
+    finished_at: Optional[datetime] = campaign.get("finished_at")
+    elapsed = campaign.get("elapsed_seconds")
+    return {
+        "id": str(campaign["_id"]),
+        "article_id": campaign["article_id"],
+        "subject": campaign.get("subject", ""),
+        "status": campaign.get("status", "pending"),
+        "sent": campaign.get("sent", 0),
+        "failed": campaign.get("failed", 0),
+        "skipped": campaign.get("skipped", 0),
+        "sends_per_second": round(campaign.get("sent", 0) / elapsed, 2) if elapsed else None,
+        "created_at": campaign.get("created_at"),
+        "started_at": started_at,
+        "finished_at": finished_at,
+    }
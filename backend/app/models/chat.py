@@ -8,13 +8,17 @@ class MessageModel(BaseModel):
     role: str
     content: str
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    truncated: bool = False  # reply stopped by the client before it finished
+    id: Optional[str] = None  # given by the write-behind buffer
 
 
 class ChatSessionModel(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
     session_id: str
     user_id: Optional[str] = None
+    storage: str = "embedded"  # "embedded" or "bucketed"
     messages: List[MessageModel] = []
+    message_count: int = 0  # kept in step with every append, in both layouts
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -24,12 +28,31 @@ class ChatSessionModel(BaseModel):
         json_encoders = {ObjectId: str}
 
 
-def chat_session_helper(session: dict) -> dict:
+class MessageBucketModel(BaseModel):
+    id: Optional[str] = Field(default=None, alias="_id")
+    session_id: str
+    seq: int
+    count: int = 0
+    messages: List[MessageModel] = []
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
+
+def chat_session_helper(session: dict, messages: Optional[list] = None) -> dict:
+    """
+    Bucketed sessions carry no messages array — pass the messages loaded
+    with chat_store.load_messages() instead.
+    """
     return {
         "id": str(session["_id"]),
         "session_id": session["session_id"],
         "user_id": session.get("user_id"),
-        "messages": session.get("messages", []),
+        "messages": messages if messages is not None else session.get("messages", []),
         "created_at": session.get("created_at"),
         "updated_at": session.get("updated_at"),
     }
\ No newline at end of file
@@ -9,4 +9,5 @@ class ConsultationRequest(BaseModel):
     email: EmailStr
     phoneNumber: str
     message: str
+    urgent: bool = False  # skips the notification digest
     created_at: Optional[datetime] = None
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Every MongoDB index the app relies on, in one place.
+
+apply_indexes() creates them at startup (or through
+`python -m app.cli.ensure_indexes`); create_index is a no-op for an index
+that already exists, so this is safe to run on every boot. HOT_QUERIES are
+the request-path queries that must stay index-backed — check_hot_queries()
+runs explain() on each and reports any that would scan a whole collection.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+Keys = Sequence[Tuple[str, int]]
+
+
+class IndexSpec:
+    def __init__(self, collection: str, keys: Keys, **options: Any):
+        self.collection = collection
+        self.keys = list(keys)
+        # unique, expireAfterSeconds, partialFilterExpression, ...
+        self.options = options
+
+    def __repr__(self) -> str:
+        options = "".join(f", {k}={v!r}" for k, v in self.options.items())
+        return f"IndexSpec({self.collection!r}, {self.keys!r}{options})"
+
+
+class HotQuery:
+    def __init__(self, name: str, collection: str, filter: dict, sort: Optional[Keys] = None):
+        self.name = name
+        self.collection = collection
+        self.filter = filter
+        self.sort = list(sort) if sort else None
+
+
+NEWEST_FIRST = [("created_at", -1), ("_id", -1)]
+
+INDEXES: List[IndexSpec] = [
+    # Accounts — login and registration look users up by email
+    IndexSpec("users", [("email", 1)], unique=True),
+
+    # Chat
+    IndexSpec("chat_sessions", [("session_id", 1)], unique=True),
+    IndexSpec("chat_sessions", [("user_id", 1)]),
+    IndexSpec("chat_message_buckets", [("session_id", 1), ("seq", 1)], unique=True),
+    IndexSpec("lola_answer_cache", [("expires_at", 1)], expireAfterSeconds=0),
+
+    # Auth
+    IndexSpec("token_revocations", [("expires_at", 1)], expireAfterSeconds=0),
+    IndexSpec("token_revocations", [("created_at", 1)]),
+
+    # Articles
+    IndexSpec("articles", NEWEST_FIRST),
+    IndexSpec("articles", [("status", 1), ("created_at", -1), ("_id", -1)]),
+
+    # Newsletter
+    IndexSpec("newsletter", [("email", 1)], unique=True),
+    IndexSpec("newsletter", [("subscribed_at", -1), ("_id", -1)]),
+    IndexSpec("newsletter", [("is_active", 1), ("_id", 1)]),
+    IndexSpec("newsletter_campaigns", NEWEST_FIRST),
+    # One delivery record per recipient and campaign — a resumed campaign's duplicate guard
+    IndexSpec("newsletter_deliveries", [("campaign_id", 1), ("subscriber_id", 1)], unique=True),
+
+    # Form submissions
+    IndexSpec("contact_messages", NEWEST_FIRST),
+    IndexSpec("contact_messages", [("notification", 1), ("created_at", 1)],
+              partialFilterExpression={"notification": "pending"}),
+    IndexSpec("consultation_requests", NEWEST_FIRST),
+    IndexSpec("consultation_requests", [("notification", 1), ("created_at", 1)],
+              partialFilterExpression={"notification": "pending"}),
+]
+
+_ID = ObjectId()
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery("login", "users", {"email": "user@example.com"}),
+    HotQuery("chat session", "chat_sessions", {"session_id": "session"}),
+    HotQuery("my sessions", "chat_sessions", {"user_id": "user"}),
+    HotQuery("chat buckets", "chat_message_buckets", {"session_id": "session", "seq": {"$gte": 0}}, [("seq", 1)]),
+    HotQuery("subscribe", "newsletter", {"email": "user@example.com", "is_active": {"$ne": True}}),
+    HotQuery("campaign recipients", "newsletter", {"is_active": True, "_id": {"$gt": _ID}}, [("_id", 1)]),
+    HotQuery("admin articles", "articles", {}, NEWEST_FIRST),
+    HotQuery("published articles", "articles", {"status": "Published"}, NEWEST_FIRST),
+    HotQuery("admin subscribers", "newsletter", {}, [("subscribed_at", -1), ("_id", -1)]),
+    HotQuery("admin contacts", "contact_messages", {}, NEWEST_FIRST),
+    HotQuery("subscriber export", "newsletter", {"subscribed_at": {"$gte": _ID.generation_time}},
+             [("subscribed_at", -1), ("_id", -1)]),
+    HotQuery("submission export", "contact_messages", {"created_at": {"$gte": _ID.generation_time}}, NEWEST_FIRST),
+    HotQuery("admin consultations", "consultation_requests", {}, NEWEST_FIRST),
+    HotQuery("pending digest", "contact_messages", {"notification": "pending"}, [("created_at", 1)]),
+    HotQuery("campaign deliveries", "newsletter_deliveries", {"campaign_id": _ID, "subscriber_id": {"$in": [_ID]}}),
+    HotQuery("revocation refresh", "token_revocations", {"created_at": {"$gte": _ID.generation_time}}),
+]
+
+
+async def apply_indexes(db: AsyncIOMotorDatabase, indexes: Sequence[IndexSpec] = INDEXES) -> List[IndexSpec]:
+    """
+    Create every registered index; returns the ones that could not be built.
+
+    A failure — duplicates blocking a unique index, or an existing index
+    with the same keys but different options — is logged and skipped, so
+    one bad index never keeps the app from starting.
+    """
+    failed = []
+    for spec in indexes:
+        try:
+            await db[spec.collection].create_index(spec.keys, **spec.options)
+        except OperationFailure as e:
+            failed.append(spec)
+            logger.error(f"❌ Failed to create {spec}: {e}")
+    if not failed:
+        logger.info(f"✅ {len(indexes)} indexes in place")
+    return failed
+
+
+def _stages(plan: Dict[str, Any]):
+    yield plan.get("stage")
+    for child in ("inputStage", "queryPlan"):
+        if child in plan:
+            yield from _stages(plan[child])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+async def explain_stages(db: AsyncIOMotorDatabase, query: HotQuery) -> List[str]:
+    """Stages of the winning plan for a query, e.g. ["FETCH", "IXSCAN"]"""
+    cursor = db[query.collection].find(query.filter)
+    if query.sort:
+        cursor = cursor.sort(query.sort)
+    explain = await cursor.explain()
+    return [stage for stage in _stages(explain["queryPlanner"]["winningPlan"]) if stage]
+
+
+async def check_hot_queries(db: AsyncIOMotorDatabase, queries: Sequence[HotQuery] = HOT_QUERIES) -> List[str]:
+    """Names of the hot queries whose plan falls back to a collection scan"""
+    scans = []
+    for query in queries:
+        stages = await explain_stages(db, query)
+        if "COLLSCAN" in stages:
+            scans.append(query.name)
+            logger.warning(f"⚠️ Hot query '{query.name}' on {query.collection} scans the collection")
+    return scans
@@ -1,30 +1,104 @@
 import logging
-from fastapi import APIRouter, HTTPException, Depends
+from bson import ObjectId
+from datetime import datetime, timezone
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from app.models.article import ArticleCreate, ArticleUpdate
+from app.models.campaign import CampaignCreate, campaign_helper
 from app.services.admin_service import (
     get_dashboard_stats,
-    get_all_articles,
+    get_articles_page,
     create_article,
     update_article,
     delete_article,
-    get_all_subscribers,
-    get_all_contact_messages,
-    get_all_consultations,
+    get_subscribers_page,
+    get_contact_messages_page,
+    get_consultations_page,
+    get_submissions_page,
 )
+from app.services import newsletter_campaign
+from app.services.subscriber_import import InvalidImportFile, import_subscribers
+from app.services.export import (
+    MEDIA_TYPES,
+    SUBMISSION_COLUMNS,
+    SUBSCRIBER_COLUMNS,
+    stream_export,
+    submission_rows,
+    subscriber_rows,
+)
+from app.core.config import settings
 from app.core.dependencies import get_current_user
+from app.db.pagination import Position, InvalidCursor, decode_cursor, keyset_page
+from app.db.mongodb import get_database
 from app.models.user import UserModel
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def require_admin(current_user: UserModel = Depends(get_current_user)) -> UserModel:
+def require_admin(current_user: dict = Depends(get_current_user)) -> dict:
     """Dependency that ensures the current user is an admin"""
-    if not current_user.is_admin:
+    if not current_user.get("is_admin", False):
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
 
+class PageParams:
+    """?limit=&cursor= for the admin lists; pass the previous response's next_cursor to continue"""
+
+    def __init__(
+        self,
+        limit: int = Query(settings.ADMIN_PAGE_SIZE, ge=1, le=settings.ADMIN_PAGE_MAX),
+        cursor: Optional[str] = Query(None),
+    ):
+        self.limit = limit
+        try:
+            self.after: Optional[Position] = decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class DateRange:
+    """
+    ?date_from=&date_to= — a half-open range, date_from inclusive.
+    Bounds without a timezone are taken as UTC.
+    """
+
+    def __init__(
+        self,
+        date_from: Optional[datetime] = Query(None, description="At or after"),
+        date_to: Optional[datetime] = Query(None, description="Before"),
+    ):
+        date_from, date_to = _as_utc(date_from), _as_utc(date_to)
+        if date_from and date_to and date_from >= date_to:
+            raise HTTPException(status_code=400, detail="date_from must be before date_to")
+        self.since = date_from
+        self.until = date_to
+
+
+ExportFormat = Literal["csv", "ndjson"]
+
+
+def export_response(name: str, format: ExportFormat, columns: list, rows) -> StreamingResponse:
+    filename = f"{name}-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_export(name, format, columns, rows),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def page_response(items: list, next_cursor: Optional[str]) -> dict:
+    return {"success": True, "data": items, "next_cursor": next_cursor, "has_more": next_cursor is not None}
+
+
 # ─── STATS ───────────────────────────────────────────────────────────────────
 
 @router.get("/stats")
@@ -36,9 +110,8 @@ async def dashboard_stats(admin: UserModel = Depends(require_admin)):
 # ─── ARTICLES ────────────────────────────────────────────────────────────────
 
 @router.get("/articles")
-async def list_articles(admin: UserModel = Depends(require_admin)):
-    articles = await get_all_articles()
-    return {"success": True, "data": articles}
+async def list_articles(page: PageParams = Depends(), admin: UserModel = Depends(require_admin)):
+    return page_response(*await get_articles_page(page.limit, page.after))
 
 
 @router.post("/articles", status_code=201)
@@ -68,32 +141,121 @@ async def remove_article(article_id: str, admin: UserModel = Depends(require_adm
 # ─── SUBSCRIBERS ─────────────────────────────────────────────────────────────
 
 @router.get("/subscribers")
-async def list_subscribers(admin: UserModel = Depends(require_admin)):
-    subscribers = await get_all_subscribers()
-    return {"success": True, "data": subscribers, "total": len(subscribers)}
+async def list_subscribers(page: PageParams = Depends(), admin: UserModel = Depends(require_admin)):
+    return page_response(*await get_subscribers_page(page.limit, page.after))
+
+
+@router.get("/subscribers/export")
+async def export_subscribers(
+    format: ExportFormat = Query("csv"),
+    dates: DateRange = Depends(),
+    admin: UserModel = Depends(require_admin),
+):
+    """All subscribers as a CSV or NDJSON download, streamed; date range applies to subscribed_at"""
+    return export_response("subscribers", format, SUBSCRIBER_COLUMNS, subscriber_rows(dates.since, dates.until))
+
+
+@router.post("/subscribers/import")
+async def import_subscribers_csv(file: UploadFile = File(...), admin: UserModel = Depends(require_admin)):
+    """
+    Add subscribers from a UTF-8 CSV with an "email" column and an optional
+    "name" column. Addresses already on the list are left unchanged; the
+    response counts each outcome and lists the rows that were skipped.
+    """
+    db = await get_database()
+    try:
+        report = await import_subscribers(db, file.file)
+    except InvalidImportFile as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "data": report}
+
+
+# ─── NEWSLETTER CAMPAIGNS ────────────────────────────────────────────────────
+
+@router.post("/campaigns", status_code=202)
+async def send_campaign(data: CampaignCreate, admin: UserModel = Depends(require_admin)):
+    if not ObjectId.is_valid(data.article_id):
+        raise HTTPException(status_code=404, detail="Article not found")
+    db = await get_database()
+    campaign = await newsletter_campaign.create_campaign(db, data.article_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Published article not found")
+    newsletter_campaign.start_campaign(db, str(campaign["_id"]))
+    return {"success": True, "data": campaign_helper(campaign)}
+
+
+@router.get("/campaigns")
+async def list_campaigns(page: PageParams = Depends(), admin: UserModel = Depends(require_admin)):
+    db = await get_database()
+    campaigns, next_cursor = await keyset_page(db[newsletter_campaign.CAMPAIGNS], page.limit, page.after)
+    return page_response([campaign_helper(c) for c in campaigns], next_cursor)
+
+
+@router.get("/campaigns/{campaign_id}")
+async def get_campaign(campaign_id: str, admin: UserModel = Depends(require_admin)):
+    db = await get_database()
+    campaign = await db[newsletter_campaign.CAMPAIGNS].find_one({"_id": ObjectId(campaign_id)}) \
+        if ObjectId.is_valid(campaign_id) else None
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return {"success": True, "data": campaign_helper(campaign)}
+
+
+@router.post("/campaigns/{campaign_id}/resume", status_code=202)
+async def resume_campaign(campaign_id: str, admin: UserModel = Depends(require_admin)):
+    """
+    Pick up a paused, failed or stalled campaign from its checkpoint. A
+    completed campaign is resumed only to retry its failed deliveries.
+    """
+    db = await get_database()
+    campaign = await db[newsletter_campaign.CAMPAIGNS].find_one({"_id": ObjectId(campaign_id)}) \
+        if ObjectId.is_valid(campaign_id) else None
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    if campaign["status"] == newsletter_campaign.STATUS_COMPLETED \
+            and not await newsletter_campaign.has_retryable_failures(db, campaign["_id"]):
+        raise HTTPException(status_code=409, detail="Campaign already completed")
+    newsletter_campaign.start_campaign(db, campaign_id)
+    return {"success": True, "data": campaign_helper(campaign)}
 
 
 # ─── FORM SUBMISSIONS ────────────────────────────────────────────────────────
 
+SubmissionType = Literal["contact", "consultation"]
+
+
 @router.get("/submissions")
-async def list_submissions(admin: UserModel = Depends(require_admin)):
-    contacts = await get_all_contact_messages()
-    consultations = await get_all_consultations()
-    all_submissions = sorted(
-        contacts + consultations,
-        key=lambda x: x.get("created_at") or "",
-        reverse=True
-    )
-    return {"success": True, "data": all_submissions, "total": len(all_submissions)}
+async def list_submissions(
+    page: PageParams = Depends(),
+    type: Optional[SubmissionType] = Query(None),
+    dates: DateRange = Depends(),
+    admin: UserModel = Depends(require_admin),
+):
+    """
+    Contact messages and consultation requests, newest first.
+    Keep the same filters when following next_cursor.
+    """
+    kinds = [type] if type else None
+    return page_response(*await get_submissions_page(page.limit, page.after, kinds, dates.since, dates.until))
+
+
+@router.get("/submissions/export")
+async def export_submissions(
+    format: ExportFormat = Query("csv"),
+    type: Optional[SubmissionType] = Query(None),
+    dates: DateRange = Depends(),
+    admin: UserModel = Depends(require_admin),
+):
+    """Contact messages and consultation requests as a CSV or NDJSON download, streamed newest first"""
+    kinds = [type] if type else None
+    return export_response("submissions", format, SUBMISSION_COLUMNS, submission_rows(kinds, dates.since, dates.until))
 
 
 @router.get("/submissions/contacts")
-async def list_contacts(admin: UserModel = Depends(require_admin)):
-    contacts = await get_all_contact_messages()
-    return {"success": True, "data": contacts, "total": len(contacts)}
+async def list_contacts(page: PageParams = Depends(), admin: UserModel = Depends(require_admin)):
+    return page_response(*await get_contact_messages_page(page.limit, page.after))
 
 
 @router.get("/submissions/consultations")
-async def list_consultations(admin: UserModel = Depends(require_admin)):
-    consultations = await get_all_consultations()
-    return {"success": True, "data": consultations, "total": len(consultations)}
\ No newline at end of file
+async def list_consultations(page: PageParams = Depends(), admin: UserModel = Depends(require_admin)):
+    return page_response(*await get_consultations_page(page.limit, page.after))
\ No newline at end of file
@@ -0,0 +1,57 @@
+import time
+from typing import Optional
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Request, Query
+
+from app.core.config import settings
+from app.core.http_cache import conditional_response
+from app.db.mongodb import get_collection
+from app.services.article_snapshot import PUBLISHED, article_snapshot, fetch_published, render_list, render_detail
+from app.services.article_search import article_search
+
+router = APIRouter()
+
+
+@router.get("")
+async def list_published_articles(request: Request, category: Optional[str] = Query(None)):
+    """
+    Published articles, newest first, with an excerpt in place of the content.
+    Send If-None-Match / If-Modified-Since to get a 304 when nothing changed.
+    """
+    if settings.ARTICLE_SNAPSHOT_ENABLED:
+        representation = await article_snapshot.listing(category)
+    else:
+        representation = render_list(await fetch_published(category))
+    return conditional_response(request, representation, settings.ARTICLES_CACHE_CONTROL)
+
+
+@router.get("/search")
+async def search_articles(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    prefix: bool = Query(True, description="Let the last word match as a prefix, for search-as-you-type"),
+):
+    """
+    Published articles ranked by relevance to q, with matches wrapped in
+    <mark> in title_highlighted and snippet (both HTML-escaped).
+    """
+    started = time.perf_counter()
+    results = article_search.search(q, limit, prefix)
+    took_ms = (time.perf_counter() - started) * 1000
+    return {"success": True, "data": results, "total": len(results), "took_ms": round(took_ms, 3)}
+
+
+@router.get("/{article_id}")
+async def get_published_article(article_id: str, request: Request):
+    """A single published article with its full content"""
+    if settings.ARTICLE_SNAPSHOT_ENABLED:
+        representation = await article_snapshot.detail(article_id)
+    else:
+        article = None
+        if ObjectId.is_valid(article_id):
+            collection = await get_collection("articles")
+            article = await collection.find_one({"_id": ObjectId(article_id), "status": PUBLISHED})
+        representation = render_detail(article) if article else None
+    if representation is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return conditional_response(request, representation, settings.ARTICLES_CACHE_CONTROL)
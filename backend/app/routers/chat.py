@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.db.mongodb import get_database
 from app.models.chat import chat_session_helper
+from app.services import chat_store
+from app.services.chat_writer import write_buffer
+from app.services.session_cache import session_cache
 from app.schemas.chat import ChatSessionResponse
 from app.core.dependencies import get_current_active_user
 from typing import List
@@ -24,7 +27,8 @@ async def get_chat_history(session_id: str):
     if not session:
         raise HTTPException(status_code=404, detail="Chat session not found.")
 
-    return chat_session_helper(session)
+    messages = await chat_store.load_messages(db, session)
+    return chat_session_helper(session, messages)
 
 
 @router.get("/my-sessions", response_model=List[ChatSessionResponse])
@@ -36,7 +40,10 @@ async def get_my_sessions(current_user: dict = Depends(get_current_active_user))
     db = await get_database()
     cursor = db["chat_sessions"].find({"user_id": current_user["id"]})
     sessions = await cursor.to_list(length=50)
-    return [chat_session_helper(s) for s in sessions]
+    return [
+        chat_session_helper(s, await chat_store.load_messages(db, s))
+        for s in sessions
+    ]
 
 
 @router.delete("/history/{session_id}")
@@ -46,9 +53,13 @@ async def delete_chat_history(session_id: str):
     Public endpoint — frontend can clear chat history.
     """
     db = await get_database()
-    result = await db["chat_sessions"].delete_one({"session_id": session_id})
+    # Tombstoned until the documents are gone, so neither open sockets nor
+    # the write buffer can write the session back
+    async with session_cache.deleting(session_id):
+        discarded = await write_buffer.discard(session_id)
+        deleted = await chat_store.delete_session(db, session_id) or discarded
 
-    if result.deleted_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Chat session not found.")
 
     return {"message": "Chat history deleted."}
\ No newline at end of file
@@ -1,11 +1,21 @@
-from datetime import datetime, timezone
+from collections import Counter
 from fastapi import APIRouter, HTTPException
-from app.schemas.newsletter import NewsletterSubscribe, NewsletterUnsubscribe, NewsletterResponse
-from app.models.newsletter import newsletter_helper
+from app.schemas.newsletter import (
+    NewsletterSubscribe,
+    NewsletterUnsubscribe,
+    NewsletterResponse,
+    NewsletterBatchSubscribe,
+    NewsletterBatchResponse,
+)
 from app.db.mongodb import get_database
+from app.services import newsletter_service
+from app.services.subscriber_import import normalize_email
 
 router = APIRouter()
 
+INVALID = "invalid"
+UNAVAILABLE_MESSAGE = "Newsletter signups are temporarily unavailable, please try again later"
+
 
 @router.post("/subscribe", response_model=NewsletterResponse, status_code=201)
 async def subscribe(data: NewsletterSubscribe):
@@ -19,29 +29,65 @@ async def subscribe(data: NewsletterSubscribe):
         success and message
     """
     db = await get_database()
-    collection = db["newsletter"]
+    try:
+        outcome = await newsletter_service.subscribe(db["newsletter"], data.email, data.name)
+    except newsletter_service.SubscriptionsUnavailable:
+        raise HTTPException(status_code=503, detail=UNAVAILABLE_MESSAGE)
+    if outcome == newsletter_service.ALREADY_SUBSCRIBED:
+        raise HTTPException(status_code=400, detail=newsletter_service.MESSAGES[outcome])
+    return {"success": True, "message": newsletter_service.MESSAGES[outcome]}
+
+
+@router.post("/subscribe/batch", response_model=NewsletterBatchResponse)
+async def subscribe_batch(data: NewsletterBatchSubscribe):
+    """
+    Subscribe many emails at once, for partner sites forwarding their signups.
+
+    Request body:
+        { "subscribers": [{ "email": "john@example.com", "name": "John" }, ...] }
 
-    existing = await collection.find_one({"email": data.email})
+    Returns:
+        a result per signup, in order, with the same messages as /subscribe,
+        and how many ended in each status
+    """
+    results = []
+    signups = {}  # email → index into results of its first signup
+    for signup in data.subscribers:
+        try:
+            email = normalize_email(signup.email)
+        except ValueError as e:
+            results.append({"email": signup.email, "status": INVALID, "message": str(e)})
+            continue
+        signups.setdefault(email, len(results))
+        results.append({"email": email, "name": signup.name})
 
-    if existing:
-        if existing.get("is_active"):
-            raise HTTPException(status_code=400, detail="Email already subscribed")
-        # Re-subscribe
-        await collection.update_one(
-            {"email": data.email},
-            {"$set": {"is_active": True, "unsubscribed_at": None}}
+    db = await get_database()
+    try:
+        outcomes = await newsletter_service.subscribe_many(
+            db["newsletter"], [(email, results[i]["name"]) for email, i in signups.items()]
         )
-        return {"success": True, "message": "Successfully re-subscribed!"}
-
-    subscriber = {
-        "email": data.email,
-        "name": data.name,
-        "is_active": True,
-        "subscribed_at": datetime.now(timezone.utc),
-        "unsubscribed_at": None,
+    except newsletter_service.SubscriptionsUnavailable:
+        raise HTTPException(status_code=503, detail=UNAVAILABLE_MESSAGE)
+    outcome_of = dict(zip(signups, outcomes))
+    for i, result in enumerate(results):
+        if "status" in result:
+            continue
+        status = outcome_of[result["email"]]
+        if signups[result["email"]] != i and status != newsletter_service.FAILED:
+            # A repeat within the batch — its first occurrence subscribed it
+            status = newsletter_service.ALREADY_SUBSCRIBED
+        results[i] = {"email": result["email"], "status": status, "message": newsletter_service.MESSAGES[status]}
+
+    counts = Counter(result["status"] for result in results)
+    return {
+        "success": True,
+        "subscribed": counts[newsletter_service.SUBSCRIBED],
+        "already_subscribed": counts[newsletter_service.ALREADY_SUBSCRIBED],
+        "resubscribed": counts[newsletter_service.RESUBSCRIBED],
+        "invalid": counts[INVALID],
+        "failed": counts[newsletter_service.FAILED],
+        "results": results,
     }
-    await collection.insert_one(subscriber)
-    return {"success": True, "message": "Successfully subscribed!"}
 
 
 @router.post("/unsubscribe", response_model=NewsletterResponse)
@@ -53,14 +99,7 @@ async def unsubscribe(data: NewsletterUnsubscribe):
         { "email": "john@example.com" }
     """
     db = await get_database()
-    collection = db["newsletter"]
-
-    result = await collection.find_one_and_update(
-        {"email": data.email},
-        {"$set": {"is_active": False, "unsubscribed_at": datetime.now(timezone.utc)}}
-    )
-
-    if not result:
+    if not await newsletter_service.unsubscribe(db["newsletter"], data.email):
         raise HTTPException(status_code=404, detail="Email not found")
 
-    return {"success": True, "message": "Successfully unsubscribed"}
\ No newline at end of file
+    return {"success": True, "message": "Successfully unsubscribed"}
@@ -10,6 +10,7 @@ from app.schemas.user import (
 from app.schemas.chat import (
     WSMessageIn,
     WSMessageOut,
+    WSQueuedOut,
     MessageOut,
     ChatSessionResponse,
 )
@@ -23,6 +24,7 @@ __all__ = [
     "TokenData",
     "WSMessageIn",
     "WSMessageOut",
+    "WSQueuedOut",
     "MessageOut",
     "ChatSessionResponse",
 ]
\ No newline at end of file
@@ -7,17 +7,26 @@ class WSMessageIn(BaseModel):
     session_id: str
     message: str
     user_id: Optional[str] = None
+    coalesce: Optional[bool] = None  # opt in to batched "chunk" frames for this connection
 
 
 class WSMessageOut(BaseModel):
-    type: str       # "chunk" | "done" | "error"
+    type: str       # "chunk" | "done" | "error"  (clients may send {"type": "stop"})
     content: str
 
 
+class WSQueuedOut(BaseModel):
+    type: str = "queued"
+    content: str = ""
+    position: int               # 1 = next to be served
+    estimated_wait: float       # seconds
+
+
 class MessageOut(BaseModel):
     role: str
     content: str
     timestamp: datetime
+    truncated: bool = False
 
 
 class ChatSessionResponse(BaseModel):
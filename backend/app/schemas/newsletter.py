@@ -1,5 +1,7 @@
-from typing import Optional
-from pydantic import BaseModel, EmailStr
+from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field
+
+from app.core.config import settings
 
 
 class NewsletterSubscribe(BaseModel):
@@ -13,4 +15,30 @@ class NewsletterUnsubscribe(BaseModel):
 
 class NewsletterResponse(BaseModel):
     success: bool
-    message: str
\ No newline at end of file
+    message: str
+
+
+class NewsletterBatchSignup(BaseModel):
+    # Validated per signup, so one bad address does not reject the whole batch
+    email: str
+    name: Optional[str] = None
+
+
+class NewsletterBatchSubscribe(BaseModel):
+    subscribers: List[NewsletterBatchSignup] = Field(..., min_length=1, max_length=settings.NEWSLETTER_SUBSCRIBE_BATCH_MAX)
+
+
+class NewsletterBatchResult(BaseModel):
+    email: str
+    status: str     # "subscribed" | "already_subscribed" | "resubscribed" | "invalid" | "failed"
+    message: str
+
+
+class NewsletterBatchResponse(BaseModel):
+    success: bool
+    subscribed: int
+    already_subscribed: int
+    resubscribed: int
+    invalid: int
+    failed: int
+    results: List[NewsletterBatchResult]
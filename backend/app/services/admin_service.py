@@ -1,33 +1,29 @@
 import logging
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional, Tuple
 from bson import ObjectId
 
 from app.db.mongodb import get_collection
+from app.db.pagination import Position, keyset_page, merged_page
 from app.models.article import ArticleCreate, ArticleUpdate, article_helper
+from app.services.counters import dashboard_counters
+from app.services.article_snapshot import article_snapshot
+from app.services.article_search import article_search
 
 logger = logging.getLogger(__name__)
 
+Page = Tuple[List[dict], Optional[str]]
+
 
 # ─── STATS ───────────────────────────────────────────────────────────────────
 
 async def get_dashboard_stats() -> dict:
     try:
-        articles_col = await get_collection("articles")
-        subscribers_col = await get_collection("newsletter_subscribers")
-        contacts_col = await get_collection("contact_messages")
-        consultations_col = await get_collection("consultation_requests")
-
-        total_articles = await articles_col.count_documents({})
-        total_subscribers = await subscribers_col.count_documents({})
-        total_contacts = await contacts_col.count_documents({})
-        total_consultations = await consultations_col.count_documents({})
-        total_form_entries = total_contacts + total_consultations
-
+        counts = await dashboard_counters.read()
         return {
-            "total_articles": total_articles,
-            "total_subscribers": total_subscribers,
-            "total_form_entries": total_form_entries,
+            "total_articles": counts["articles"],
+            "total_subscribers": counts["subscribers"],
+            "total_form_entries": counts["contact_messages"] + counts["consultation_requests"],
         }
     except Exception as e:
         logger.error(f"❌ Failed to get dashboard stats: {e}")
@@ -36,16 +32,14 @@ async def get_dashboard_stats() -> dict:
 
 # ─── ARTICLES ────────────────────────────────────────────────────────────────
 
-async def get_all_articles() -> list:
+async def get_articles_page(limit: int, after: Optional[Position] = None) -> Page:
     try:
         collection = await get_collection("articles")
-        articles = []
-        async for article in collection.find().sort("created_at", -1):
-            articles.append(article_helper(article))
-        return articles
+        articles, next_cursor = await keyset_page(collection, limit, after)
+        return [article_helper(article) for article in articles], next_cursor
     except Exception as e:
         logger.error(f"❌ Failed to get articles: {e}")
-        return []
+        return [], None
 
 
 async def create_article(data: ArticleCreate) -> Optional[dict]:
@@ -54,7 +48,10 @@ async def create_article(data: ArticleCreate) -> Optional[dict]:
         now = datetime.now(timezone.utc)
         doc = {**data.dict(), "created_at": now, "updated_at": now}
         result = await collection.insert_one(doc)
+        await dashboard_counters.bump("articles")
         new_article = await collection.find_one({"_id": result.inserted_id})
+        article_snapshot.put(new_article)
+        article_search.put(new_article)
         return article_helper(new_article)
     except Exception as e:
         logger.error(f"❌ Failed to create article: {e}")
@@ -71,6 +68,9 @@ async def update_article(article_id: str, data: ArticleUpdate) -> Optional[dict]
             {"$set": update_data}
         )
         updated = await collection.find_one({"_id": ObjectId(article_id)})
+        if updated:
+            article_snapshot.put(updated)
+            article_search.put(updated)
         return article_helper(updated) if updated else None
     except Exception as e:
         logger.error(f"❌ Failed to update article: {e}")
@@ -81,6 +81,10 @@ async def delete_article(article_id: str) -> bool:
     try:
         collection = await get_collection("articles")
         result = await collection.delete_one({"_id": ObjectId(article_id)})
+        if result.deleted_count:
+            await dashboard_counters.bump("articles", -1)
+            article_snapshot.remove(article_id)
+            article_search.remove(article_id)
         return result.deleted_count > 0
     except Exception as e:
         logger.error(f"❌ Failed to delete article: {e}")
@@ -89,60 +93,112 @@ async def delete_article(article_id: str) -> bool:
 
 # ─── SUBSCRIBERS ─────────────────────────────────────────────────────────────
 
-async def get_all_subscribers() -> list:
+def subscriber_helper(sub: dict) -> dict:
+    return {
+        "id": str(sub["_id"]),
+        "email": sub.get("email", ""),
+        "name": sub.get("name", ""),
+        "is_active": sub.get("is_active", True),
+        "created_at": sub.get("subscribed_at"),
+    }
+
+
+SUBSCRIBER_FIELDS = {"email": 1, "name": 1, "is_active": 1, "subscribed_at": 1}
+
+
+async def get_subscribers_page(limit: int, after: Optional[Position] = None) -> Page:
     try:
-        collection = await get_collection("newsletter_subscribers")
-        subscribers = []
-        async for sub in collection.find().sort("created_at", -1):
-            subscribers.append({
-                "id": str(sub["_id"]),
-                "email": sub.get("email", ""),
-                "name": sub.get("name", ""),
-                "created_at": sub.get("created_at"),
-            })
-        return subscribers
+        collection = await get_collection("newsletter")
+        subscribers, next_cursor = await keyset_page(collection, limit, after, key="subscribed_at")
+        return [subscriber_helper(sub) for sub in subscribers], next_cursor
     except Exception as e:
         logger.error(f"❌ Failed to get subscribers: {e}")
-        return []
+        return [], None
 
 
 # ─── FORM SUBMISSIONS ────────────────────────────────────────────────────────
 
-async def get_all_contact_messages() -> list:
+def contact_helper(msg: dict) -> dict:
+    return {
+        "id": str(msg["_id"]),
+        "name": f"{msg.get('surname', '')} {msg.get('lastName', '')}".strip(),
+        "email": msg.get("email", ""),
+        "phone": msg.get("phoneNumber", ""),
+        "message": msg.get("message", ""),
+        "type": "contact",
+        "created_at": msg.get("created_at"),
+    }
+
+
+def consultation_helper(c: dict) -> dict:
+    return {
+        "id": str(c["_id"]),
+        "name": f"{c.get('firstName', '')} {c.get('lastName', '')}".strip(),
+        "email": c.get("email", ""),
+        "phone": c.get("phoneNumber", ""),
+        "message": c.get("message", ""),
+        "type": "consultation",
+        "created_at": c.get("created_at"),
+    }
+
+
+# submission type → (collection, helper, projection of the fields the helper reads)
+SUBMISSIONS = {
+    "contact": ("contact_messages", contact_helper, {
+        "surname": 1, "lastName": 1, "email": 1, "phoneNumber": 1, "message": 1, "created_at": 1,
+    }),
+    "consultation": ("consultation_requests", consultation_helper, {
+        "firstName": 1, "lastName": 1, "email": 1, "phoneNumber": 1, "message": 1, "created_at": 1,
+    }),
+}
+
+
+def date_range(key: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Optional[dict]:
+    """Filter for since <= key < until; None when neither bound is given"""
+    bounds = {}
+    if since is not None:
+        bounds["$gte"] = since
+    if until is not None:
+        bounds["$lt"] = until
+    return {key: bounds} if bounds else None
+
+
+async def get_contact_messages_page(limit: int, after: Optional[Position] = None) -> Page:
     try:
         collection = await get_collection("contact_messages")
-        messages = []
-        async for msg in collection.find().sort("created_at", -1):
-            messages.append({
-                "id": str(msg["_id"]),
-                "name": f"{msg.get('surname', '')} {msg.get('lastName', '')}".strip(),
-                "email": msg.get("email", ""),
-                "phone": msg.get("phoneNumber", ""),
-                "message": msg.get("message", ""),
-                "type": "contact",
-                "created_at": msg.get("created_at"),
-            })
-        return messages
+        messages, next_cursor = await keyset_page(collection, limit, after)
+        return [contact_helper(msg) for msg in messages], next_cursor
     except Exception as e:
         logger.error(f"❌ Failed to get contact messages: {e}")
-        return []
+        return [], None
 
 
-async def get_all_consultations() -> list:
+async def get_consultations_page(limit: int, after: Optional[Position] = None) -> Page:
     try:
         collection = await get_collection("consultation_requests")
-        consultations = []
-        async for c in collection.find().sort("created_at", -1):
-            consultations.append({
-                "id": str(c["_id"]),
-                "name": f"{c.get('firstName', '')} {c.get('lastName', '')}".strip(),
-                "email": c.get("email", ""),
-                "phone": c.get("phoneNumber", ""),
-                "message": c.get("message", ""),
-                "type": "consultation",
-                "created_at": c.get("created_at"),
-            })
-        return consultations
+        consultations, next_cursor = await keyset_page(collection, limit, after)
+        return [consultation_helper(c) for c in consultations], next_cursor
     except Exception as e:
         logger.error(f"❌ Failed to get consultations: {e}")
-        return []
\ No newline at end of file
+        return [], None
+
+
+async def get_submissions_page(
+    limit: int,
+    after: Optional[Position] = None,
+    kinds: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Page:
+    """Contact messages and consultations interleaved newest first, optionally by kind and date range"""
+    try:
+        sources = [(name, helper, fields) for kind, (name, helper, fields) in SUBMISSIONS.items() if not kinds or kind in kinds]
+        collections = [await get_collection(name) for name, _, _ in sources]
+        page, next_cursor = await merged_page(
+            collections, limit, after, date_range("created_at", since, until),
+            projections=[fields for _, _, fields in sources],
+        )
+        return [sources[i][1](doc) for i, doc in page], next_cursor
+    except Exception as e:
+        logger.error(f"❌ Failed to get submissions: {e}")
+        return [], None
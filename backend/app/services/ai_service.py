@@ -1,21 +1,32 @@
+from typing import Optional
+
 from openai import AsyncOpenAI
 from app.core.config import settings
+from app.services.context_service import count_tokens, MESSAGE_TOKEN_OVERHEAD
+from app.services.llm_scheduler import llm_scheduler, QueuedCallback
+
+MAX_COMPLETION_TOKENS = 500
 
 # ── OpenAI Client ────────────────────────────────────────────────
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
 
 
-async def stream_lola_response(conversation_history: list):
+async def stream_lola_response(conversation_history: list, on_queued: Optional[QueuedCallback] = None):
     """
     Sends the conversation history to GPT-4 and streams back
     Lola's response token by token.
 
     Args:
         conversation_history: list of {"role": "user"|"assistant", "content": "..."}
+        on_queued: awaited with (position, estimated wait) while the request
+                   waits for admission by the LLM scheduler
 
     Yields:
         str — each text chunk as it arrives from OpenAI
 
+    Raises:
+        AdmissionRejected — the request would wait longer than LLM_QUEUE_TIMEOUT_SECONDS
+
     Usage (in websocket handler):
         async for chunk in stream_lola_response(history):
             await websocket.send_text(chunk)
@@ -25,17 +36,73 @@ async def stream_lola_response(conversation_history: list):
         {"role": "system", "content": settings.LOLA_SYSTEM_PROMPT}
     ] + conversation_history
 
-    # Stream the response from GPT-4
-    stream = await client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        messages=messages,
-        stream=True,        # enables token-by-token streaming
-        temperature=0.7,    # balanced between creative and factual
-        max_tokens=500,     # keep responses concise for a chat widget
+    prompt_tokens = sum(
+        count_tokens(m["content"]) + MESSAGE_TOKEN_OVERHEAD for m in messages
     )
 
-    async for chunk in stream:
-        # Each chunk may or may not have content
-        delta = chunk.choices[0].delta.content
-        if delta is not None:
-            yield delta
\ No newline at end of file
+    # Wait for a slot under the global concurrency and rate limits
+    async with llm_scheduler.admit(prompt_tokens + MAX_COMPLETION_TOKENS, on_queued) as report_usage:
+        # Stream the response from GPT-4
+        stream = await client.chat.completions.create(
+            model=settings.OPENAI_MODEL,
+            messages=messages,
+            stream=True,        # enables token-by-token streaming
+            temperature=0.7,    # balanced between creative and factual
+            max_tokens=MAX_COMPLETION_TOKENS,  # keep responses concise for a chat widget
+        )
+
+        completion_tokens = 0
+        try:
+            async for chunk in stream:
+                # Each chunk may or may not have content
+                delta = chunk.choices[0].delta.content
+                if delta is not None:
+                    completion_tokens += 1  # OpenAI sends roughly one token per delta
+                    yield delta
+        finally:
+            # Also runs when the consumer stops early — frees the upstream connection
+            await stream.close()
+            report_usage(prompt_tokens + completion_tokens)
+
+
+async def summarize_conversation(previous_summary: Optional[str], messages: list) -> str:
+    """
+    Fold older chat messages into the session's rolling summary.
+
+    Args:
+        previous_summary: summary of everything before `messages`, if any
+        messages: list of {"role": "user"|"assistant", "content": "..."}
+
+    Returns:
+        str — the updated summary
+
+    Raises:
+        AdmissionRejected — the request would wait longer than LLM_QUEUE_TIMEOUT_SECONDS
+    """
+    transcript = "\n".join(
+        f"{'Visitor' if m['role'] == 'user' else 'Lola'}: {m['content']}" for m in messages
+    )
+    prompt = (
+        f"Current summary:\n{previous_summary or '(none)'}\n\n"
+        f"New messages:\n{transcript}"
+    )
+    request = [
+        {"role": "system", "content": settings.CHAT_SUMMARY_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    prompt_tokens = sum(
+        count_tokens(m["content"]) + MESSAGE_TOKEN_OVERHEAD for m in request
+    )
+
+    # Shares the same limits as Lola's replies
+    async with llm_scheduler.admit(prompt_tokens + settings.CHAT_SUMMARY_MAX_TOKENS) as report_usage:
+        response = await client.chat.completions.create(
+            model=settings.OPENAI_MODEL,
+            messages=request,
+            temperature=0.2,    # summaries should stick to the facts
+            max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS,
+        )
+        if response.usage is not None:
+            report_usage(response.usage.total_tokens)
+
+    return (response.choices[0].message.content or "").strip()
@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "lola_answer_cache"
+
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+# Replay splits answers at word boundaries, keeping the whitespace
+_PIECE_RE = re.compile(r"\S+\s*|\s+")
+
+metrics.derive("answer_cache.hit_ratio", lambda m: m.ratio("answer_cache.hits", "answer_cache.lookups"))
+
+
+def normalize(text: str) -> str:
+    text = _NON_WORD_RE.sub(" ", text.lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+class AnswerCache:
+    """
+    LRU + TTL cache of Lola's answers, keyed by the normalized question and
+    the last LOLA_CACHE_CONTEXT_MESSAGES messages before it.
+
+    Entries are written through to the lola_answer_cache collection (with a
+    TTL index) and loaded back on startup, so the cache survives restarts.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[int] = None):
+        self.max_entries = max_entries or settings.LOLA_CACHE_MAX_ENTRIES
+        self.ttl = ttl or settings.LOLA_CACHE_TTL_SECONDS
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key → (answer, expires_at)
+        self._db: Optional[AsyncIOMotorDatabase] = None
+
+    def make_key(self, recent_messages: List[dict], question: str) -> str:
+        n = settings.LOLA_CACHE_CONTEXT_MESSAGES
+        context = recent_messages[-n:] if n else []
+        parts = [
+            settings.OPENAI_MODEL,
+            hashlib.sha1(settings.LOLA_SYSTEM_PROMPT.encode()).hexdigest(),
+            *(f"{m['role']}:{normalize(m['content'])}" for m in context),
+            normalize(question),
+        ]
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    # ─── LOOKUPS ─────────────────────────────────────────────────────────────
+
+    def get(self, recent_messages: List[dict], question: str) -> Optional[str]:
+        if not settings.LOLA_CACHE_ENABLED:
+            return None
+        metrics.inc("answer_cache.lookups")
+        key = self.make_key(recent_messages, question)
+        entry = self._entries.get(key)
+
+        if entry is not None and entry[1] <= time.time():
+            del self._entries[key]
+            metrics.inc("answer_cache.evictions.ttl")
+            entry = None
+
+        if entry is None:
+            metrics.inc("answer_cache.misses")
+            return None
+
+        self._entries.move_to_end(key)
+        metrics.inc("answer_cache.hits")
+        return entry[0]
+
+    async def put(self, recent_messages: List[dict], question: str, answer: str) -> None:
+        if not settings.LOLA_CACHE_ENABLED or not answer.strip():
+            return
+        key = self.make_key(recent_messages, question)
+        expires_at = time.time() + self.ttl
+        self._store(key, answer, expires_at)
+        metrics.inc("answer_cache.stores")
+
+        if self._db is None:
+            return
+        try:
+            await self._db[COLLECTION].replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "question": question,
+                    "answer": answer,
+                    "created_at": datetime.now(timezone.utc),
+                    "expires_at": datetime.fromtimestamp(expires_at, timezone.utc),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to persist cached answer: {e}")
+
+    def _store(self, key: str, answer: str, expires_at: float) -> None:
+        self._entries[key] = (answer, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            metrics.inc("answer_cache.evictions.lru")
+        metrics.set_gauge("answer_cache.entries", len(self._entries))
+
+    # ─── PERSISTENCE ─────────────────────────────────────────────────────────
+
+    async def load(self, db: AsyncIOMotorDatabase) -> None:
+        """Attach to MongoDB and warm the cache with the newest unexpired answers"""
+        self._db = db
+        if not settings.LOLA_CACHE_ENABLED:
+            return
+        try:
+            now = datetime.now(timezone.utc)
+            cursor = (
+                db[COLLECTION]
+                .find({"expires_at": {"$gt": now}}, {"answer": 1, "expires_at": 1})
+                .sort("created_at", -1)
+                .limit(self.max_entries)
+            )
+            docs = await cursor.to_list(length=self.max_entries)
+            # Oldest first, so the newest end up most recently used
+            for doc in reversed(docs):
+                expires_at = doc["expires_at"]
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                self._store(doc["_id"], doc["answer"], expires_at.timestamp())
+            logger.info(f"✅ Loaded {len(docs)} cached Lola answers")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load Lola answer cache: {e}")
+
+    # ─── REPLAY ──────────────────────────────────────────────────────────────
+
+    async def replay(self, answer: str) -> AsyncIterator[str]:
+        """
+        Yield a cached answer word by word, paced at
+        LOLA_CACHE_REPLAY_CHARS_PER_SEC (0 = as fast as possible).
+        """
+        rate = settings.LOLA_CACHE_REPLAY_CHARS_PER_SEC
+        for piece in _PIECE_RE.findall(answer):
+            yield piece
+            if rate:
+                await asyncio.sleep(len(piece) / rate)
+
+
+answer_cache = AnswerCache()
@@ -0,0 +1,525 @@
+import asyncio
+import base64
+import gzip
+import heapq
+import html
+import json
+import logging
+import math
+import os
+import re
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.mongodb import get_collection
+from app.services.article_snapshot import PUBLISHED
+
+logger = logging.getLogger(__name__)
+
+# Bump when tokenizing or the snapshot layout changes; older snapshots are then ignored
+INDEX_VERSION = 2
+
+# BM25 parameters and per-field weights (a simple BM25F)
+K1 = 1.2
+B = 0.75
+FIELD_WEIGHTS = {"title": 3.0, "category": 2.0, "content": 1.0}
+
+# Typeahead: the last, unfinished query word expands to at most this many
+# vocabulary terms, once it is at least PREFIX_MIN_CHARS long
+MAX_EXPANSIONS = 32
+PREFIX_MIN_CHARS = 2
+
+SNIPPET_WORDS = 30
+SNIPPET_LEAD = 8
+
+# Re-read articles changed this long before the last sync, in case of clock skew between workers
+SYNC_OVERLAP = timedelta(seconds=5)
+
+WORD = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=100_000)
+def fold(word: str) -> str:
+    """Case- and accent-insensitive form of a word: "Müller" and "muller" both become "muller\""""
+    decomposed = unicodedata.normalize("NFKD", word.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    return [fold(m.group()) for m in WORD.finditer(text or "")]
+
+
+def highlight(text: str, terms: Set[str]) -> str:
+    """HTML-escape text, wrapping words whose folded form is in terms in <mark>"""
+    out, last = [], 0
+    for m in WORD.finditer(text):
+        if fold(m.group()) in terms:
+            out.append(html.escape(text[last:m.start()]))
+            out.append(f"<mark>{html.escape(m.group())}</mark>")
+            last = m.end()
+    out.append(html.escape(text[last:]))
+    return "".join(out)
+
+
+class _Doc:
+    __slots__ = ("id", "title", "category", "content", "date", "updated_at",
+                 "length", "weights", "content_terms", "starts", "ends")
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+
+class ArticleSearchIndex:
+    """
+    In-process BM25 index over published articles.
+
+    Terms from the title, category and content are weighted per field into
+    one inverted index (term → article → weighted frequency). The last word
+    of a query also matches every term it is a prefix of, so results follow
+    the user while they type. Content is kept as term ids with character
+    offsets, so highlighted snippets come straight from the index without
+    re-tokenizing articles at query time.
+
+    Admin writes in this process update the index straight away (put /
+    remove); sync() picks up changes from other workers by reading only
+    articles updated since the previous sync. The index is saved to
+    ARTICLE_SEARCH_SNAPSHOT_PATH, so a restart loads it and syncs the
+    difference instead of re-indexing every article.
+    """
+
+    def __init__(self):
+        self._term_ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+        # Terms with postings, sorted for prefix lookups
+        self._vocabulary: List[str] = []
+        self._postings: Dict[int, Dict[str, float]] = {}
+        self._docs: Dict[str, _Doc] = {}
+        self._total_length = 0.0
+        # term → BM25 term-frequency parts (see _scored_term), filled on first query of the
+        # term; dropped per term when its postings change, and entirely when the average length drifts
+        self._scored: Dict[int, Tuple[Dict[str, float], List[Tuple[float, str]]]] = {}
+        self._scored_avg_length = 0.0
+        self._synced_at: Optional[datetime] = None
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ─── UPDATES ─────────────────────────────────────────────────────────────
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = self._term_ids[term] = len(self._terms)
+            self._terms.append(term)
+        return term_id
+
+    def put(self, article: dict) -> None:
+        """Index a created or updated article; drafts are removed"""
+        article_id = str(article["_id"])
+        self.remove(article_id)
+        if article.get("status") != PUBLISHED:
+            return
+
+        weights: Dict[int, float] = {}
+        length = 0.0
+        for field in ("title", "category"):
+            for term in tokenize(article.get(field, "")):
+                term_id = self._term_id(term)
+                weights[term_id] = weights.get(term_id, 0.0) + FIELD_WEIGHTS[field]
+                length += FIELD_WEIGHTS[field]
+
+        content = article.get("content", "")
+        content_terms, starts, ends = array("I"), array("I"), array("I")
+        for m in WORD.finditer(content):
+            term_id = self._term_id(fold(m.group()))
+            content_terms.append(term_id)
+            starts.append(m.start())
+            ends.append(m.end())
+            weights[term_id] = weights.get(term_id, 0.0) + FIELD_WEIGHTS["content"]
+        length += len(content_terms) * FIELD_WEIGHTS["content"]
+
+        created_at = article.get("created_at")
+        self._add(_Doc(
+            id=article_id,
+            title=article.get("title", ""),
+            category=article.get("category", ""),
+            content=content,
+            date=created_at.strftime("%b %d, %Y") if isinstance(created_at, datetime) else "",
+            updated_at=_timestamp(article.get("updated_at")),
+            length=length,
+            weights=weights,
+            content_terms=content_terms,
+            starts=starts,
+            ends=ends,
+        ))
+
+    def _add(self, doc: _Doc) -> None:
+        self._docs[doc.id] = doc
+        self._total_length += doc.length
+        for term_id, weight in doc.weights.items():
+            postings = self._postings.get(term_id)
+            if postings is None:
+                postings = self._postings[term_id] = {}
+                insort(self._vocabulary, self._terms[term_id])
+            postings[doc.id] = weight
+            self._scored.pop(term_id, None)
+        self._dirty = True
+
+    def remove(self, article_id: str) -> None:
+        doc = self._docs.pop(article_id, None)
+        if doc is None:
+            return
+        self._total_length -= doc.length
+        for term_id in doc.weights:
+            postings = self._postings[term_id]
+            del postings[article_id]
+            self._scored.pop(term_id, None)
+            if not postings:
+                del self._postings[term_id]
+                term = self._terms[term_id]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+        self._dirty = True
+
+    # ─── QUERIES ─────────────────────────────────────────────────────────────
+
+    def _expand(self, prefix: str) -> List[int]:
+        """Indexed terms starting with prefix; the most common ones if there are too many"""
+        vocabulary = self._vocabulary
+        i = bisect_left(vocabulary, prefix)
+        matches = []
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            matches.append(self._term_ids[vocabulary[i]])
+            i += 1
+        if len(matches) > MAX_EXPANSIONS:
+            matches = heapq.nlargest(MAX_EXPANSIONS, matches, key=lambda t: len(self._postings[t]))
+        return matches
+
+    def search(self, query: str, limit: int = 10, prefix: bool = True) -> List[dict]:
+        """
+        Published articles matching the query, best first, with the matched
+        words marked up in the title and a snippet of the content.
+        """
+        words = tokenize(query)
+        if not words or not self._docs:
+            return []
+
+        # Each word scores as its best-matching alternative, so a prefix that
+        # expands to many terms does not outweigh a whole word
+        groups = {
+            word: [self._term_ids[word]] if self._term_ids.get(word) in self._postings else []
+            for word in words
+        }
+        last = words[-1]
+        if prefix and query[-1:].isalnum() and len(last) >= PREFIX_MIN_CHARS:
+            groups[last] = list(dict.fromkeys(groups[last] + self._expand(last)))
+
+        n = len(self._docs)
+        avg_length = self._total_length / n
+        if abs(avg_length - self._scored_avg_length) > 0.02 * self._scored_avg_length:
+            self._scored.clear()
+            self._scored_avg_length = avg_length
+
+        groups = [group for group in groups.values() if group]
+        if not groups:
+            return []
+        idf = {}
+        for group in groups:
+            for term_id in group:
+                df = len(self._postings[term_id])
+                idf[term_id] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+        top = self._top(groups, idf, limit)
+        matched = {term_id for group in groups for term_id in group}
+        matched_terms = {self._terms[t] for t in matched}
+        return [self._hit(self._docs[doc_id], score, matched, matched_terms) for score, doc_id in top]
+
+    def _top(self, groups: List[List[int]], idf: Dict[int, float], limit: int) -> List[Tuple[float, str]]:
+        """
+        The `limit` best articles by summed group score, using the threshold
+        algorithm: each group's postings are read in descending score order,
+        every newly seen article is scored in full, and reading stops once
+        the k-th best score reaches the most any unseen article could get.
+        Frequent terms therefore cost about as much as rare ones.
+        """
+        streams = [self._group_stream(group, idf) for group in groups]
+        frontier = [math.inf] * len(groups)
+        seen: Set[str] = set()
+        top: List[Tuple[float, str]] = []
+        while True:
+            progressed = False
+            for g, stream in enumerate(streams):
+                if frontier[g] == 0.0:
+                    continue
+                item = next(stream, None)
+                if item is None:
+                    frontier[g] = 0.0
+                    continue
+                progressed = True
+                score, doc_id = item
+                frontier[g] = score
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                total = score + sum(
+                    self._group_score(other, idf, doc_id) for h, other in enumerate(groups) if h != g
+                )
+                if len(top) < limit:
+                    heapq.heappush(top, (total, doc_id))
+                elif total > top[0][0]:
+                    heapq.heapreplace(top, (total, doc_id))
+            if not progressed or (len(top) == limit and top[0][0] >= sum(frontier)):
+                break
+        return sorted(top, reverse=True)
+
+    def _group_stream(self, group: List[int], idf: Dict[int, float]) -> Iterator[Tuple[float, str]]:
+        """(score, article) for a word's alternatives, highest first"""
+        if len(group) == 1:
+            weight = idf[group[0]]
+            return ((weight * part, doc_id) for part, doc_id in self._term_impacts(group[0]))
+        # An article's group score is its best alternative, which the merge yields first
+        return heapq.merge(
+            *[((idf[t] * part, doc_id) for part, doc_id in self._term_impacts(t)) for t in group],
+            key=lambda item: -item[0],
+        )
+
+    def _group_score(self, group: List[int], idf: Dict[int, float], doc_id: str) -> float:
+        return max(idf[t] * self._term_scores(t).get(doc_id, 0.0) for t in group)
+
+    def _term_scores(self, term_id: int) -> Dict[str, float]:
+        return self._scored_term(term_id)[0]
+
+    def _term_impacts(self, term_id: int) -> List[Tuple[float, str]]:
+        return self._scored_term(term_id)[1]
+
+    def _scored_term(self, term_id: int) -> Tuple[Dict[str, float], List[Tuple[float, str]]]:
+        """A term's BM25 term-frequency parts by article, and the same sorted highest first"""
+        scored = self._scored.get(term_id)
+        if scored is None:
+            docs = self._docs
+            base = K1 * (1 - B)
+            per_length = K1 * B / self._scored_avg_length
+            parts = {
+                doc_id: tf * (K1 + 1) / (tf + base + per_length * docs[doc_id].length)
+                for doc_id, tf in self._postings[term_id].items()
+            }
+            impacts = sorted(((part, doc_id) for doc_id, part in parts.items()), reverse=True)
+            scored = self._scored[term_id] = (parts, impacts)
+        return scored
+
+    def _hit(self, doc: _Doc, score: float, matched: Set[int], matched_terms: Set[str]) -> dict:
+        return {
+            "id": doc.id,
+            "title": doc.title,
+            "title_highlighted": highlight(doc.title, matched_terms),
+            "category": doc.category,
+            "date": doc.date,
+            "snippet": self._snippet(doc, matched, matched_terms),
+            "score": round(score, 4),
+        }
+
+    def _snippet(self, doc: _Doc, matched: Set[int], matched_terms: Set[str]) -> str:
+        if not doc.content_terms:
+            return ""
+        first = len(doc.content_terms)
+        for term_id in matched:
+            if term_id in doc.weights:
+                try:
+                    first = min(first, doc.content_terms.index(term_id, 0, first))
+                except ValueError:
+                    pass
+        if first == len(doc.content_terms):
+            first = 0
+        start = max(0, first - SNIPPET_LEAD) if first else 0
+        end = min(len(doc.content_terms), start + SNIPPET_WORDS)
+        text = doc.content[doc.starts[start]:doc.ends[end - 1]]
+        return ("…" if start else "") + highlight(text, matched_terms) + ("…" if end < len(doc.content_terms) else "")
+
+    # ─── SYNC ────────────────────────────────────────────────────────────────
+
+    async def sync(self) -> int:
+        """Apply articles changed since the last sync; returns how many were (re)indexed or removed"""
+        started = datetime.now(timezone.utc)
+        collection = await get_collection("articles")
+        published = {str(doc["_id"]) async for doc in collection.find({"status": PUBLISHED}, {"_id": 1})}
+
+        changes = 0
+        for article_id in set(self._docs) - published:
+            self.remove(article_id)
+            changes += 1
+
+        query = {"status": PUBLISHED}
+        if self._synced_at is not None:
+            query["updated_at"] = {"$gte": self._synced_at - SYNC_OVERLAP}
+        async for article in collection.find(query):
+            doc = self._docs.get(str(article["_id"]))
+            if doc is None or doc.updated_at != _timestamp(article.get("updated_at")):
+                self.put(article)
+                changes += 1
+
+        # Published before the window but never seen, e.g. a snapshot from before they existed
+        missing = [a for a in published if a not in self._docs]
+        if missing:
+            async for article in collection.find({"_id": {"$in": [ObjectId(a) for a in missing]}}):
+                self.put(article)
+                changes += 1
+
+        self._synced_at = started
+        metrics.set_gauge("search.documents", len(self._docs))
+        metrics.set_gauge("search.terms", len(self._vocabulary))
+        return changes
+
+    # ─── SNAPSHOTS ───────────────────────────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        """Write the index to path atomically"""
+        docs = [
+            {
+                "id": d.id, "title": d.title, "category": d.category, "content": d.content,
+                "date": d.date, "updated_at": d.updated_at, "length": d.length,
+                "weights": [[t, w] for t, w in d.weights.items()],
+                "content_terms": _pack(d.content_terms), "starts": _pack(d.starts), "ends": _pack(d.ends),
+            }
+            for d in self._docs.values()
+        ]
+        snapshot = {
+            "version": INDEX_VERSION,
+            "synced_at": self._synced_at.isoformat() if self._synced_at else None,
+            "terms": self._terms,
+            "docs": docs,
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as raw:
+            with gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            # On disk before the rename, so a crash never leaves a truncated snapshot behind
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp, path)
+        self._dirty = False
+
+    def load(self, path: str) -> bool:
+        """
+        Replace the index with a saved snapshot; False if there is no usable
+        one. The snapshot is only a cache, so a damaged one — truncated,
+        corrupt or of the wrong shape — is logged and leaves an empty index
+        for sync() to rebuild.
+        """
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable search snapshot {path}: {e}")
+            return False
+        if not isinstance(snapshot, dict) or snapshot.get("version") != INDEX_VERSION:
+            return False
+
+        self.__init__()
+        try:
+            self._load_snapshot(snapshot)
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring malformed search snapshot {path}: {e!r}")
+            self.__init__()
+            return False
+        return True
+
+    def _load_snapshot(self, snapshot: dict) -> None:
+        self._terms = snapshot["terms"]
+        self._term_ids = {term: i for i, term in enumerate(self._terms)}
+        postings: Dict[int, Dict[str, float]] = {}
+        for d in snapshot["docs"]:
+            doc = _Doc(
+                id=d["id"], title=d["title"], category=d["category"], content=d["content"],
+                date=d["date"], updated_at=d["updated_at"], length=d["length"],
+                weights={t: w for t, w in d["weights"]},
+                content_terms=_unpack(d["content_terms"]), starts=_unpack(d["starts"]), ends=_unpack(d["ends"]),
+            )
+            self._docs[doc.id] = doc
+            self._total_length += doc.length
+            for term_id, weight in doc.weights.items():
+                postings.setdefault(term_id, {})[doc.id] = weight
+        self._postings = postings
+        self._vocabulary = sorted(self._terms[t] for t in postings)
+        if snapshot["synced_at"]:
+            self._synced_at = datetime.fromisoformat(snapshot["synced_at"])
+
+    # ─── LIFECYCLE ───────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        path = settings.ARTICLE_SEARCH_SNAPSHOT_PATH
+        started = time.perf_counter()
+        loaded = bool(path) and self.load(path)
+        try:
+            changes = await self.sync()
+            logger.info(
+                f"✅ Search index ready with {len(self._docs)} articles "
+                f"({'snapshot + ' if loaded else ''}{changes} indexed, {time.perf_counter() - started:.2f}s)"
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Search index sync failed, will retry: {e}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._save_if_dirty()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ARTICLE_SNAPSHOT_REFRESH_SECONDS)
+            try:
+                await self.sync()
+                self._save_if_dirty()
+            except Exception as e:
+                logger.error(f"❌ Search index sync failed: {e}")
+
+    def _save_if_dirty(self) -> None:
+        path = settings.ARTICLE_SEARCH_SNAPSHOT_PATH
+        if path and self._dirty:
+            try:
+                self.save(path)
+            except OSError as e:
+                logger.warning(f"⚠️ Failed to save search snapshot {path}: {e}")
+
+
+def _pack(values: array) -> str:
+    return base64.b64encode(values.tobytes()).decode()
+
+
+def _unpack(packed: str) -> array:
+    values = array("I")
+    values.frombytes(base64.b64decode(packed))
+    return values
+
+
+def _timestamp(value) -> Optional[float]:
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    # Milliseconds, as stored by MongoDB
+    return round(value.timestamp(), 3)
+
+
+article_search = ArticleSearchIndex()
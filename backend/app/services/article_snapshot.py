@@ -0,0 +1,155 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.http_cache import Representation
+from app.core.metrics import metrics
+from app.db.mongodb import get_collection
+from app.models.article import public_article_helper
+
+logger = logging.getLogger(__name__)
+
+PUBLISHED = "Published"
+NEWEST_FIRST = [("created_at", -1), ("_id", -1)]
+
+
+def _render(payload: dict, last_modified: Optional[datetime]) -> Representation:
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":"), ensure_ascii=False).encode()
+    return Representation(body, last_modified)
+
+
+def _newest(*times: Optional[datetime]) -> Optional[datetime]:
+    aware = [t if t.tzinfo else t.replace(tzinfo=timezone.utc) for t in times if isinstance(t, datetime)]
+    return max(aware, default=None)
+
+
+def render_list(articles: List[dict], removed_at: Optional[datetime] = None) -> Representation:
+    """Articles already in display order (newest first)"""
+    data = [public_article_helper(article, full=False) for article in articles]
+    last_modified = _newest(removed_at, *(article.get("updated_at") for article in articles))
+    return _render({"success": True, "data": data, "total": len(data)}, last_modified)
+
+
+def render_detail(article: dict) -> Representation:
+    return _render({"success": True, "data": public_article_helper(article)}, article.get("updated_at"))
+
+
+async def fetch_published(category: Optional[str] = None) -> List[dict]:
+    """Published articles straight from MongoDB, newest first"""
+    query = {"status": PUBLISHED}
+    if category is not None:
+        query["category"] = category
+    collection = await get_collection("articles")
+    return await collection.find(query).sort(NEWEST_FIRST).to_list(length=None)
+
+
+class ArticleSnapshot:
+    """
+    Every published article, held in memory with its responses pre-rendered.
+
+    The public article routes answer from here without touching MongoDB.
+    Admin writes in this process patch the snapshot straight away (put /
+    remove); changes made through other workers show up after the next
+    reload, every ARTICLE_SNAPSHOT_REFRESH_SECONDS. List responses are
+    rendered on first request and dropped whenever an article changes.
+    """
+
+    def __init__(self):
+        self._articles: Dict[str, dict] = {}
+        self._details: Dict[str, Representation] = {}
+        self._lists: Dict[Optional[str], Representation] = {}
+        # When an article last left the snapshot; deletions move a list's Last-Modified too
+        self._removed_at: Optional[datetime] = None
+        self._loaded = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self) -> None:
+        articles = await fetch_published()
+        ids = {str(article["_id"]) for article in articles}
+        if self._loaded and set(self._articles) - ids:
+            self._removed_at = datetime.now(timezone.utc)
+        self._articles = {str(article["_id"]): article for article in articles}
+        self._details = {article_id: render_detail(article) for article_id, article in self._articles.items()}
+        self._lists = {}
+        self._loaded = True
+        metrics.set_gauge("articles.snapshot_size", len(self._articles))
+
+    def put(self, article: dict) -> None:
+        """Apply a created or updated article"""
+        article_id = str(article["_id"])
+        if article.get("status") != PUBLISHED:
+            self.remove(article_id)
+            return
+        self._articles[article_id] = article
+        self._details[article_id] = render_detail(article)
+        self._lists = {}
+
+    def remove(self, article_id: str) -> None:
+        if self._articles.pop(article_id, None) is not None:
+            self._details.pop(article_id, None)
+            self._removed_at = datetime.now(timezone.utc)
+            self._lists = {}
+
+    # ─── READS ───────────────────────────────────────────────────────────────
+
+    async def listing(self, category: Optional[str] = None) -> Representation:
+        await self._ensure_loaded()
+        cached = self._lists.get(category)
+        if cached is not None:
+            metrics.inc("articles.snapshot_hits")
+            return cached
+        articles = sorted(
+            (a for a in self._articles.values() if category is None or a.get("category") == category),
+            key=lambda a: (_newest(a.get("created_at")) or datetime.min.replace(tzinfo=timezone.utc), a["_id"]),
+            reverse=True,
+        )
+        representation = render_list(articles, self._removed_at)
+        # Only keep lists for categories that exist, so arbitrary ?category= values cannot grow the cache
+        if articles or category is None:
+            self._lists[category] = representation
+        return representation
+
+    async def detail(self, article_id: str) -> Optional[Representation]:
+        await self._ensure_loaded()
+        return self._details.get(article_id)
+
+    async def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            await self.load()
+
+    # ─── LIFECYCLE ───────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        if not settings.ARTICLE_SNAPSHOT_ENABLED or self._task is not None:
+            return
+        try:
+            await self.load()
+            logger.info(f"✅ Article snapshot loaded with {len(self._articles)} published articles")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load article snapshot, will retry on first request: {e}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ARTICLE_SNAPSHOT_REFRESH_SECONDS)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"❌ Article snapshot reload failed: {e}")
+
+
+article_snapshot = ArticleSnapshot()
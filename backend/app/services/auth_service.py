@@ -1,11 +1,26 @@
 from datetime import datetime, timezone
 from fastapi import HTTPException, status
 
+from app.core.metrics import metrics
 from app.db.mongodb import get_database
-from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token
+from app.core.security import hash_password, create_access_token, create_refresh_token
+from app.core.hashing import password_hasher
 from app.schemas.user import UserRegister, UserLogin, Token
 
 
+def access_claims(user: dict) -> dict:
+    """
+    Claims of an access token. Besides "sub" they carry what authorization
+    needs, so AUTH_STATELESS_TOKENS can skip the user lookup.
+    """
+    return {
+        "sub": str(user["_id"]),
+        "active": user.get("is_active", True),
+        "admin": user.get("is_admin", False),
+        "ver": user.get("token_version", 0),
+    }
+
+
 async def register_user(data: UserRegister) -> Token:
     db = await get_database()
 
@@ -20,17 +35,19 @@ async def register_user(data: UserRegister) -> Token:
     user_doc = {
         "full_name": data.full_name,
         "email": data.email,
-        "hashed_password": hash_password(data.password),
+        "hashed_password": await hash_password(data.password),
         "is_active": True,
         "is_admin": False,
+        "token_version": 0,
         "created_at": now,
         "updated_at": now,
     }
 
     result = await db["users"].insert_one(user_doc)
+    user_doc["_id"] = result.inserted_id
     user_id = str(result.inserted_id)
 
-    access_token = create_access_token(data={"sub": user_id})
+    access_token = create_access_token(data=access_claims(user_doc))
     refresh_token = create_refresh_token(data={"sub": user_id})
 
     return Token(access_token=access_token, refresh_token=refresh_token)
@@ -50,7 +67,8 @@ async def login_user(data: UserLogin) -> Token:
     if not user:
         raise invalid_creds
 
-    if not verify_password(data.password, user["hashed_password"]):
+    valid, new_hash = await password_hasher.verify_and_update(data.password, user["hashed_password"])
+    if not valid:
         raise invalid_creds
 
     if not user.get("is_active", True):
@@ -59,9 +77,19 @@ async def login_user(data: UserLogin) -> Token:
             detail="This account has been deactivated.",
         )
 
+    if new_hash is not None:
+        # BCRYPT_ROUNDS changed since this hash was made — store it at the new cost,
+        # unless the password was changed meanwhile
+        await db["users"].update_one(
+            {"_id": user["_id"], "hashed_password": user["hashed_password"]},
+            {"$set": {"hashed_password": new_hash}},
+        )
+        metrics.inc("password_hash.upgraded")
+
     user_id = str(user["_id"])
 
-    access_token = create_access_token(data={"sub": user_id})
+    access_token = create_access_token(data=access_claims(user))
     refresh_token = create_refresh_token(data={"sub": user_id})
 
     return Token(access_token=access_token, refresh_token=refresh_token)
+
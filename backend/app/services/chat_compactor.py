@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.mongodb import get_database
+from app.services import chat_store
+from app.services.context_service import count_tokens, MESSAGE_TOKEN_OVERHEAD
+from app.services.session_cache import session_cache, SessionState
+
+logger = logging.getLogger(__name__)
+
+# Called with (previous summary or None, messages to fold in); returns the new summary
+Summarizer = Callable[[Optional[str], List[dict]], Awaitable[str]]
+
+
+async def _default_summarizer(previous_summary: Optional[str], messages: List[dict]) -> str:
+    # Imported lazily — ai_service builds the OpenAI client on import
+    from app.services.ai_service import summarize_conversation
+
+    return await summarize_conversation(previous_summary, messages)
+
+
+class ChatCompactor:
+    """
+    Background summarization of long chat sessions.
+
+    Once a session has CHAT_COMPACT_TRIGGER_MESSAGES messages (or
+    CHAT_COMPACT_TRIGGER_TOKENS tokens) not covered by its summary, all but
+    the newest CHAT_COMPACT_KEEP_RECENT stored messages are folded into a
+    rolling summary kept on the session document (summary, summary_upto).
+    lola_chat then sends the summary plus the recent turns.
+
+    Jobs run one at a time on a background task, never on the request path.
+    Each job reads its range from MongoDB and writes the summary only if
+    summary_upto has not moved meanwhile, so running it twice — or on two
+    workers — changes nothing.
+    """
+
+    def __init__(self, summarizer: Optional[Summarizer] = None):
+        self.summarizer = summarizer or _default_summarizer
+        # session_id → state of the sessions waiting for a compaction
+        self._queued: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    # ─── LIFECYCLE ───────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._task is None and settings.CHAT_COMPACT_ENABLED:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker; queued sessions are picked up again on their next turn"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._queued.clear()
+
+    # ─── TRIGGERS ────────────────────────────────────────────────────────────
+
+    def needs_compaction(self, state: SessionState) -> bool:
+        # The newest CHAT_COMPACT_KEEP_RECENT messages are never summarized
+        if state.total - settings.CHAT_COMPACT_KEEP_RECENT <= state.summary_upto:
+            return False
+        if state.total - state.summary_upto >= settings.CHAT_COMPACT_TRIGGER_MESSAGES:
+            return True
+        tokens = sum(
+            count_tokens(m["content"]) + MESSAGE_TOKEN_OVERHEAD for m in state.unsummarized()
+        )
+        return tokens >= settings.CHAT_COMPACT_TRIGGER_TOKENS
+
+    def notify(self, state: SessionState) -> None:
+        """Queue a compaction of the session if it has grown past a threshold"""
+        if self._task is None or state.session_id in self._queued:
+            return
+        if not self.needs_compaction(state):
+            return
+        self._queued[state.session_id] = state
+        metrics.inc("chat_compactor.queued")
+        metrics.set_gauge("chat_compactor.pending", len(self._queued))
+        self._wakeup.set()
+
+    # ─── WORKER ──────────────────────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queued:
+                _, state = self._queued.popitem(last=False)
+                metrics.set_gauge("chat_compactor.pending", len(self._queued))
+                try:
+                    await self.compact(state)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    metrics.inc("chat_compactor.failed")
+                    logger.warning(f"⚠️ Compaction of chat session {state.session_id} failed: {e}")
+
+    async def compact(self, state: SessionState) -> bool:
+        """Summarize the session's older messages; returns False if there was nothing to do"""
+        db = await get_database()
+        session = await db[chat_store.SESSIONS].find_one(
+            {"session_id": state.session_id},
+            {"session_id": 1, "storage": 1, "message_count": 1, "summary": 1, "summary_upto": 1},
+        )
+        if session is None:
+            # Not flushed yet, or deleted
+            return False
+
+        # Only messages already in MongoDB are summarized
+        previous_upto = session.get("summary_upto", 0)
+        upto = session.get("message_count", 0) - settings.CHAT_COMPACT_KEEP_RECENT
+        if upto <= previous_upto:
+            return False
+
+        messages = await chat_store.load_range(db, session, previous_upto, upto)
+        if len(messages) != upto - previous_upto:
+            return False
+
+        summary = await self.summarizer(
+            session.get("summary"),
+            [{"role": m["role"], "content": m["content"]} for m in messages],
+        )
+        if not summary:
+            return False
+
+        # Conditional on summary_upto, so a concurrent or repeated job is a no-op
+        result = await db[chat_store.SESSIONS].update_one(
+            {
+                "session_id": state.session_id,
+                "summary_upto": previous_upto if previous_upto else {"$in": [0, None]},
+            },
+            {"$set": {
+                "summary": summary,
+                "summary_upto": upto,
+                "summary_updated_at": datetime.now(timezone.utc),
+            }},
+        )
+        if not result.modified_count:
+            metrics.inc("chat_compactor.conflicts")
+            return False
+
+        if upto > state.summary_upto:
+            state.set_summary(summary, upto)
+            session_cache.resize(state)
+        metrics.inc("chat_compactor.compacted")
+        metrics.inc("chat_compactor.messages_summarized", upto - previous_upto)
+        return True
+
+
+chat_compactor = ChatCompactor()
@@ -0,0 +1,407 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SESSIONS = "chat_sessions"
+BUCKETS = "chat_message_buckets"
+
+STORAGE_EMBEDDED = "embedded"
+STORAGE_BUCKETED = "bucketed"
+
+# Bucket writes whose message indexes are already reserved: (seq, messages)
+Chunks = List[Tuple[int, List[dict]]]
+
+
+# ─── LAYOUT ──────────────────────────────────────────────────────────────────
+#
+# embedded  — chat_sessions.messages holds every message (original layout)
+# bucketed  — chat_sessions holds no messages array; messages live in
+#             chat_message_buckets documents of CHAT_BUCKET_SIZE messages,
+#             keyed by (session_id, seq) where seq = message index // size
+#
+# Each session records its own layout in the "storage" field, so sessions
+# keep working while a migration is in progress. Both layouts keep a
+# message_count; embedded sessions created before it existed get it
+# backfilled on first read.
+
+def is_bucketed(session: dict) -> bool:
+    return session.get("storage") == STORAGE_BUCKETED
+
+
+def is_deleted(session: dict) -> bool:
+    """True for the in-memory header of a session deleted while it was in use"""
+    return session.get("deleted", False)
+
+
+def bucket_seq(index: int) -> int:
+    return index // settings.CHAT_BUCKET_SIZE
+
+
+def make_message(role: str, content: str, **extra) -> dict:
+    return {
+        "role": role,
+        "content": content,
+        "timestamp": datetime.now(timezone.utc),
+        **extra,
+    }
+
+
+# ─── SESSIONS ────────────────────────────────────────────────────────────────
+
+async def create_session(db: AsyncIOMotorDatabase, session_id: str, user_id: Optional[str]) -> dict:
+    now = datetime.now(timezone.utc)
+    session_doc = {
+        "session_id": session_id,
+        "user_id": user_id,
+        "storage": settings.CHAT_STORAGE_MODE,
+        "message_count": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+    if settings.CHAT_STORAGE_MODE != STORAGE_BUCKETED:
+        session_doc["messages"] = []
+    result = await db[SESSIONS].insert_one(session_doc)
+    session_doc["_id"] = result.inserted_id
+    return session_doc
+
+
+def new_session_header(session_id: str, user_id: Optional[str]) -> dict:
+    """Describe a session that has not been written yet (see bulk_append)"""
+    return {
+        "session_id": session_id,
+        "user_id": user_id,
+        "storage": settings.CHAT_STORAGE_MODE,
+    }
+
+
+async def delete_session(db: AsyncIOMotorDatabase, session_id: str) -> bool:
+    result = await db[SESSIONS].delete_one({"session_id": session_id})
+    await db[BUCKETS].delete_many({"session_id": session_id})
+    return result.deleted_count > 0
+
+
+# ─── READS ───────────────────────────────────────────────────────────────────
+
+async def load_recent(
+    db: AsyncIOMotorDatabase,
+    session_id: str,
+    limit: int,
+) -> Tuple[Optional[dict], List[dict]]:
+    """
+    Fetch the session header and its last `limit` messages.
+    Embedded sessions use a $slice projection; bucketed sessions read only
+    the newest buckets.
+
+    Returns:
+        (session, messages) — session is None if it does not exist
+    """
+    session = await db[SESSIONS].find_one(
+        {"session_id": session_id},
+        {
+            "_id": 1,
+            "session_id": 1,
+            "storage": 1,
+            "message_count": 1,
+            "summary": 1,
+            "summary_upto": 1,
+            "messages": {"$slice": -limit},
+        },
+    )
+    if session is None:
+        return None, []
+
+    if not is_bucketed(session):
+        if "message_count" not in session:
+            session["message_count"] = await backfill_message_count(db, session_id)
+        return session, session.pop("messages", [])
+
+    count = session.get("message_count", 0)
+    if count == 0:
+        return session, []
+
+    first_seq = bucket_seq(max(count - limit, 0))
+    messages = []
+    cursor = db[BUCKETS].find(
+        {"session_id": session_id, "seq": {"$gte": first_seq}},
+        {"_id": 0, "messages": 1},
+    ).sort("seq", 1)
+    async for bucket in cursor:
+        messages.extend(bucket.get("messages", []))
+    return session, messages[-limit:]
+
+
+async def load_range(db: AsyncIOMotorDatabase, session: dict, start: int, end: int) -> List[dict]:
+    """Return messages [start, end) of a session"""
+    if end <= start:
+        return []
+    session_id = session["session_id"]
+
+    if not is_bucketed(session):
+        doc = await db[SESSIONS].find_one(
+            {"session_id": session_id},
+            {"_id": 1, "messages": {"$slice": [start, end - start]}},
+        )
+        return (doc or {}).get("messages", [])
+
+    first_seq = bucket_seq(start)
+    messages = []
+    cursor = db[BUCKETS].find(
+        {"session_id": session_id, "seq": {"$gte": first_seq, "$lte": bucket_seq(end - 1)}},
+        {"_id": 0, "messages": 1},
+    ).sort("seq", 1)
+    async for bucket in cursor:
+        messages.extend(bucket.get("messages", []))
+    offset = start - first_seq * settings.CHAT_BUCKET_SIZE
+    return messages[offset:offset + end - start]
+
+
+async def load_messages(db: AsyncIOMotorDatabase, session: dict) -> List[dict]:
+    """Return every message of a session, whatever its storage layout"""
+    if not is_bucketed(session):
+        return session.get("messages", [])
+
+    messages = []
+    cursor = db[BUCKETS].find(
+        {"session_id": session["session_id"]},
+        {"_id": 0, "messages": 1},
+    ).sort("seq", 1)
+    async for bucket in cursor:
+        messages.extend(bucket.get("messages", []))
+    return messages
+
+
+# ─── WRITES ──────────────────────────────────────────────────────────────────
+
+async def append_messages(db: AsyncIOMotorDatabase, session: dict, messages: List[dict]) -> None:
+    """Append messages to a session in its own storage layout"""
+    if not messages or is_deleted(session):
+        return
+    now = datetime.now(timezone.utc)
+    session_id = session["session_id"]
+
+    if not is_bucketed(session):
+        result = await db[SESSIONS].update_one(
+            {"session_id": session_id, "storage": {"$ne": STORAGE_BUCKETED}},
+            {
+                "$push": {"messages": {"$each": messages}},
+                "$inc": {"message_count": len(messages)},
+                "$set": {"updated_at": now},
+            }
+        )
+        if result.matched_count:
+            return
+        # Nothing matched: either the session is gone, or it was migrated
+        # to buckets after this header was read
+        if not await _migrated(db, session):
+            return
+
+    # Reserve message indexes atomically, then push into the matching buckets
+    before = await db[SESSIONS].find_one_and_update(
+        {"session_id": session_id},
+        {"$inc": {"message_count": len(messages)}, "$set": {"updated_at": now}},
+        projection={"message_count": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
+        # Deleted meanwhile — do not leave buckets behind without a session
+        return
+    start = before.get("message_count", 0)
+
+    for seq, chunk in split_into_buckets(start, messages):
+        await db[BUCKETS].update_one(
+            {"session_id": session_id, "seq": seq},
+            {
+                "$push": {"messages": {"$each": chunk}},
+                "$inc": {"count": len(chunk)},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"created_at": now},
+            },
+            upsert=True,
+        )
+
+
+async def backfill_message_count(db: AsyncIOMotorDatabase, session_id: str) -> int:
+    """Set message_count on an embedded session from before it was tracked"""
+    session = await db[SESSIONS].find_one_and_update(
+        {"session_id": session_id, "message_count": {"$exists": False}},
+        [{"$set": {"message_count": {"$size": {"$ifNull": ["$messages", []]}}}}],
+        projection={"message_count": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if session is None:
+        # Someone else backfilled it first
+        session = await db[SESSIONS].find_one({"session_id": session_id}, {"message_count": 1})
+    return (session or {}).get("message_count", 0)
+
+
+async def _migrated(db: AsyncIOMotorDatabase, session: dict) -> bool:
+    """
+    Re-read the layout of a session whose header says embedded; if it has
+    been migrated, switch the header to bucketed so later writes go there.
+    """
+    current = await db[SESSIONS].find_one({"session_id": session["session_id"]}, {"storage": 1})
+    if current is None or not is_bucketed(current):
+        return False
+    session["storage"] = STORAGE_BUCKETED
+    return True
+
+
+def split_into_buckets(start: int, messages: List[dict]) -> List[Tuple[int, List[dict]]]:
+    """Group messages starting at index `start` by the bucket they belong to"""
+    groups: List[Tuple[int, List[dict]]] = []
+    for offset, message in enumerate(messages):
+        seq = bucket_seq(start + offset)
+        if not groups or groups[-1][0] != seq:
+            groups.append((seq, []))
+        groups[-1][1].append(message)
+    return groups
+
+
+async def bulk_append(
+    db: AsyncIOMotorDatabase,
+    groups: List[Tuple[dict, List[dict], Chunks]],
+) -> Dict[int, Tuple[List[dict], Chunks]]:
+    """
+    Persist several sessions' new messages with one unordered bulk_write
+    per collection. Sessions that do not exist yet are created by upsert.
+
+    An embedded session migrated to buckets since its header was read no
+    longer matches the embedded push; its header is switched to bucketed
+    and the group goes through the bucketed path instead.
+
+    A bucketed session's message indexes are reserved before its buckets
+    are written, so a bucket write that fails must be retried with the
+    indexes it already has: reserving again would leave a gap, and pushing
+    the buckets that did get written again would duplicate them. What is
+    left of such a group comes back as chunks, written as they are.
+
+    Args:
+        groups: (session header, new messages, reserved chunks) — at most
+                one per session; chunks are from an earlier call's result
+
+    Returns:
+        for each group whose writes (partly) failed, by index into `groups`:
+        (messages still to reserve, chunks still to write), to pass back in
+    """
+    now = datetime.now(timezone.utc)
+    left: Dict[int, Tuple[List[dict], Chunks]] = {}
+
+    embedded = [(i, g) for i, g in enumerate(groups) if not is_bucketed(g[0])]
+    bucketed = [(i, g) for i, g in enumerate(groups) if is_bucketed(g[0])]
+
+    if embedded:
+        ops = [
+            UpdateOne(
+                {"session_id": session["session_id"], "storage": {"$ne": STORAGE_BUCKETED}},
+                {
+                    "$push": {"messages": {"$each": messages}},
+                    "$inc": {"message_count": len(messages)},
+                    "$set": {"updated_at": now},
+                    "$setOnInsert": {
+                        "user_id": session.get("user_id"),
+                        "storage": STORAGE_EMBEDDED,
+                        "created_at": now,
+                    },
+                },
+                upsert=True,
+            )
+            for _, (session, messages, _) in embedded
+        ]
+        try:
+            await db[SESSIONS].bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            errors = 0
+            for err in e.details.get("writeErrors", []):
+                i, (session, messages, chunks) = embedded[err["index"]]
+                # A bucketed session makes the upsert collide on session_id
+                if err.get("code") == 11000 and await _migrated(db, session):
+                    bucketed.append((i, (session, messages, chunks)))
+                else:
+                    left[i] = (messages, chunks)
+                    errors += 1
+            if errors:
+                logger.error(f"❌ Chat bulk write partially failed: {errors} errors")
+        except Exception as e:
+            left.update((i, (messages, chunks)) for i, (_, messages, chunks) in embedded)
+            logger.error(f"❌ Chat bulk write failed: {e}")
+
+    if not bucketed:
+        return left
+
+    # New messages need their indexes reserved first
+    reserving = [(i, (session, messages, chunks)) for i, (session, messages, chunks) in bucketed if messages]
+    reservations = await asyncio.gather(
+        *[
+            db[SESSIONS].find_one_and_update(
+                {"session_id": session["session_id"]},
+                {
+                    "$inc": {"message_count": len(messages)},
+                    "$set": {"updated_at": now},
+                    "$setOnInsert": {
+                        "user_id": session.get("user_id"),
+                        "storage": STORAGE_BUCKETED,
+                        "created_at": now,
+                    },
+                },
+                projection={"message_count": 1},
+                return_document=ReturnDocument.BEFORE,
+                upsert=True,
+            )
+            for _, (session, messages, _) in reserving
+        ],
+        return_exceptions=True,
+    )
+    reserved: Dict[int, Chunks] = {i: list(chunks) for i, (_, _, chunks) in bucketed}
+    for (i, (session, messages, _)), before in zip(reserving, reservations):
+        if isinstance(before, Exception):
+            logger.error(f"❌ Failed to reserve message slots for {session['session_id']}: {before}")
+            left[i] = (messages, [])
+            continue
+        start = (before or {}).get("message_count", 0)
+        for seq, chunk in split_into_buckets(start, messages):
+            if reserved[i] and reserved[i][-1][0] == seq:
+                # One push per bucket keeps the retried chunk ahead of the new one
+                reserved[i][-1] = (seq, reserved[i][-1][1] + chunk)
+            else:
+                reserved[i].append((seq, chunk))
+
+    ops = []
+    op_chunks = []  # op index → (group index, chunk)
+    for i, (session, _, _) in bucketed:
+        for seq, chunk in reserved[i]:
+            ops.append(UpdateOne(
+                {"session_id": session["session_id"], "seq": seq},
+                {
+                    "$push": {"messages": {"$each": chunk}},
+                    "$inc": {"count": len(chunk)},
+                    "$set": {"updated_at": now},
+                    "$setOnInsert": {"created_at": now},
+                },
+                upsert=True,
+            ))
+            op_chunks.append((i, (seq, chunk)))
+
+    failed_ops: List[int] = []
+    if ops:
+        try:
+            await db[BUCKETS].bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            failed_ops = sorted(err["index"] for err in e.details.get("writeErrors", []))
+            logger.error(f"❌ Chat bulk write partially failed: {len(failed_ops)} errors")
+        except Exception as e:
+            failed_ops = list(range(len(ops)))
+            logger.error(f"❌ Chat bulk write failed: {e}")
+
+    for op in failed_ops:
+        i, chunk = op_chunks[op]
+        left.setdefault(i, ([], []))[1].append(chunk)
+    return left
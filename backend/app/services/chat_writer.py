@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.mongodb import get_database
+from app.services import chat_store
+
+logger = logging.getLogger(__name__)
+
+
+class ChatWriteBuffer:
+    """
+    Write-behind buffer for chat messages.
+
+    The WebSocket handler enqueues messages and carries on streaming; a
+    background task persists everything queued — across all sessions — with
+    one unordered bulk_write every CHAT_WRITE_FLUSH_INTERVAL_MS, or sooner
+    once CHAT_WRITE_FLUSH_SIZE messages are waiting.
+
+    The buffer is bounded: when CHAT_WRITE_MAX_PENDING messages are waiting,
+    enqueue() blocks until a flush makes room instead of dropping anything.
+    Failed writes stay in the buffer and are retried on the next flush —
+    bucket writes together with the message indexes already reserved for
+    them (see chat_store.bulk_append).
+    """
+
+    def __init__(
+        self,
+        max_pending: Optional[int] = None,
+        flush_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.max_pending = max_pending or settings.CHAT_WRITE_MAX_PENDING
+        self.flush_size = flush_size or settings.CHAT_WRITE_FLUSH_SIZE
+        self.flush_interval = flush_interval or settings.CHAT_WRITE_FLUSH_INTERVAL_MS / 1000
+
+        # session_id → (session header, messages, reserved chunks), in arrival order
+        self._queued: "OrderedDict[str, tuple]" = OrderedDict()
+        # Messages taken by the running flush but not yet confirmed written
+        self._inflight: Dict[str, List[dict]] = {}
+        self._size = 0
+
+        self._changed = asyncio.Condition()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    # ─── LIFECYCLE ───────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, attempts: int = 3) -> None:
+        """Stop the flush loop and persist everything still buffered"""
+        self._stopping = True
+        if self._task is not None:
+            async with self._changed:
+                self._changed.notify_all()
+            await self._task
+            self._task = None
+
+        for _ in range(attempts):
+            if not self._size:
+                break
+            await self.flush()
+
+        if self._size:
+            logger.error(f"❌ Chat write buffer stopped with {self._size} unsaved messages")
+        else:
+            logger.info("✅ Chat write buffer flushed")
+
+    # ─── PRODUCERS ───────────────────────────────────────────────────────────
+
+    async def enqueue(self, session: dict, messages: List[dict]) -> None:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._size < self.max_pending)
+            if chat_store.is_deleted(session):
+                return
+
+            # Lets readers tell a buffered message from a stored copy of it
+            # (see context_service._merge_pending)
+            for message in messages:
+                message.setdefault("id", uuid.uuid4().hex)
+
+            session_id = session["session_id"]
+            if session_id in self._queued:
+                self._queued[session_id][1].extend(messages)
+            else:
+                self._queued[session_id] = (session, list(messages), [])
+            self._size += len(messages)
+            metrics.inc("chat_writer.enqueued", len(messages))
+            metrics.set_gauge("chat_writer.pending", self._size)
+
+            if self._size >= self.flush_size:
+                self._changed.notify_all()
+
+    async def discard(self, session_id: str) -> bool:
+        """
+        Drop the buffered messages of a session being deleted, once any
+        flush already writing them has finished; returns whether there
+        were any
+        """
+        async with self._flush_lock:
+            group = self._queued.pop(session_id, None)
+            if group is None:
+                return False
+            dropped = len(_messages(group[1], group[2]))
+            async with self._changed:
+                self._size -= dropped
+                metrics.inc("chat_writer.discarded", dropped)
+                metrics.set_gauge("chat_writer.pending", self._size)
+                self._changed.notify_all()
+            return True
+
+    def pending_for(self, session_id: str) -> List[dict]:
+        """Messages of a session that are buffered but not yet in MongoDB"""
+        queued = self._queued.get(session_id)
+        return self._inflight.get(session_id, []) + (_messages(queued[1], queued[2]) if queued else [])
+
+    # ─── FLUSHING ────────────────────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(
+                            lambda: self._stopping or self._size >= self.flush_size
+                        ),
+                        timeout=self.flush_interval,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            if self._size and not await self.flush():
+                # Back off instead of spinning while MongoDB is unavailable
+                await asyncio.sleep(self.flush_interval)
+
+    async def flush(self) -> bool:
+        """Write everything queued; returns False if some writes must be retried"""
+        async with self._flush_lock:
+            if not self._queued:
+                return True
+            batch = list(self._queued.values())
+            self._queued = OrderedDict()
+            self._inflight = {
+                session["session_id"]: _messages(messages, chunks) for session, messages, chunks in batch
+            }
+
+            try:
+                db = await get_database()
+                left = await chat_store.bulk_append(db, batch)
+            except Exception as e:
+                logger.error(f"❌ Chat write flush failed: {e}")
+                left = {i: (messages, chunks) for i, (_, messages, chunks) in enumerate(batch)}
+
+            retried = sum(len(_messages(*rest)) for rest in left.values())
+            written = sum(len(m) for m in self._inflight.values()) - retried
+
+            # What is left of failed groups goes back in front of anything queued meanwhile
+            retry = OrderedDict(
+                (batch[i][0]["session_id"], (batch[i][0], *left[i])) for i in sorted(left)
+            )
+            for session_id, (session, messages, chunks) in self._queued.items():
+                if session_id in retry:
+                    retry[session_id][1].extend(messages)
+                else:
+                    retry[session_id] = (session, messages, chunks)
+            self._queued = retry
+            self._inflight = {}
+
+            async with self._changed:
+                self._size -= written
+                metrics.inc("chat_writer.flushes")
+                metrics.inc("chat_writer.written", written)
+                metrics.inc("chat_writer.retried", retried)
+                metrics.set_gauge("chat_writer.pending", self._size)
+                self._changed.notify_all()
+            return not left
+
+
+def _messages(messages: List[dict], chunks: chat_store.Chunks) -> List[dict]:
+    """A group's messages in order: the reserved chunks come first"""
+    return [m for _, chunk in chunks for m in chunk] + messages
+
+
+write_buffer = ChatWriteBuffer()
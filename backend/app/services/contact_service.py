@@ -1,5 +1,4 @@
 import logging
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
@@ -7,6 +6,9 @@ from datetime import datetime
 from app.db.mongodb import get_collection
 from app.models.contact import ContactMessage
 from app.core.config import settings
+from app.services.mailer import mailer
+from app.services.notification_digest import notification_digest, PENDING
+from app.services.counters import dashboard_counters
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +19,10 @@ async def save_contact_message(data: ContactMessage) -> bool:
         collection = await get_collection("contact_messages")
         doc = data.dict()
         doc["created_at"] = datetime.utcnow()
+        if notification_digest.defers(data):
+            doc["notification"] = PENDING
         await collection.insert_one(doc)
+        await dashboard_counters.bump("contact_messages")
         logger.info(f"✅ Contact message saved from {data.email}")
         return True
     except Exception as e:
@@ -27,6 +32,11 @@ async def save_contact_message(data: ContactMessage) -> bool:
 
 async def send_contact_email_notification(data: ContactMessage) -> bool:
     """Send email notification when contact form is submitted"""
+    if notification_digest.defers(data):
+        # Goes out with the next digest instead
+        notification_digest.note()
+        return True
+
     try:
         msg = MIMEMultipart("alternative")
         msg["Subject"] = f"New Contact Form Submission from {data.surname} {data.lastName}"
@@ -65,12 +75,11 @@ async def send_contact_email_notification(data: ContactMessage) -> bool:
 
         msg.attach(MIMEText(html, "html"))
 
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            server.sendmail(settings.SMTP_FROM_EMAIL, settings.SMTP_NOTIFY_EMAIL, msg.as_string())
+        # Delivered in the background over the pooled SMTP connections
+        if mailer.submit(msg) is None:
+            return False
 
-        logger.info(f"✅ Contact notification email sent for {data.email}")
+        logger.info(f"✅ Contact notification email queued for {data.email}")
         return True
 
     except Exception as e:
@@ -0,0 +1,124 @@
+import logging
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.services import chat_store
+from app.services.chat_writer import write_buffer
+
+logger = logging.getLogger(__name__)
+
+# Fixed per-message cost of the chat completions format (role + separators)
+MESSAGE_TOKEN_OVERHEAD = 4
+
+# Used only when tiktoken is not installed — roughly one token per word or symbol
+_APPROX_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=1)
+def _get_encoder():
+    """Load the tiktoken encoder for the configured model, or None if unavailable"""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(settings.OPENAI_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"⚠️ tiktoken unavailable, using approximate token counts: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return len(_APPROX_TOKEN_RE.findall(text))
+
+
+def trim_to_budget(messages: List[dict], budget: int) -> List[dict]:
+    """
+    Keep the newest messages whose combined token count fits in the budget.
+    The newest message is always kept, even if it alone exceeds the budget.
+    """
+    kept = []
+    used = 0
+    for msg in reversed(messages):
+        cost = count_tokens(msg["content"]) + MESSAGE_TOKEN_OVERHEAD
+        if kept and used + cost > budget:
+            break
+        kept.append(msg)
+        used += cost
+    kept.reverse()
+    return kept
+
+
+async def load_recent_messages(
+    db: AsyncIOMotorDatabase,
+    session_id: str,
+    limit: Optional[int] = None,
+) -> Tuple[Optional[dict], List[dict]]:
+    """
+    Fetch only the last `limit` messages of a chat session.
+
+    Returns:
+        (session, messages) — session is None if it does not exist,
+        messages are {"role", "content"} dicts, including any still
+        waiting in the write-behind buffer (counted in message_count too)
+    """
+    limit = limit or settings.LOLA_CONTEXT_MAX_MESSAGES
+    session, messages = await chat_store.load_recent(db, session_id, limit)
+
+    # Messages still in the write-behind buffer are newer than anything stored
+    pending = write_buffer.pending_for(session_id)
+    if pending:
+        merged = _merge_pending(messages, pending)
+        if session is None:
+            session = chat_store.new_session_header(session_id, None)
+        session["message_count"] = session.get("message_count", 0) + len(merged) - len(messages)
+        messages = merged[-limit:]
+    return session, [
+        {"role": msg["role"], "content": msg["content"]}
+        for msg in messages
+    ]
+
+
+def _merge_pending(stored: List[dict], pending: List[dict]) -> List[dict]:
+    """
+    Append buffered messages to the stored ones, skipping any that a flush
+    running concurrently has already written. Those are always a prefix of
+    `pending`, recognized by the id the write buffer gives each message —
+    never by content, since a conversation may well repeat itself.
+    """
+    stored_ids = {msg["id"] for msg in stored if "id" in msg}
+    written = 0
+    for i, msg in enumerate(pending):
+        if msg.get("id") in stored_ids:
+            written = i + 1
+    return stored + pending[written:]
+
+
+def build_context(
+    recent_messages: List[dict],
+    user_message: str,
+    summary: Optional[str] = None,
+) -> List[dict]:
+    """
+    Append the new user message to the recent history and trim the result
+    to LOLA_CONTEXT_TOKEN_BUDGET tokens. A rolling summary of the earlier
+    conversation goes first and counts against the same budget.
+    """
+    history = recent_messages + [{"role": "user", "content": user_message}]
+    if not summary:
+        return trim_to_budget(history, settings.LOLA_CONTEXT_TOKEN_BUDGET)
+
+    summary_message = {
+        "role": "system",
+        "content": f"Summary of the earlier conversation: {summary}",
+    }
+    budget = settings.LOLA_CONTEXT_TOKEN_BUDGET - count_tokens(summary_message["content"]) - MESSAGE_TOKEN_OVERHEAD
+    return [summary_message] + trim_to_budget(history, budget)
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.mongodb import get_collection
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "counters"
+DASHBOARD = "dashboard"
+
+# counter name → collection it counts
+COUNTED = {
+    "articles": "articles",
+    "subscribers": "newsletter",
+    "contact_messages": "contact_messages",
+    "consultation_requests": "consultation_requests",
+}
+
+
+class DashboardCounters:
+    """
+    Document counts for the admin dashboard, kept in one counters document.
+
+    Write paths call bump() as they insert or delete, so reading the counts
+    is a single small find_one, and within COUNTERS_CACHE_TTL_SECONDS not
+    even that. Increments that get lost — a crash between a write and its
+    bump, or writes that slip in while a reconciliation counts — are
+    corrected every COUNTERS_RECONCILE_SECONDS by recounting the
+    collections.
+    """
+
+    def __init__(self):
+        self._cached: Optional[Dict[str, int]] = None
+        self._cached_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def bump(self, name: str, delta: int = 1) -> None:
+        """Adjust a counter after a write; never fails the write itself"""
+        try:
+            collection = await get_collection(COLLECTION)
+            await collection.update_one({"_id": DASHBOARD}, {"$inc": {name: delta}}, upsert=True)
+            if self._cached is not None:
+                self._cached[name] = self._cached.get(name, 0) + delta
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to update {name} counter, the next reconciliation will fix it: {e}")
+
+    async def read(self) -> Dict[str, int]:
+        if self._cached is not None and time.monotonic() - self._cached_at < settings.COUNTERS_CACHE_TTL_SECONDS:
+            metrics.inc("counters.cache_hits")
+            return dict(self._cached)
+        collection = await get_collection(COLLECTION)
+        doc = await collection.find_one({"_id": DASHBOARD})
+        if doc is None or any(name not in doc for name in COUNTED):
+            counts = await self.reconcile()
+        else:
+            counts = {name: doc[name] for name in COUNTED}
+        self._cached, self._cached_at = counts, time.monotonic()
+        return dict(counts)
+
+    async def reconcile(self) -> Dict[str, int]:
+        """Recount every collection and overwrite the counters"""
+        names = list(COUNTED)
+        collections = [await get_collection(COUNTED[name]) for name in names]
+        totals = await asyncio.gather(*[collection.count_documents({}) for collection in collections])
+        counts = dict(zip(names, totals))
+
+        counters = await get_collection(COLLECTION)
+        previous = await counters.find_one_and_update(
+            {"_id": DASHBOARD},
+            {"$set": {**counts, "reconciled_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        drift = sum(abs(counts[name] - (previous or {}).get(name, 0)) for name in names) if previous else 0
+        if drift:
+            metrics.inc("counters.drift", drift)
+            logger.warning(f"⚠️ Dashboard counters drifted by {drift}, corrected")
+        self._cached, self._cached_at = counts, time.monotonic()
+        return dict(counts)
+
+    # ─── LIFECYCLE ───────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"❌ Counter reconciliation failed: {e}")
+            await asyncio.sleep(settings.COUNTERS_RECONCILE_SECONDS)
+
+
+dashboard_counters = DashboardCounters()
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Called with (queue position, estimated wait in seconds) while a request waits
+QueuedCallback = Callable[[int, float], Awaitable[None]]
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request would wait longer than LLM_QUEUE_TIMEOUT_SECONDS"""
+
+    def __init__(self, estimated_wait: float):
+        super().__init__(f"Estimated wait of {estimated_wait:.1f}s exceeds the queue timeout")
+        self.estimated_wait = estimated_wait
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `per_minute` per minute"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)"""
+        self._refill()
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        """Take `amount`; a negative amount gives tokens back"""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class _Waiter:
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+        self.granted: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.moved = asyncio.Event()
+
+
+class LLMScheduler:
+    """
+    Global admission control for upstream LLM calls.
+
+    Requests are admitted strictly first-in first-out, once a concurrency
+    slot is free and both the requests-per-minute and tokens-per-minute
+    buckets can cover them. A request whose estimated wait exceeds
+    LLM_QUEUE_TIMEOUT_SECONDS is rejected up front instead of queueing.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self.queue_timeout = queue_timeout or settings.LLM_QUEUE_TIMEOUT_SECONDS
+        self._requests = TokenBucket(requests_per_minute or settings.LLM_REQUESTS_PER_MINUTE)
+        self._tokens = TokenBucket(tokens_per_minute or settings.LLM_TOKENS_PER_MINUTE)
+
+        self._active = 0
+        self._waiters: "deque[_Waiter]" = deque()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        # Moving average of how long an admitted call holds its slot
+        self._avg_service_time = 5.0
+
+    # ─── ESTIMATES ───────────────────────────────────────────────────────────
+
+    def estimate_wait(self, tokens: int, ahead: Optional[int] = None) -> float:
+        ahead = len(self._waiters) if ahead is None else ahead
+        queued_tokens = sum(w.tokens for w in list(self._waiters)[:ahead])
+
+        busy = max(0, self._active + ahead + 1 - self.max_concurrency)
+        slot_wait = busy / self.max_concurrency * self._avg_service_time
+        rpm_wait = self._requests.time_until(ahead + 1)
+        tpm_wait = self._tokens.time_until(queued_tokens + tokens)
+        return max(slot_wait, rpm_wait, tpm_wait)
+
+    # ─── ADMISSION ───────────────────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def admit(self, tokens: int, on_queued: Optional[QueuedCallback] = None):
+        """
+        Hold an admission slot for the duration of the block.
+
+        Yields a callable to report the actual token usage once known,
+        so the tokens-per-minute bucket can be corrected.
+        """
+        estimated = self.estimate_wait(tokens)
+        if estimated > self.queue_timeout:
+            metrics.inc("llm.rejected")
+            raise AdmissionRejected(estimated)
+
+        started = time.monotonic()
+        if not self._try_admit_now(tokens):
+            await self._wait_for_turn(tokens, on_queued)
+        waited = time.monotonic() - started
+        metrics.inc("llm.admitted")
+        metrics.inc("llm.queue_wait_ms", waited * 1000)
+
+        usage = {"tokens": tokens}
+
+        def report_usage(actual_tokens: int) -> None:
+            usage["tokens"] = actual_tokens
+
+        try:
+            yield report_usage
+        finally:
+            held = time.monotonic() - started - waited
+            self._avg_service_time = 0.9 * self._avg_service_time + 0.1 * held
+            self._tokens.take(usage["tokens"] - tokens)
+            self._active -= 1
+            metrics.set_gauge("llm.active", self._active)
+            self._wake()
+
+    def _try_admit_now(self, tokens: int) -> bool:
+        """Admit without queueing when nobody is waiting and capacity is free"""
+        if self._waiters or self._active >= self.max_concurrency:
+            return False
+        if self._requests.time_until(1) or self._tokens.time_until(min(tokens, self._tokens.capacity)):
+            return False
+        self._grant(tokens)
+        return True
+
+    def _grant(self, tokens: int) -> None:
+        self._requests.take(1)
+        self._tokens.take(tokens)
+        self._active += 1
+        metrics.set_gauge("llm.active", self._active)
+
+    async def _wait_for_turn(self, tokens: int, on_queued: Optional[QueuedCallback]) -> None:
+        waiter = _Waiter(tokens)
+        self._waiters.append(waiter)
+        metrics.set_gauge("llm.queue_depth", len(self._waiters))
+        self._wake()
+
+        deadline = time.monotonic() + self.queue_timeout
+        last_position = None
+        try:
+            while not waiter.granted.done():
+                position = self._waiters.index(waiter) + 1
+                if on_queued is not None and position != last_position:
+                    last_position = position
+                    await on_queued(position, round(self.estimate_wait(tokens, position - 1), 1))
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.inc("llm.rejected")
+                    raise AdmissionRejected(self.estimate_wait(tokens, position - 1))
+
+                waiter.moved.clear()
+                moved = asyncio.ensure_future(waiter.moved.wait())
+                try:
+                    await asyncio.wait(
+                        {waiter.granted, moved},
+                        timeout=remaining,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                finally:
+                    moved.cancel()
+        except BaseException:
+            if waiter.granted.done() and not waiter.granted.cancelled():
+                # Admitted while we were bailing out — hand the slot back
+                self._active -= 1
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._notify_positions()
+            waiter.granted.cancel()
+            self._wake()
+            raise
+
+    def _wake(self) -> None:
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def _notify_positions(self) -> None:
+        for w in self._waiters:
+            w.moved.set()
+        metrics.set_gauge("llm.queue_depth", len(self._waiters))
+
+    async def _dispatch(self) -> None:
+        """Admit waiters from the head of the queue as capacity allows"""
+        while self._waiters:
+            self._wakeup.clear()
+            head = self._waiters[0]
+
+            if self._active >= self.max_concurrency:
+                await self._wakeup.wait()
+                continue
+
+            # A single oversized request only has to wait for a full bucket
+            delay = max(
+                self._requests.time_until(1),
+                self._tokens.time_until(min(head.tokens, self._tokens.capacity)),
+            )
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._waiters.popleft()
+            self._grant(head.tokens)
+            head.granted.set_result(None)
+            self._notify_positions()
+
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from email.utils import getaddresses
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class OutgoingMail:
+    def __init__(self, msg: Message, from_addr: str, to_addrs: List[str]):
+        self.msg = msg
+        self.from_addr = from_addr
+        self.to_addrs = to_addrs
+        self.delivered: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def resolve(self, ok: bool) -> None:
+        # The sender may have stopped waiting
+        if not self.delivered.done():
+            self.delivered.set_result(ok)
+
+
+class SMTPConnection:
+    """
+    One persistent, authenticated SMTP connection. Its methods block, so
+    they run on the mailer's threads, and only one worker uses it at a time.
+    """
+
+    def __init__(self):
+        self.smtp: Optional[smtplib.SMTP] = None
+        self.last_used = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.smtp is not None
+
+    def open(self) -> None:
+        smtp = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS)
+        try:
+            smtp.ehlo()
+            if settings.SMTP_USE_TLS:
+                smtp.starttls()
+                smtp.ehlo()
+            if settings.SMTP_PASSWORD:
+                smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+        except Exception:
+            smtp.close()
+            raise
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        metrics.inc("mail.connects")
+
+    def send(self, mail: OutgoingMail) -> None:
+        if self.smtp is None:
+            self.open()
+        self.smtp.sendmail(mail.from_addr, mail.to_addrs, mail.msg.as_string())
+        self.last_used = time.monotonic()
+
+    def noop(self) -> bool:
+        """Keep an idle connection alive; False if the server dropped it"""
+        try:
+            code, _ = self.smtp.noop()
+            return code == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def close(self) -> None:
+        if self.smtp is None:
+            return
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
+        self.smtp = None
+
+
+class Mailer:
+    """
+    Asynchronous mail transport over a small pool of persistent SMTP connections.
+
+    submit() queues a message and returns at once; SMTP_POOL_SIZE workers
+    each own one connection, opened (STARTTLS + login) on first use and then
+    reused. Idle connections get a NOOP every SMTP_KEEPALIVE_SECONDS and are
+    closed after SMTP_IDLE_TIMEOUT_SECONDS. A dropped connection is reopened
+    and the message retried, up to MAIL_MAX_ATTEMPTS times; permanent (5xx)
+    rejections are not retried.
+    """
+
+    def __init__(self, pool_size: Optional[int] = None, max_queue: Optional[int] = None):
+        self.pool_size = pool_size or settings.SMTP_POOL_SIZE
+        self.max_queue = max_queue or settings.MAIL_QUEUE_MAX
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._connections: List[SMTPConnection] = []
+        self._workers: List[asyncio.Task] = []
+
+    # ─── LIFECYCLE ───────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="smtp")
+        self._connections = [SMTPConnection() for _ in range(self.pool_size)]
+        self._workers = [asyncio.create_task(self._work(conn)) for conn in self._connections]
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Deliver what is queued (for up to `timeout` seconds), then close the pool"""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"❌ Mailer stopped with {self._queue.qsize()} unsent emails")
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        for conn in self._connections:
+            await self._blocking(conn.close)
+        self._executor.shutdown(wait=False)
+        self._workers = []
+        self._connections = []
+
+    # ─── SENDING ─────────────────────────────────────────────────────────────
+
+    def submit(self, msg: Message) -> Optional[asyncio.Future]:
+        """
+        Queue a message for delivery to its To/Cc recipients without waiting.
+
+        Returns a future resolving to True once delivered (False if it
+        failed for good), or None if the queue is full.
+        """
+        mail = self._outgoing(msg)
+        try:
+            self._queue.put_nowait(mail)
+        except asyncio.QueueFull:
+            metrics.inc("mail.dropped")
+            logger.error(f"❌ Mail queue full, dropping email to {', '.join(mail.to_addrs)}")
+            return None
+        metrics.set_gauge("mail.queue_depth", self._queue.qsize())
+        return mail.delivered
+
+    async def enqueue(self, msg: Message) -> asyncio.Future:
+        """Like submit(), but waits for room in a full queue instead of dropping the message"""
+        mail = self._outgoing(msg)
+        await self._queue.put(mail)
+        metrics.set_gauge("mail.queue_depth", self._queue.qsize())
+        return mail.delivered
+
+    def _outgoing(self, msg: Message) -> OutgoingMail:
+        self.start()
+        to_addrs = [addr for _, addr in getaddresses(msg.get_all("To", []) + msg.get_all("Cc", []))]
+        return OutgoingMail(msg, msg["From"] or settings.SMTP_FROM_EMAIL, to_addrs)
+
+    async def send(self, msg: Message) -> bool:
+        """Queue a message and wait until it is delivered"""
+        delivered = self.submit(msg)
+        return bool(delivered is not None and await delivered)
+
+    # ─── WORKERS ─────────────────────────────────────────────────────────────
+
+    async def _blocking(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _work(self, conn: SMTPConnection) -> None:
+        while True:
+            try:
+                mail = await asyncio.wait_for(self._queue.get(), timeout=settings.SMTP_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                await self._keepalive(conn)
+                continue
+            metrics.set_gauge("mail.queue_depth", self._queue.qsize())
+            try:
+                await self._deliver(conn, mail)
+            finally:
+                self._queue.task_done()
+
+    async def _keepalive(self, conn: SMTPConnection) -> None:
+        if not conn.is_open:
+            return
+        if time.monotonic() - conn.last_used > settings.SMTP_IDLE_TIMEOUT_SECONDS:
+            await self._blocking(conn.close)
+        elif not await self._blocking(conn.noop):
+            # Server already hung up — reopen lazily on the next send
+            await self._blocking(conn.close)
+
+    async def _deliver(self, conn: SMTPConnection, mail: OutgoingMail) -> None:
+        started = time.monotonic()
+        for attempt in range(1, settings.MAIL_MAX_ATTEMPTS + 1):
+            try:
+                await self._blocking(conn.send, mail)
+            except smtplib.SMTPRecipientsRefused as e:
+                logger.error(f"❌ Email recipients refused: {', '.join(e.recipients)}")
+                break
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code >= 500:
+                    # Permanent rejection — retrying would not help
+                    logger.error(f"❌ Email to {', '.join(mail.to_addrs)} rejected: {e.smtp_code} {e.smtp_error!r}")
+                    break
+                error = e
+            except (smtplib.SMTPException, OSError) as e:
+                error = e
+            else:
+                metrics.inc("mail.sent")
+                metrics.inc("mail.send_ms", (time.monotonic() - started) * 1000)
+                mail.resolve(True)
+                return
+
+            await self._blocking(conn.close)
+            if attempt < settings.MAIL_MAX_ATTEMPTS:
+                metrics.inc("mail.retries")
+                # A dropped idle connection is retried at once, anything else after a pause
+                if not isinstance(error, smtplib.SMTPServerDisconnected):
+                    await asyncio.sleep(min(2 ** attempt, 30))
+            else:
+                logger.error(f"❌ Failed to send email to {', '.join(mail.to_addrs)}: {error}")
+
+        metrics.inc("mail.failed")
+        mail.resolve(False)
+
+
+mailer = Mailer()
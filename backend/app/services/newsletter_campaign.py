@@ -0,0 +1,421 @@
+import asyncio
+import html
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from string import Template
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.mailer import mailer
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGNS = "newsletter_campaigns"
+DELIVERIES = "newsletter_deliveries"
+SUBSCRIBERS = "newsletter"
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_PAUSED = "paused"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+# A running campaign whose worker stopped heartbeating this long ago is resumable
+HEARTBEAT_TIMEOUT = timedelta(minutes=2)
+
+DUPLICATE_KEY = 11000
+
+# Delivery records
+DELIVERY_SENDING = "sending"
+DELIVERY_SENT = "sent"
+DELIVERY_FAILED = "failed"
+DELIVERY_CANCELLED = "cancelled"  # unsubscribed before a retry reached them
+
+# Campaign tasks started by this process, by campaign id
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+class Pacer:
+    """Spaces sends evenly at a fixed rate, without the burst a token bucket allows"""
+
+    def __init__(self, per_second: float):
+        self.interval = 1 / per_second
+        self._next = time.monotonic()
+
+    async def wait(self) -> None:
+        now = time.monotonic()
+        if self._next > now:
+            await asyncio.sleep(self._next - now)
+        self._next = max(self._next, now) + self.interval
+
+
+class CampaignTemplate:
+    """
+    An article rendered into the newsletter layout once per campaign; only
+    the recipient's name and unsubscribe link are filled in per email.
+    """
+
+    def __init__(self, article: dict):
+        self.subject = article["title"]
+
+        def text(value: str) -> str:
+            # Escaped for HTML, and "$" doubled so the article cannot reach the placeholders
+            return html.escape(value).replace("$", "$$")
+
+        paragraphs = "".join(
+            f'<p style="line-height: 1.6;">{text(p.strip())}</p>'
+            for p in article.get("content", "").split("\n\n") if p.strip()
+        )
+        body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px; color: #333;">
+            <p>Hello $name,</p>
+            <h2 style="color: #15803d;">{text(article["title"])}</h2>
+            <p style="color: #888;">{text(article.get("category", ""))}</p>
+            {paragraphs}
+            <hr style="border: none; border-top: 1px solid #eee;">
+            <p style="font-size: 12px; color: #888;">
+                You are receiving this because you subscribed to the DPH newsletter.
+                <a href="$unsubscribe_url">Unsubscribe</a>
+            </p>
+        </body>
+        </html>
+        """
+        self._html = Template(body)
+
+    def render(self, subscriber: dict) -> MIMEMultipart:
+        # "+", "&" and "#" are common in addresses and would break the query string
+        unsubscribe_url = settings.NEWSLETTER_UNSUBSCRIBE_URL.format(email=quote(subscriber["email"], safe=""))
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = self.subject
+        msg["From"] = settings.SMTP_FROM_EMAIL
+        msg["To"] = subscriber["email"]
+        msg["List-Unsubscribe"] = f"<{unsubscribe_url}>"
+        msg.attach(MIMEText(self._html.substitute(
+            name=html.escape(subscriber.get("name") or "there"),
+            unsubscribe_url=html.escape(unsubscribe_url),
+        ), "html"))
+        return msg
+
+
+# ─── SETUP ───────────────────────────────────────────────────────────────────
+
+async def create_campaign(db: AsyncIOMotorDatabase, article_id: str) -> Optional[dict]:
+    """Create a campaign for a published article; None if there is no such article"""
+    article = await db["articles"].find_one({"_id": ObjectId(article_id), "status": "Published"})
+    if article is None:
+        return None
+    campaign = {
+        "article_id": article_id,
+        "subject": article["title"],
+        "status": STATUS_PENDING,
+        "checkpoint": None,
+        "sent": 0,
+        "failed": 0,
+        "skipped": 0,
+        "created_at": datetime.now(timezone.utc),
+    }
+    result = await db[CAMPAIGNS].insert_one(campaign)
+    campaign["_id"] = result.inserted_id
+    return campaign
+
+
+# ─── RUNNING ─────────────────────────────────────────────────────────────────
+
+async def _claim(db: AsyncIOMotorDatabase, campaign_id: str, owner: str) -> Optional[dict]:
+    """Take over a campaign unless another worker is actively running it"""
+    now = datetime.now(timezone.utc)
+    return await db[CAMPAIGNS].find_one_and_update(
+        {
+            "_id": ObjectId(campaign_id),
+            "$or": [
+                {"status": {"$in": [STATUS_PENDING, STATUS_PAUSED, STATUS_FAILED]}},
+                # Only resumed to retry failed deliveries (see run_campaign)
+                {"status": STATUS_COMPLETED, "failed": {"$gt": 0}},
+                {"status": STATUS_RUNNING, "heartbeat_at": {"$lt": now - HEARTBEAT_TIMEOUT}},
+            ],
+        },
+        {"$set": {"status": STATUS_RUNNING, "owner": owner, "heartbeat_at": now, "resumed_at": now}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def run_campaign(db: AsyncIOMotorDatabase, campaign_id: str) -> Optional[dict]:
+    """
+    Send a campaign to every active subscriber, resuming after its checkpoint.
+
+    Subscribers are streamed in _id order. For each batch of
+    NEWSLETTER_BATCH_SIZE a delivery record is inserted per recipient before
+    anything is sent — recipients that already have one were handled by an
+    earlier run and are skipped, so a resumed campaign never emails anyone
+    twice. Sends go through the pooled mailer at NEWSLETTER_SENDS_PER_SECOND,
+    and the checkpoint moves forward after each batch.
+
+    Recipients whose delivery failed are tried again at the end of the run,
+    and on every resume, until NEWSLETTER_DELIVERY_ATTEMPTS. Resuming a
+    completed campaign only does that retry pass.
+
+    Returns the final campaign document, or None if it was not claimable.
+    """
+    owner = uuid.uuid4().hex
+    campaign = await _claim(db, campaign_id, owner)
+    if campaign is None:
+        return None
+    retry_only = campaign.get("finished_at") is not None
+
+    article = await db["articles"].find_one({"_id": ObjectId(campaign["article_id"])})
+    if article is None:
+        await db[CAMPAIGNS].update_one({"_id": campaign["_id"]}, {"$set": {"status": STATUS_FAILED, "error": "Article not found"}})
+        return None
+
+    template = CampaignTemplate(article)
+    pacer = Pacer(settings.NEWSLETTER_SENDS_PER_SECOND)
+    started = time.monotonic()
+    previous_elapsed = campaign.get("elapsed_seconds", 0)
+    if campaign.get("started_at") is None:
+        await db[CAMPAIGNS].update_one({"_id": campaign["_id"]}, {"$set": {"started_at": datetime.now(timezone.utc)}})
+
+    query = {"is_active": True}
+    if campaign.get("checkpoint") is not None:
+        query["_id"] = {"$gt": campaign["checkpoint"]}
+    cursor = db[SUBSCRIBERS].find(query, {"email": 1, "name": 1}).sort("_id", 1).batch_size(settings.NEWSLETTER_BATCH_SIZE)
+
+    status = STATUS_COMPLETED
+    try:
+        if not retry_only:
+            batch: List[dict] = []
+            async for subscriber in cursor:
+                batch.append(subscriber)
+                if len(batch) >= settings.NEWSLETTER_BATCH_SIZE:
+                    await _send_batch(db, campaign, batch, template, pacer, owner, previous_elapsed + time.monotonic() - started)
+                    batch = []
+            if batch:
+                await _send_batch(db, campaign, batch, template, pacer, owner, previous_elapsed + time.monotonic() - started)
+        await _retry_failed(db, campaign, template, pacer, owner)
+    except asyncio.CancelledError:
+        status = STATUS_PAUSED
+        raise
+    except Exception as e:
+        status = STATUS_FAILED
+        logger.error(f"❌ Newsletter campaign {campaign_id} failed: {e}")
+    finally:
+        finished = {"status": status, "elapsed_seconds": previous_elapsed + time.monotonic() - started}
+        if status == STATUS_COMPLETED and not retry_only:
+            finished["finished_at"] = datetime.now(timezone.utc)
+        campaign = await db[CAMPAIGNS].find_one_and_update(
+            {"_id": campaign["_id"], "owner": owner},
+            {"$set": finished},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    if campaign is not None and status == STATUS_COMPLETED:
+        rate = campaign["sent"] / campaign["elapsed_seconds"] if campaign["elapsed_seconds"] else 0
+        logger.info(
+            f"✅ Newsletter campaign {campaign_id} completed: {campaign['sent']} sent, "
+            f"{campaign['failed']} failed, {campaign['skipped']} skipped ({rate:.1f}/s)"
+        )
+    return campaign
+
+
+async def _send_batch(
+    db: AsyncIOMotorDatabase,
+    campaign: dict,
+    batch: List[dict],
+    template: CampaignTemplate,
+    pacer: Pacer,
+    owner: str,
+    elapsed: float,
+) -> None:
+    campaign_id = campaign["_id"]
+    now = datetime.now(timezone.utc)
+
+    # Claim the recipients first; an existing delivery record means an earlier run got there
+    skipped = set()
+    try:
+        await db[DELIVERIES].insert_many(
+            [
+                {
+                    "campaign_id": campaign_id, "subscriber_id": s["_id"], "email": s["email"],
+                    "status": DELIVERY_SENDING, "attempts": 1, "created_at": now, "updated_at": now,
+                }
+                for s in batch
+            ],
+            ordered=False,
+        )
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != DUPLICATE_KEY for err in errors):
+            raise
+        skipped = {err["index"] for err in errors}
+
+    recipients = [s for i, s in enumerate(batch) if i not in skipped]
+
+    async def release(unsent: List[ObjectId]) -> None:
+        # So a resumed run still reaches them
+        await db[DELIVERIES].delete_many({"campaign_id": campaign_id, "subscriber_id": {"$in": unsent}})
+
+    sent_ids, failed_ids = await _deliver(db, campaign_id, recipients, template, pacer, release)
+
+    await db[CAMPAIGNS].update_one(
+        {"_id": campaign_id, "owner": owner},
+        {
+            "$set": {"checkpoint": batch[-1]["_id"], "heartbeat_at": datetime.now(timezone.utc), "elapsed_seconds": elapsed},
+            "$inc": {"sent": len(sent_ids), "failed": len(failed_ids), "skipped": len(skipped)},
+        },
+    )
+    metrics.inc("newsletter.sent", len(sent_ids))
+    metrics.inc("newsletter.failed", len(failed_ids))
+    metrics.inc("newsletter.skipped", len(skipped))
+
+
+async def _deliver(
+    db: AsyncIOMotorDatabase,
+    campaign_id: ObjectId,
+    recipients: List[dict],
+    template: CampaignTemplate,
+    pacer: Pacer,
+    release: Callable[[List[ObjectId]], Awaitable[None]],
+) -> Tuple[List[ObjectId], List[ObjectId]]:
+    """
+    Send to recipients whose delivery records are claimed, and record the
+    outcome of each; returns (sent, failed) subscriber ids. If cancelled,
+    `release` is given the recipients not handed to the mailer yet.
+    """
+    futures = []
+    try:
+        for subscriber in recipients:
+            await pacer.wait()
+            # Waits for room rather than dropping the email when the mail queue is full
+            futures.append(await mailer.enqueue(template.render(subscriber)))
+    except asyncio.CancelledError:
+        unsent = [s["_id"] for s in recipients[len(futures):]]
+        if unsent:
+            await release(unsent)
+        raise
+
+    results = await asyncio.gather(*futures)
+    sent_ids = [s["_id"] for s, ok in zip(recipients, results) if ok]
+    failed_ids = [s["_id"] for s, ok in zip(recipients, results) if not ok]
+    for ids, status in ((sent_ids, DELIVERY_SENT), (failed_ids, DELIVERY_FAILED)):
+        if ids:
+            await db[DELIVERIES].update_many(
+                {"campaign_id": campaign_id, "subscriber_id": {"$in": ids}},
+                {"$set": {"status": status, "updated_at": datetime.now(timezone.utc)}},
+            )
+    return sent_ids, failed_ids
+
+
+def _retryable(campaign_id: ObjectId) -> dict:
+    return {
+        "campaign_id": campaign_id,
+        "status": DELIVERY_FAILED,
+        "attempts": {"$not": {"$gte": settings.NEWSLETTER_DELIVERY_ATTEMPTS}},
+    }
+
+
+async def has_retryable_failures(db: AsyncIOMotorDatabase, campaign_id: ObjectId) -> bool:
+    return await db[DELIVERIES].find_one(_retryable(campaign_id), {"_id": 1}) is not None
+
+
+async def _retry_failed(
+    db: AsyncIOMotorDatabase,
+    campaign: dict,
+    template: CampaignTemplate,
+    pacer: Pacer,
+    owner: str,
+) -> None:
+    """Try each failed delivery once more, unless it is out of attempts or the subscriber left"""
+    campaign_id = campaign["_id"]
+    # Deliveries that fail again in this pass are not picked up twice
+    round_started = datetime.now(timezone.utc)
+    while True:
+        deliveries = await db[DELIVERIES].find(
+            {**_retryable(campaign_id), "updated_at": {"$lt": round_started}},
+            {"subscriber_id": 1},
+        ).limit(settings.NEWSLETTER_BATCH_SIZE).to_list(length=None)
+        if not deliveries:
+            return
+        ids = [d["subscriber_id"] for d in deliveries]
+        recipients = await db[SUBSCRIBERS].find({"_id": {"$in": ids}, "is_active": True}, {"email": 1, "name": 1}) \
+            .to_list(length=None)
+        active = {s["_id"] for s in recipients}
+        gone = [i for i in ids if i not in active]
+        now = datetime.now(timezone.utc)
+        if gone:
+            await db[DELIVERIES].update_many(
+                {"campaign_id": campaign_id, "subscriber_id": {"$in": gone}},
+                {"$set": {"status": DELIVERY_CANCELLED, "updated_at": now}},
+            )
+        if recipients:
+            await db[DELIVERIES].update_many(
+                {"campaign_id": campaign_id, "subscriber_id": {"$in": list(active)}},
+                {"$set": {"status": DELIVERY_SENDING, "updated_at": now}, "$inc": {"attempts": 1}},
+            )
+
+        async def release(unsent: List[ObjectId]) -> None:
+            # Back to failed, without using up an attempt
+            await db[DELIVERIES].update_many(
+                {"campaign_id": campaign_id, "subscriber_id": {"$in": unsent}},
+                {"$set": {"status": DELIVERY_FAILED}, "$inc": {"attempts": -1}},
+            )
+
+        sent_ids, _ = await _deliver(db, campaign_id, recipients, template, pacer, release)
+        await db[CAMPAIGNS].update_one(
+            {"_id": campaign_id, "owner": owner},
+            {
+                "$set": {"heartbeat_at": datetime.now(timezone.utc)},
+                "$inc": {"sent": len(sent_ids), "failed": -len(sent_ids) - len(gone), "retried": len(recipients)},
+            },
+        )
+        metrics.inc("newsletter.sent", len(sent_ids))
+        metrics.inc("newsletter.retried", len(recipients))
+
+
+# ─── BACKGROUND TASKS ────────────────────────────────────────────────────────
+
+def start_campaign(db: AsyncIOMotorDatabase, campaign_id: str) -> bool:
+    """Run a campaign in the background of this process; False if it already runs here"""
+    task = _tasks.get(campaign_id)
+    if task is not None and not task.done():
+        return False
+    task = asyncio.create_task(run_campaign(db, campaign_id))
+    _tasks[campaign_id] = task
+    task.add_done_callback(lambda _: _tasks.pop(campaign_id, None))
+    return True
+
+
+async def resume_interrupted(db: AsyncIOMotorDatabase) -> int:
+    """Restart campaigns that were paused by a shutdown or whose worker died"""
+    stale = datetime.now(timezone.utc) - HEARTBEAT_TIMEOUT
+    cursor = db[CAMPAIGNS].find(
+        {"$or": [
+            {"status": STATUS_PAUSED},
+            {"status": STATUS_RUNNING, "heartbeat_at": {"$lt": stale}},
+        ]},
+        {"_id": 1},
+    )
+    resumed = 0
+    async for campaign in cursor:
+        resumed += start_campaign(db, str(campaign["_id"]))
+    if resumed:
+        logger.info(f"✅ Resumed {resumed} newsletter campaigns")
+    return resumed
+
+
+async def stop_all() -> None:
+    """Pause the campaigns running here; the next startup resumes them"""
+    tasks = list(_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
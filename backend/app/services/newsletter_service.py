@@ -0,0 +1,122 @@
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.services.counters import dashboard_counters
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of a subscribe
+SUBSCRIBED = "subscribed"
+ALREADY_SUBSCRIBED = "already_subscribed"
+RESUBSCRIBED = "resubscribed"
+FAILED = "failed"
+
+
+class SubscriptionsUnavailable(RuntimeError):
+    """The unique email index that subscribing relies on is missing"""
+
+
+MESSAGES = {
+    SUBSCRIBED: "Successfully subscribed!",
+    ALREADY_SUBSCRIBED: "Email already subscribed",
+    RESUBSCRIBED: "Successfully re-subscribed!",
+    FAILED: "Could not subscribe, please try again",
+}
+
+# Set once the unique email index has been seen; until then every subscribe checks for it
+_unique_email_index = False
+
+
+async def _require_unique_email_index(collection: AsyncIOMotorCollection) -> None:
+    """
+    Without the unique index a repeat signup would insert a second, active
+    subscriber instead of colliding, and be reported as a new subscription.
+    Refuse to subscribe rather than silently duplicating.
+    """
+    global _unique_email_index
+    if _unique_email_index:
+        return
+    indexes = await collection.index_information()
+    if any(index.get("unique") and index["key"] == [("email", 1)] for index in indexes.values()):
+        _unique_email_index = True
+        return
+    logger.error(
+        "❌ Unique index on newsletter.email is missing — subscribing is disabled. "
+        "Run `python -m app.cli.dedupe_subscribers` to merge duplicate subscribers and build it."
+    )
+    raise SubscriptionsUnavailable("Unique index on newsletter.email is missing")
+
+
+def _subscribe_update(email: str, name: Optional[str], now: datetime) -> Tuple[dict, dict]:
+    """
+    Filter and update that subscribe `email` in one atomic write.
+
+    The filter only matches an inactive subscriber, who is re-subscribed.
+    Otherwise the upsert inserts a new subscriber — unless the email is
+    already subscribed, in which case the insert collides with the unique
+    email index (E11000). Each outcome is told apart by the write result
+    alone, without reading the subscriber first.
+    """
+    return (
+        {"email": email, "is_active": {"$ne": True}},
+        {
+            "$set": {"is_active": True, "unsubscribed_at": None},
+            "$setOnInsert": {"name": name, "subscribed_at": now},
+        },
+    )
+
+
+async def subscribe(collection: AsyncIOMotorCollection, email: str, name: Optional[str] = None) -> str:
+    """Subscribe one email; returns the outcome"""
+    await _require_unique_email_index(collection)
+    try:
+        result = await collection.update_one(*_subscribe_update(email, name, datetime.now(timezone.utc)), upsert=True)
+    except DuplicateKeyError:
+        return ALREADY_SUBSCRIBED
+    if result.upserted_id is not None:
+        await dashboard_counters.bump("subscribers")
+        return SUBSCRIBED
+    return RESUBSCRIBED
+
+
+async def subscribe_many(collection: AsyncIOMotorCollection, signups: List[Tuple[str, Optional[str]]]) -> List[str]:
+    """
+    Subscribe (email, name) pairs — distinct emails — with one unordered
+    bulk_write; returns each one's outcome, in order.
+    """
+    if not signups:
+        return []
+    await _require_unique_email_index(collection)
+    now = datetime.now(timezone.utc)
+    ops = [UpdateOne(*_subscribe_update(email, name, now), upsert=True) for email, name in signups]
+    outcomes = [RESUBSCRIBED] * len(signups)
+    try:
+        result = await collection.bulk_write(ops, ordered=False)
+        upserted = result.upserted_ids
+    except BulkWriteError as e:
+        upserted = {u["index"]: u["_id"] for u in e.details.get("upserted", [])}
+        for err in e.details.get("writeErrors", []):
+            if err.get("code") == 11000:
+                outcomes[err["index"]] = ALREADY_SUBSCRIBED
+            else:
+                outcomes[err["index"]] = FAILED
+                logger.error(f"❌ Failed to subscribe {signups[err['index']][0]}: {err.get('errmsg')}")
+    for index in upserted:
+        outcomes[index] = SUBSCRIBED
+    if upserted:
+        await dashboard_counters.bump("subscribers", len(upserted))
+    return outcomes
+
+
+async def unsubscribe(collection: AsyncIOMotorCollection, email: str) -> bool:
+    """False if the email was never subscribed"""
+    result = await collection.update_one(
+        {"email": email},
+        {"$set": {"is_active": False, "unsubscribed_at": datetime.now(timezone.utc)}},
+    )
+    return result.matched_count > 0
@@ -0,0 +1,226 @@
+import asyncio
+import html
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.mailer import mailer
+
+logger = logging.getLogger(__name__)
+
+# notification field of a submission waiting for the next digest
+PENDING = "pending"
+SENT = "sent"
+
+# A digest claimed by a worker that never finished it is released after this
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# kind → (collection, heading, [(label, field)])
+KINDS = {
+    "contact": (
+        "contact_messages",
+        "Contact Form Submissions",
+        [("Name", "surname"), ("Last Name", "lastName"), ("Email", "email"),
+         ("Phone", "phoneNumber"), ("Message", "message")],
+    ),
+    "consultation": (
+        "consultation_requests",
+        "Consultation Requests",
+        [("First Name", "firstName"), ("Last Name", "lastName"), ("Email", "email"),
+         ("Phone", "phoneNumber"), ("Message", "message")],
+    ),
+}
+
+
+def is_urgent(submission) -> bool:
+    """Flagged by the sender, or mentions one of NOTIFY_URGENT_KEYWORDS"""
+    if getattr(submission, "urgent", False):
+        return True
+    text = submission.message.lower()
+    return any(keyword.lower() in text for keyword in settings.NOTIFY_URGENT_KEYWORDS)
+
+
+def render_digest(items: Dict[str, List[dict]]) -> MIMEMultipart:
+    total = sum(len(docs) for docs in items.values())
+    counts = ", ".join(f"{len(docs)} {kind}" for kind, docs in items.items() if docs)
+
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = f"{total} New Submissions ({counts})"
+    msg["From"] = settings.SMTP_FROM_EMAIL
+    msg["To"] = settings.SMTP_NOTIFY_EMAIL
+
+    sections = []
+    for kind, docs in items.items():
+        if not docs:
+            continue
+        _, heading, fields = KINDS[kind]
+        header = "".join(
+            f'<th style="padding: 8px; border-bottom: 2px solid #ddd; text-align: left;">{label}</th>'
+            for label, _ in fields
+        ) + '<th style="padding: 8px; border-bottom: 2px solid #ddd; text-align: left;">Received</th>'
+        rows = "".join(
+            "<tr>" + "".join(
+                f'<td style="padding: 8px; border-bottom: 1px solid #eee;">{html.escape(str(doc.get(field, "")))}</td>'
+                for _, field in fields
+            ) + f'<td style="padding: 8px; border-bottom: 1px solid #eee;">{doc["created_at"]:%Y-%m-%d %H:%M} UTC</td></tr>'
+            for doc in docs
+        )
+        sections.append(f"""
+            <h2 style="color: #15803d;">{heading} ({len(docs)})</h2>
+            <table style="width: 100%; border-collapse: collapse;">
+                <tr>{header}</tr>
+                {rows}
+            </table>
+        """)
+
+    msg.attach(MIMEText(f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px; color: #333;">
+            {"".join(sections)}
+        </body>
+        </html>
+    """, "html"))
+    return msg
+
+
+class NotificationDigest:
+    """
+    Batches admin notifications for contact and consultation submissions.
+
+    With NOTIFY_DIGEST_ENABLED, submissions are saved with notification
+    "pending" instead of being emailed one by one. Every
+    NOTIFY_DIGEST_WINDOW_SECONDS — or as soon as NOTIFY_DIGEST_MAX_ITEMS are
+    waiting — the pending ones are rendered into a single email. Urgent
+    submissions (see is_urgent) are still emailed immediately.
+
+    A worker claims a batch by stamping it with a digest_id before sending,
+    so several API workers never send the same submission twice; a batch
+    whose send fails is released and retried with the next digest.
+    """
+
+    def __init__(self):
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._waiting = 0
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.NOTIFY_DIGEST_ENABLED
+
+    def defers(self, submission) -> bool:
+        """True if this submission goes into the digest rather than its own email"""
+        return self.enabled and not is_urgent(submission)
+
+    def note(self) -> None:
+        """Record a deferred submission; sends early once the batch is full"""
+        self._waiting += 1
+        metrics.inc("notify.deferred")
+        if self._waiting >= settings.NOTIFY_DIGEST_MAX_ITEMS:
+            self._full.set()
+
+    # ─── LIFECYCLE ───────────────────────────────────────────────────────────
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._db = db
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker; pending submissions go out with the next digest after restart"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=settings.NOTIFY_DIGEST_WINDOW_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            self._waiting = 0
+            try:
+                sent = await self.send_digest()
+                # Keep going only while whole batches are waiting; the rest waits for the window
+                while sent and await self.pending_count() >= settings.NOTIFY_DIGEST_MAX_ITEMS:
+                    sent = await self.send_digest()
+            except Exception as e:
+                logger.error(f"❌ Notification digest failed: {e}")
+
+    # ─── SENDING ─────────────────────────────────────────────────────────────
+
+    async def send_digest(self) -> int:
+        """Email up to NOTIFY_DIGEST_MAX_ITEMS pending submissions; returns how many were sent"""
+        digest_id = uuid.uuid4().hex
+        claimed = await self._claim(digest_id)
+        total = sum(len(docs) for docs in claimed.values())
+        if not total:
+            return 0
+
+        if await mailer.send(render_digest(claimed)):
+            await self._finish(claimed, {"$set": {"notification": SENT, "notified_at": datetime.now(timezone.utc)}})
+            metrics.inc("notify.digests")
+            metrics.inc("notify.digested", total)
+            logger.info(f"✅ Notification digest sent with {total} submissions")
+        else:
+            await self._finish(claimed, {"$unset": {"digest_id": "", "digest_claimed_at": ""}})
+            logger.warning(f"⚠️ Notification digest not delivered, {total} submissions will be retried")
+            return 0
+        return total
+
+    async def pending_count(self) -> int:
+        return sum([
+            await self._db[collection].count_documents({"notification": PENDING})
+            for collection, _, _ in KINDS.values()
+        ])
+
+    async def _claim(self, digest_id: str) -> Dict[str, List[dict]]:
+        now = datetime.now(timezone.utc)
+        claimable = {
+            "notification": PENDING,
+            "$or": [
+                {"digest_id": {"$exists": False}},
+                {"digest_claimed_at": {"$lt": now - CLAIM_TIMEOUT}},
+            ],
+        }
+        claimed = {}
+        room = settings.NOTIFY_DIGEST_MAX_ITEMS
+        for kind, (collection, _, _) in KINDS.items():
+            claimed[kind] = []
+            if room <= 0:
+                continue
+            candidates = await self._db[collection].find(claimable, {"_id": 1}) \
+                .sort("created_at", 1).limit(room).to_list(length=room)
+            if not candidates:
+                continue
+            # Only what no other worker claimed in the meantime
+            await self._db[collection].update_many(
+                {**claimable, "_id": {"$in": [doc["_id"] for doc in candidates]}},
+                {"$set": {"digest_id": digest_id, "digest_claimed_at": now}},
+            )
+            claimed[kind] = await self._db[collection].find({"digest_id": digest_id}) \
+                .sort("created_at", 1).to_list(length=room)
+            room -= len(claimed[kind])
+        return claimed
+
+    async def _finish(self, claimed: Dict[str, List[dict]], update: dict) -> None:
+        for kind, docs in claimed.items():
+            if docs:
+                collection = KINDS[kind][0]
+                await self._db[collection].update_many({"_id": {"$in": [doc["_id"] for doc in docs]}}, update)
+
+
+notification_digest = NotificationDigest()
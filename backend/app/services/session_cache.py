@@ -0,0 +1,199 @@
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services import chat_store
+from app.services.context_service import load_recent_messages
+
+# Rough fixed cost of a message dict and of a session entry, in bytes
+MESSAGE_OVERHEAD_BYTES = 120
+SESSION_OVERHEAD_BYTES = 400
+
+metrics.derive("session_cache.hit_ratio", lambda m: m.ratio("session_cache.hits", "session_cache.lookups"))
+
+
+class SessionState:
+    """
+    A chat session's header plus its most recent messages
+    (at most LOLA_CONTEXT_MAX_MESSAGES), as {"role", "content"} dicts.
+
+    `total` counts every message of the session; the first `summary_upto`
+    of them are covered by `summary` (see chat_compactor).
+    """
+
+    def __init__(self, session: dict, messages: List[dict]):
+        self.session = session
+        self.messages = messages[-settings.LOLA_CONTEXT_MAX_MESSAGES:]
+        self.total = session.get("message_count", len(messages))
+        self.summary: Optional[str] = session.get("summary")
+        self.summary_upto: int = session.get("summary_upto", 0)
+        self.size = self._measure()
+
+    @property
+    def session_id(self) -> str:
+        return self.session["session_id"]
+
+    @property
+    def deleted(self) -> bool:
+        return chat_store.is_deleted(self.session)
+
+    def unsummarized(self) -> List[dict]:
+        """The cached messages that the summary does not cover yet"""
+        first_cached = self.total - len(self.messages)
+        return self.messages[max(0, self.summary_upto - first_cached):]
+
+    def append(self, messages: List[dict]) -> None:
+        self.messages.extend(
+            {"role": m["role"], "content": m["content"]} for m in messages
+        )
+        del self.messages[:-settings.LOLA_CONTEXT_MAX_MESSAGES]
+        self.total += len(messages)
+        self.size = self._measure()
+
+    def set_summary(self, summary: str, upto: int) -> None:
+        self.summary = summary
+        self.summary_upto = upto
+        self.size = self._measure()
+
+    def _measure(self) -> int:
+        return SESSION_OVERHEAD_BYTES + len(self.summary or "") + sum(
+            len(m["content"]) + MESSAGE_OVERHEAD_BYTES for m in self.messages
+        )
+
+
+class SessionCache:
+    """
+    Process-wide LRU of recently active chat sessions, bounded by the
+    estimated memory of the cached messages (SESSION_CACHE_MAX_BYTES).
+
+    The WebSocket handler keeps its own sessions for the socket's lifetime
+    and shares the same SessionState objects with this cache, so every
+    message it saves updates both — a reconnect then skips the database.
+    A state evicted while a socket still holds it is reused rather than
+    read again, so a session never has two states in one process.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes or settings.SESSION_CACHE_MAX_BYTES
+        self._entries: "OrderedDict[str, SessionState]" = OrderedDict()
+        # Size each entry was last accounted at — states grow in place
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        # Every state still referenced, cached or not
+        self._live: "weakref.WeakValueDictionary[str, SessionState]" = weakref.WeakValueDictionary()
+        # Sessions whose documents are being deleted → deletes in progress
+        self._deleting: Dict[str, int] = {}
+        # Deletes finished so far, so a load that overlapped one reads again
+        self._deletions = 0
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        metrics.inc("session_cache.lookups")
+        state = self._entries.get(session_id)
+        if state is None:
+            metrics.inc("session_cache.misses")
+            return None
+        self._entries.move_to_end(session_id)
+        metrics.inc("session_cache.hits")
+        return state
+
+    async def load(self, db: AsyncIOMotorDatabase, session_id: str) -> Optional[SessionState]:
+        """
+        Return the cached state, reading it from MongoDB on a miss. While
+        the session is being deleted, an empty state that cannot be
+        written is returned instead.
+        """
+        if session_id in self._deleting:
+            return self._tombstone(session_id)
+        state = self.get(session_id)
+        if state is not None:
+            return state
+        state = self._live.get(session_id)
+        if state is None:
+            while True:
+                deletions = self._deletions
+                session, messages = await load_recent_messages(db, session_id)
+                if session_id in self._deleting:
+                    return self._tombstone(session_id)
+                # The read may have started before a delete that has finished since
+                if self._deletions == deletions:
+                    break
+            if session is None:
+                return None
+            # Another socket may have loaded it meanwhile
+            state = self._live.get(session_id) or SessionState(session, messages)
+        return self.put(state)
+
+    def put(self, state: SessionState) -> SessionState:
+        self._entries.pop(state.session_id, None)
+        self._bytes -= self._sizes.pop(state.session_id, 0)
+        self._entries[state.session_id] = state
+        self._sizes[state.session_id] = state.size
+        self._bytes += state.size
+        self._live[state.session_id] = state
+        self._evict()
+        return state
+
+    def append(self, state: SessionState, messages: List[dict]) -> None:
+        """Record newly saved messages on a session's state"""
+        state.append(messages)
+        # Re-account the size, and bring back a state evicted while in use —
+        # but never one whose session has been deleted
+        if not state.deleted:
+            self.put(state)
+
+    def resize(self, state: SessionState) -> None:
+        """Re-account a state that changed in place, if it is still cached"""
+        if self._entries.get(state.session_id) is state:
+            self._bytes += state.size - self._sizes[state.session_id]
+            self._sizes[state.session_id] = state.size
+            self._evict()
+
+    def invalidate(self, session_id: str) -> None:
+        if self._entries.pop(session_id, None) is not None:
+            self._bytes -= self._sizes.pop(session_id, 0)
+            self._update_gauges()
+
+    @asynccontextmanager
+    async def deleting(self, session_id: str) -> AsyncIterator[None]:
+        """
+        Tombstone a session while its documents are deleted. Its state is
+        marked deleted, so sockets still holding it start a new session
+        instead of writing the old history back, and loads until the
+        delete is done get an empty state that cannot be written.
+        """
+        self._deleting[session_id] = self._deleting.get(session_id, 0) + 1
+        state = self._live.pop(session_id, None)
+        if state is not None:
+            state.session["deleted"] = True
+        self.invalidate(session_id)
+        try:
+            yield
+        finally:
+            self._deletions += 1
+            if self._deleting[session_id] == 1:
+                del self._deleting[session_id]
+            else:
+                self._deleting[session_id] -= 1
+
+    @staticmethod
+    def _tombstone(session_id: str) -> SessionState:
+        return SessionState({"session_id": session_id, "deleted": True}, [])
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            session_id, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(session_id, 0)
+            metrics.inc("session_cache.evictions")
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("session_cache.entries", len(self._entries))
+        metrics.set_gauge("session_cache.bytes", self._bytes)
+
+
+session_cache = SessionCache()
@@ -1,9 +1,12 @@
 from datetime import datetime, timezone
 from bson import ObjectId
 from fastapi import HTTPException
+from pymongo import ReturnDocument
 
 from app.db.mongodb import get_database
 from app.core.security import hash_password
+from app.core.principal_cache import principal_cache
+from app.core.revocation import revocations
 from app.models.user import user_helper
 from app.schemas.user import UserUpdate
 
@@ -11,14 +14,22 @@ from app.schemas.user import UserUpdate
 async def get_profile(user_id: str) -> dict:
     """
     Returns the profile of a logged-in user.
+    Served from the principal cache when get_current_user just loaded it.
     """
+    cached = principal_cache.get_user(user_id)
+    if cached is not None:
+        return cached
+
     db = await get_database()
     user = await db["users"].find_one({"_id": ObjectId(user_id)})
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
-    return user_helper(user)
+    profile = user_helper(user)
+    # Stateless tokens skip the lookup that would otherwise have cached it
+    principal_cache.put_user(user_id, profile)
+    return profile
 
 
 async def update_profile(user_id: str, data: UserUpdate) -> dict:
@@ -34,18 +45,22 @@ async def update_profile(user_id: str, data: UserUpdate) -> dict:
         updates["full_name"] = data.full_name
 
     if data.password:
-        updates["hashed_password"] = hash_password(data.password)
+        updates["hashed_password"] = await hash_password(data.password)
 
     if len(updates) == 1:
         # Only updated_at — nothing was actually sent
         raise HTTPException(status_code=400, detail="No update fields provided.")
 
-    await db["users"].update_one(
+    updated_user = await db["users"].find_one_and_update(
         {"_id": ObjectId(user_id)},
-        {"$set": updates}
+        {"$set": updates},
+        return_document=ReturnDocument.AFTER,
     )
+    principal_cache.invalidate(user_id)
+
+    if not updated_user:
+        raise HTTPException(status_code=404, detail="User not found.")
 
-    updated_user = await db["users"].find_one({"_id": ObjectId(user_id)})
     return user_helper(updated_user)
 
 
@@ -60,5 +75,8 @@ async def delete_account(user_id: str) -> dict:
         {"_id": ObjectId(user_id)},
         {"$set": {"is_active": False, "updated_at": datetime.now(timezone.utc)}}
     )
+    principal_cache.invalidate(user_id)
+    # Stateless tokens still claim an active account — revoke them
+    await revocations.revoke(db, user_id, reason="deactivated")
 
     return {"message": "Account deactivated successfully."}
\ No newline at end of file
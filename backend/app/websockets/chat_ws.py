@@ -1,14 +1,56 @@
+import asyncio
 import json
-from datetime import datetime, timezone
+import logging
+from typing import Dict
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from app.services.ai_service import stream_lola_response
+from app.services.llm_scheduler import AdmissionRejected
+from app.services.answer_cache import answer_cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services import chat_store
+from app.services.chat_writer import write_buffer
+from app.services.chat_compactor import chat_compactor
+from app.services.context_service import build_context
+from app.services.session_cache import session_cache, SessionState
 from app.db.mongodb import get_database
-from app.schemas.chat import WSMessageIn, WSMessageOut
+from app.schemas.chat import WSMessageIn, WSMessageOut, WSQueuedOut
+from app.websockets.coalescer import ChunkCoalescer
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+BUSY_MESSAGE = "Lola is helping a lot of visitors right now. Please try again in a moment."
+
+# Put on the inbox by the frame reader when the client goes away
+DISCONNECTED = object()
+
+
+def is_stop_frame(raw) -> bool:
+    """True for {"type": "stop"}, sent by the client to end the current reply"""
+    if not isinstance(raw, str):
+        return False
+    try:
+        frame = json.loads(raw)
+    except ValueError:
+        return False
+    return isinstance(frame, dict) and frame.get("type") == "stop"
+
+
+async def save_messages(db, state: SessionState, messages: list):
+    if state.deleted:
+        # Deleted while the reply was streaming — do not write it back
+        return
+    if settings.CHAT_WRITE_BEHIND:
+        await write_buffer.enqueue(state.session, messages)
+    else:
+        await chat_store.append_messages(db, state.session, messages)
+    # Keep the cached copy in step with what was written
+    session_cache.append(state, messages)
+
 
 @router.websocket("/ws/chat")
 async def lola_chat(websocket: WebSocket):
@@ -20,20 +62,96 @@ async def lola_chat(websocket: WebSocket):
     Flow:
         1. Frontend connects
         2. Frontend sends JSON: { "session_id": "abc", "message": "Hello Lola" }
-        3. Backend loads chat history from MongoDB for this session
+           Adding "coalesce": true batches deltas into fewer "chunk" frames
+        3. Backend takes the most recent messages for this session from memory
+           (or MongoDB on a cache miss), trimmed to LOLA_CONTEXT_TOKEN_BUDGET tokens;
+           older turns of long sessions are sent as a rolling summary instead
         4. Backend streams GPT-4 response back chunk by chunk
+           While waiting for an upstream slot: { "type": "queued", "position": 3, ... }
         5. Each chunk is sent as: { "type": "chunk", "content": "Hello..." }
         6. When stream ends, sends: { "type": "done", "content": "" }
-        7. Full assistant message is saved to MongoDB
+           Sending { "type": "stop" } (or a new message) ends the reply early
+        7. Full assistant message is saved to MongoDB — a stopped reply is
+           saved as far as the client received it, with "truncated": true
         8. Loop — waits for next message
     """
     await websocket.accept()
     db = await get_database()
+    coalesce = False
+    # Sessions served by this socket, kept for its whole lifetime
+    sessions: Dict[str, SessionState] = {}
+
+    # Client frames are read continuously so a reply can be interrupted
+    inbox: asyncio.Queue = asyncio.Queue()
+
+    async def receive_frames():
+        try:
+            while True:
+                await inbox.put(await websocket.receive_text())
+        except Exception:
+            # WebSocketDisconnect, or a socket that broke mid-read
+            await inbox.put(DISCONNECTED)
+
+    async def send_chunk(text: str):
+        await websocket.send_text(
+            WSMessageOut(type="chunk", content=text).model_dump_json()
+        )
+
+    async def send_queued(position: int, estimated_wait: float):
+        await websocket.send_text(
+            WSQueuedOut(position=position, estimated_wait=estimated_wait).model_dump_json()
+        )
+
+    async def stream_reply(recent: list, history: list, user_message: str, reply: dict):
+        # Only text actually sent is kept, so a stopped reply is saved as the
+        # client saw it — not with what was still waiting in the coalescer
+        async def send(text: str):
+            await send_chunk(text)
+            reply["text"] += text
+
+        coalescer = ChunkCoalescer(send, enabled=coalesce)
+
+        # Repeated questions are replayed from the answer cache
+        cached = answer_cache.get(recent, user_message)
+        reply["cached"] = cached is not None
+        if cached is not None:
+            chunks = answer_cache.replay(cached)
+        else:
+            chunks = stream_lola_response(history, on_queued=send_queued)
+
+        try:
+            async for chunk in chunks:
+                await coalescer.add(chunk)
+        except asyncio.CancelledError:
+            coalescer.discard()
+            raise
+        except AdmissionRejected:
+            reply["rejected"] = True
+            await websocket.send_text(
+                WSMessageOut(type="error", content=BUSY_MESSAGE).model_dump_json()
+            )
+            return
+        finally:
+            # Closes the upstream stream straight away when the reply is stopped
+            await chunks.aclose()
+        await coalescer.flush()
+
+    receiver = asyncio.create_task(receive_frames())
+    streaming = None
+    next_frame = None
 
     try:
         while True:
             # ── 1. Receive message from frontend ────────────────
-            raw = await websocket.receive_text()
+            raw = next_frame if next_frame is not None else await inbox.get()
+            next_frame = None
+
+            if raw is DISCONNECTED:
+                logger.info("WebSocket disconnected: session closed cleanly")
+                break
+
+            if is_stop_frame(raw):
+                continue  # nothing is streaming
 
             try:
                 payload = WSMessageIn(**json.loads(raw))
@@ -43,77 +161,88 @@ async def lola_chat(websocket: WebSocket):
                 )
                 continue
 
+            # A message that sets "coalesce" switches it for the rest of the connection
+            if payload.coalesce is not None:
+                coalesce = payload.coalesce
+
             session_id = payload.session_id
             user_message = payload.message.strip()
 
             if not user_message:
                 continue
 
-            # ── 2. Load or create chat session in MongoDB ────────
-            session = await db["chat_sessions"].find_one({"session_id": session_id})
-
-            if not session:
-                session_doc = {
-                    "session_id": session_id,
-                    "user_id": payload.user_id,
-                    "messages": [],
-                    "created_at": datetime.now(timezone.utc),
-                    "updated_at": datetime.now(timezone.utc),
-                }
-                await db["chat_sessions"].insert_one(session_doc)
-                history = []
-            else:
-                history = [
-                    {"role": msg["role"], "content": msg["content"]}
-                    for msg in session.get("messages", [])
-                ]
-
-            # ── 3. Append user message to history ────────────────
-            history.append({"role": "user", "content": user_message})
-
-            # Save user message to MongoDB immediately
-            await db["chat_sessions"].update_one(
-                {"session_id": session_id},
-                {
-                    "$push": {
-                        "messages": {
-                            "role": "user",
-                            "content": user_message,
-                            "timestamp": datetime.now(timezone.utc),
-                        }
-                    },
-                    "$set": {"updated_at": datetime.now(timezone.utc)},
-                }
-            )
+            # ── 2. Load or create chat session ───────────────────
+            # This socket's own sessions first, then the process-wide cache;
+            # MongoDB is only read on a miss, and only the recent messages.
+            # A session deleted since this socket last used it starts over
+            state = sessions.get(session_id)
+            if state is None or state.deleted:
+                state = await session_cache.load(db, session_id)
+
+            if state is None:
+                if settings.CHAT_WRITE_BEHIND:
+                    # Created by upsert when the write buffer flushes
+                    session = chat_store.new_session_header(session_id, payload.user_id)
+                else:
+                    session = await chat_store.create_session(db, session_id, payload.user_id)
+                state = session_cache.put(SessionState(session, []))
+            sessions[session_id] = state
+
+            # ── 3. Append user message and trim to the token budget ──
+            # Turns already folded into the session summary are sent as that summary
+            recent = list(state.messages)
+            history = build_context(state.unsummarized(), user_message, state.summary)
+
+            # Save user message — buffered, so streaming starts right away
+            await save_messages(db, state, [chat_store.make_message("user", user_message)])
 
             # ── 4. Stream GPT-4 response back to frontend ────────
-            full_response = ""
+            # A stop frame, a new message or a disconnect interrupts the reply
+            reply = {"text": "", "cached": False, "rejected": False}
+            streaming = asyncio.create_task(stream_reply(recent, history, user_message, reply))
+
+            while not streaming.done():
+                getter = asyncio.ensure_future(inbox.get())
+                await asyncio.wait({streaming, getter}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                frame = getter.result()
+                if not is_stop_frame(frame):
+                    next_frame = frame
+                streaming.cancel()
+                await asyncio.wait({streaming})
 
-            async for chunk in stream_lola_response(history):
-                full_response += chunk
+            truncated = streaming.cancelled()
+            if not truncated:
+                streaming.result()  # re-raise upstream errors
+            streaming = None
+
+            if reply["rejected"]:
+                continue
+
+            if truncated:
+                metrics.inc("chat.replies_stopped")
+
+            # ── 5. Signal streaming is complete ──────────────────
+            if next_frame is not DISCONNECTED:
                 await websocket.send_text(
-                    WSMessageOut(type="chunk", content=chunk).model_dump_json()
+                    WSMessageOut(type="done", content="").model_dump_json()
                 )
 
-            # ── 5. Signal streaming is complete ──────────────────
-            await websocket.send_text(
-                WSMessageOut(type="done", content="").model_dump_json()
-            )
+            # ── 6. Save Lola's response to MongoDB ───────────────
+            # A stopped reply is kept as far as it got, flagged as truncated
+            if reply["text"] or not truncated:
+                extra = {"truncated": True} if truncated else {}
+                await save_messages(
+                    db, state, [chat_store.make_message("assistant", reply["text"], **extra)]
+                )
 
-            # ── 6. Save Lola's full response to MongoDB ──────────
-            await db["chat_sessions"].update_one(
-                {"session_id": session_id},
-                {
-                    "$push": {
-                        "messages": {
-                            "role": "assistant",
-                            "content": full_response,
-                            "timestamp": datetime.now(timezone.utc),
-                        }
-                    },
-                    "$set": {"updated_at": datetime.now(timezone.utc)},
-                }
-            )
+            if not truncated and not reply["cached"]:
+                await answer_cache.put(recent, user_message, reply["text"])
+
+            # Summarizes older turns in the background once the session is long
+            chat_compactor.notify(state)
 
     except WebSocketDisconnect:
         print(f"WebSocket disconnected: session closed cleanly")
@@ -124,4 +253,9 @@ async def lola_chat(websocket: WebSocket):
                 WSMessageOut(type="error", content="Something went wrong. Please try again.").model_dump_json()
             )
         except Exception:
-            pass
\ No newline at end of file
+            pass
+
+    finally:
+        receiver.cancel()
+        if streaming is not None:
+            streaming.cancel()
@@ -0,0 +1 @@
+# Benchmarks package — local stand-ins and load drivers, run with `python -m benchmarks.<name>`
@@ -0,0 +1,148 @@
+"""
+Requests-per-second benchmark of the public article list, cached and uncached.
+
+Seeds --articles published articles into the MongoDB in MONGODB_URL
+(category "benchmark", removed again afterwards), then starts the API with
+uvicorn twice and measures GET /api/v1/articles?category=benchmark:
+    python -m benchmarks.article_load --articles 200 --requests 5000 --concurrency 50
+
+"uncached" runs with ARTICLE_SNAPSHOT_ENABLED=false, querying MongoDB and
+rendering the JSON on every request; "snapshot" serves the pre-rendered
+response from memory; "not_modified" repeats the snapshot run with the
+ETag from a previous response in If-None-Match, as a returning browser or
+the CDN revalidating would, and gets empty 304s.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from benchmarks.auth_load import wait_until_up
+from benchmarks.ws_load import summarize
+
+CATEGORY = "benchmark"
+PATH = f"/api/v1/articles?category={CATEGORY}"
+
+
+async def seed(count: int) -> None:
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    now = datetime.now(timezone.utc)
+    await client[settings.MONGODB_DB_NAME]["articles"].insert_many([
+        {
+            "title": f"Benchmark article {i}",
+            "category": CATEGORY,
+            "content": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 40,
+            "status": "Published",
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+        }
+        for i in range(count)
+    ])
+    client.close()
+
+
+async def cleanup() -> None:
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await client[settings.MONGODB_DB_NAME]["articles"].delete_many({"category": CATEGORY})
+    client.close()
+
+
+async def measure(base_url: str, total: int, concurrency: int, revalidate: bool = False) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        first = await client.get(PATH)
+        first.raise_for_status()
+        headers = {"If-None-Match": first.headers["etag"]} if revalidate else {}
+        expected = 304 if revalidate else 200
+
+        latencies: List[float] = []
+        errors = 0
+        remaining = total
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(PATH, headers=headers)
+                    if response.status_code != expected:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "response_bytes": len(first.content) if expected == 200 else 0,
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0,
+        "latency_ms": summarize(latencies),
+    }
+
+
+async def run_server(snapshot: bool, args, runs: Dict[str, bool]) -> dict:
+    """Start the API and measure each run (name → revalidate) against it"""
+    base_url = f"http://127.0.0.1:{args.port}"
+    env_value = "true" if snapshot else "false"
+    server = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning",
+        env={**os.environ, "ARTICLE_SNAPSHOT_ENABLED": env_value},
+    )
+    try:
+        await wait_until_up(base_url)
+        return {name: await measure(base_url, args.requests, args.concurrency, revalidate) for name, revalidate in runs.items()}
+    finally:
+        server.terminate()
+        await server.wait()
+
+
+async def run(args) -> dict:
+    await seed(args.articles)
+    try:
+        report = {"params": vars(args)}
+        print("⏱️  uncached...", file=sys.stderr)
+        report.update(await run_server(False, args, {"uncached": False}))
+        print("⏱️  snapshot...", file=sys.stderr)
+        report.update(await run_server(True, args, {"snapshot": False, "not_modified": True}))
+    finally:
+        await cleanup()
+    uncached = report["uncached"]["requests_per_sec"]
+    report["speedup"] = {
+        name: round(report[name]["requests_per_sec"] / uncached, 2) if uncached else None
+        for name in ("snapshot", "not_modified")
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Requests-per-second benchmark of GET /api/v1/users/me in both token modes.
+
+By default starts the API twice with uvicorn — once with database-backed
+token checks, once with AUTH_STATELESS_TOKENS=true — against the MongoDB
+in MONGODB_URL, and reports throughput and latency for each:
+    python -m benchmarks.auth_load --requests 20000 --concurrency 50
+
+Or measure a server that is already running:
+    python -m benchmarks.auth_load --url http://127.0.0.1:8000
+
+Each run registers a throwaway user and reuses one token, as a logged-in
+browser would.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from typing import List
+
+import httpx
+
+from benchmarks.ws_load import summarize
+
+MODES = {"database": "false", "stateless": "true"}
+
+
+async def register(client: httpx.AsyncClient) -> str:
+    response = await client.post("/api/v1/auth/register", json={
+        "full_name": "Bench User",
+        "email": f"bench-{uuid.uuid4().hex[:12]}@example.com",
+        "password": uuid.uuid4().hex,
+    })
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def measure(base_url: str, total: int, concurrency: int, warmup: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        token = await register(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for _ in range(warmup):
+            (await client.get("/api/v1/users/me", headers=headers)).raise_for_status()
+
+        latencies: List[float] = []
+        errors = 0
+        remaining = total
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/api/v1/users/me", headers=headers)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0,
+        "latency_ms": summarize(latencies),
+    }
+
+
+def start_server(port: int, stateless: str) -> subprocess.Popen:
+    env = dict(os.environ, AUTH_STATELESS_TOKENS=stateless)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_until_up(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=2) as client:
+        while True:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server at {base_url} did not come up")
+            await asyncio.sleep(0.3)
+
+
+async def run_mode(mode: str, args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(args.port, MODES[mode])
+    try:
+        await wait_until_up(base_url)
+        return await measure(base_url, args.requests, args.concurrency, args.warmup)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def run(args) -> dict:
+    if args.url:
+        return {"server": await measure(args.url, args.requests, args.concurrency, args.warmup)}
+
+    report = {}
+    for mode in MODES:
+        print(f"⏱️  {mode} mode...", file=sys.stderr)
+        report[mode] = await run_mode(mode, args)
+    database, stateless = report["database"]["requests_per_sec"], report["stateless"]["requests_per_sec"]
+    report["speedup"] = round(stateless / database, 2) if database else None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="benchmark this running server instead of starting one per mode")
+    parser.add_argument("--port", type=int, default=8010, help="port for the servers started per mode")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Throughput of the pooled mailer against one SMTP connection per email.
+
+Runs benchmarks.smtp_sink on a background thread and sends the same number
+of notification-sized emails both ways:
+    python -m benchmarks.mail_load --emails 500 --pool-size 4 --connect-delay-ms 150
+
+"per_message" reproduces the previous behaviour — a new connection and
+EHLO for every email, made with blocking smtplib calls on the event loop;
+"pooled" goes through app.services.mailer. --connect-delay-ms stands in
+for the TCP + TLS handshake and login a real provider adds to every new
+connection. "loop_blocked_ms" is the longest the event loop went without
+running, as seen by a 10 ms ticker.
+"""
+import argparse
+import asyncio
+import json
+import smtplib
+import threading
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.mailer import Mailer
+from benchmarks.smtp_sink import SMTPSink
+
+
+def build_message(i: int) -> MIMEMultipart:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = f"Benchmark notification {i}"
+    msg["From"] = settings.SMTP_FROM_EMAIL
+    msg["To"] = settings.SMTP_NOTIFY_EMAIL
+    msg.attach(MIMEText("<html><body>" + "<p>Lorem ipsum dolor sit amet.</p>" * 20 + "</body></html>", "html"))
+    return msg
+
+
+def start_sink(sink: SMTPSink) -> int:
+    """Serve the sink from its own thread, so blocking senders cannot stall it"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(sink.start(port=0), loop).result()
+
+
+async def per_message(emails: int) -> None:
+    for i in range(emails):
+        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
+            server.ehlo()
+            server.sendmail(settings.SMTP_FROM_EMAIL, [settings.SMTP_NOTIFY_EMAIL], build_message(i).as_string())
+        await asyncio.sleep(0)
+
+
+async def pooled(emails: int, pool_size: int) -> None:
+    mailer = Mailer(pool_size=pool_size, max_queue=emails)
+    results = await asyncio.gather(*[mailer.submit(build_message(i)) for i in range(emails)])
+    await mailer.stop()
+    if not all(results):
+        raise RuntimeError(f"{results.count(False)} emails failed")
+
+
+async def measure(runner, sink: SMTPSink, emails: int) -> dict:
+    stalls = []
+
+    async def ticker():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            stalls.append(now - last - 0.01)
+            last = now
+
+    before = dict(sink.stats)
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await runner()
+    elapsed = time.perf_counter() - started
+    tick.cancel()
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "emails_per_sec": round(emails / elapsed, 1),
+        "connections": sink.stats["connections"] - before["connections"],
+        "delivered": sink.stats["messages"] - before["messages"],
+        "loop_blocked_ms": round(max(stalls, default=elapsed) * 1000, 1),
+    }
+
+
+async def run(args) -> dict:
+    sink = SMTPSink(delay_ms=args.delay_ms, connect_delay_ms=args.connect_delay_ms)
+    settings.SMTP_HOST = "127.0.0.1"
+    settings.SMTP_PORT = start_sink(sink)
+    settings.SMTP_USE_TLS = False
+    settings.SMTP_PASSWORD = ""
+
+    report = {"params": vars(args)}
+    report["per_message"] = await measure(lambda: per_message(args.emails), sink, args.emails)
+    report["pooled"] = await measure(lambda: pooled(args.emails, args.pool_size), sink, args.emails)
+    report["speedup"] = round(report["pooled"]["emails_per_sec"] / report["per_message"]["emails_per_sec"], 2)
+    report["mailer_metrics"] = {k: v for k, v in metrics.snapshot()["counters"].items() if k.startswith("mail.")}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=settings.SMTP_POOL_SIZE)
+    parser.add_argument("--delay-ms", type=float, default=5, help="sink time to accept each message")
+    parser.add_argument("--connect-delay-ms", type=float, default=100, help="sink time to greet a new connection")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+OpenAI-compatible streaming stand-in for load tests.
+
+Serves POST /v1/chat/completions with stream=true as server-sent events in
+the same shape as the OpenAI API (and plain JSON completions without it), so `ai_service.client` can be pointed at
+it with OPENAI_BASE_URL=http://127.0.0.1:8100/v1.
+
+Usage:
+    python -m benchmarks.mock_llm --port 8100 --ttft-ms 300 --tokens-per-sec 40 \\
+        --error-rate 0.01 --rate-limit-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLY = (
+    "Deutsche Philips Holdings offers Asset Management, Investment Banking, Private Equity, "
+    "Securities Trading and Trustee services. Our team can help you choose the right option "
+    "for your goals — please reach out through the contact page and a specialist will follow up."
+)
+
+
+class MockConfig:
+    ttft_ms: float = 300
+    tokens_per_sec: float = 40
+    max_tokens: int = 60
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    mid_stream_error_rate: float = 0.0
+
+
+config = MockConfig()
+app = FastAPI(title="Mock LLM")
+stats = {"requests": 0, "streams": 0, "completions": 0, "errors": 0, "rate_limited": 0}
+
+
+def _chunk(completion_id: str, model: str, content=None, finish_reason=None) -> str:
+    delta = {"content": content} if content is not None else {}
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def _tokens(max_tokens: int):
+    # Roughly one token per word, like a real model's deltas
+    words = REPLY.split(" ")
+    for i in range(min(max_tokens, len(words))):
+        yield words[i] if i == 0 else " " + words[i]
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+
+    roll = random.random()
+    if roll < config.rate_limit_rate:
+        stats["rate_limited"] += 1
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+            headers={"retry-after": "1"},
+        )
+    if roll < config.rate_limit_rate + config.error_rate:
+        stats["errors"] += 1
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "Mock upstream error", "type": "server_error"}},
+        )
+
+    model = body.get("model", "mock")
+    max_tokens = min(body.get("max_tokens") or config.max_tokens, config.max_tokens)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    fail_mid_stream = random.random() < config.mid_stream_error_rate
+
+    if not body.get("stream"):
+        stats["completions"] += 1
+        tokens = list(_tokens(max_tokens))
+        await asyncio.sleep(config.ttft_ms / 1000 + (len(tokens) / config.tokens_per_sec if config.tokens_per_sec else 0))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+        }
+
+    async def events():
+        stats["streams"] += 1
+        await asyncio.sleep(config.ttft_ms / 1000)
+        interval = 1 / config.tokens_per_sec if config.tokens_per_sec else 0
+        for i, token in enumerate(_tokens(max_tokens)):
+            if i:
+                await asyncio.sleep(interval)
+            if fail_mid_stream and i == max_tokens // 2:
+                stats["errors"] += 1
+                return  # connection drops without [DONE]
+            yield _chunk(completion_id, model, content=token)
+        yield _chunk(completion_id, model, finish_reason="stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def read_stats():
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ttft-ms", type=float, default=config.ttft_ms, help="delay before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=config.tokens_per_sec)
+    parser.add_argument("--max-tokens", type=int, default=config.max_tokens)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with HTTP 429")
+    parser.add_argument("--mid-stream-error-rate", type=float, default=0.0, help="share of streams cut off halfway")
+    args = parser.parse_args()
+
+    config.ttft_ms = args.ttft_ms
+    config.tokens_per_sec = args.tokens_per_sec
+    config.max_tokens = args.max_tokens
+    config.error_rate = args.error_rate
+    config.rate_limit_rate = args.rate_limit_rate
+    config.mid_stream_error_rate = args.mid_stream_error_rate
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
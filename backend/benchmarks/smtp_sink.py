@@ -0,0 +1,139 @@
+"""
+Local SMTP stand-in for tests and benchmarks.
+
+Accepts every message and throws it away, counting what it received. It
+speaks just enough SMTP for smtplib: EHLO/HELO, AUTH PLAIN/LOGIN (any
+credentials), MAIL, RCPT, DATA, RSET, NOOP and QUIT — no STARTTLS, so
+point the API at it with SMTP_USE_TLS=false:
+
+    python -m benchmarks.smtp_sink --port 2525 --delay-ms 20
+    SMTP_HOST=127.0.0.1 SMTP_PORT=2525 SMTP_USE_TLS=false uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import time
+from typing import Optional
+
+
+class SMTPSink:
+    def __init__(self, delay_ms: float = 0, drop_after: int = 0, connect_delay_ms: float = 0):
+        self.delay = delay_ms / 1000
+        # Stands in for the TCP + TLS handshake a real provider costs per connection
+        self.connect_delay = connect_delay_ms / 1000
+        # Close a connection after this many messages (0 = never), like providers do
+        self.drop_after = drop_after
+        self.stats = {"connections": 0, "messages": 0, "recipients": 0, "bytes": 0, "noops": 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 2525) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        sent_here = 0
+
+        async def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        try:
+            if self.connect_delay:
+                await asyncio.sleep(self.connect_delay)
+            await reply("220 smtp-sink ready")
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                command = raw.decode(errors="replace").strip()
+                verb = command.split(" ", 1)[0].upper()
+
+                if verb == "EHLO":
+                    writer.write(b"250-smtp-sink\r\n250-AUTH PLAIN LOGIN\r\n250-8BITMIME\r\n")
+                    await reply("250 SIZE 10485760")
+                elif verb == "HELO":
+                    await reply("250 smtp-sink")
+                elif verb == "AUTH":
+                    parts = command.split()
+                    if parts[1].upper() == "LOGIN" and len(parts) == 2:
+                        await reply("334 VXNlcm5hbWU6")
+                        await reader.readline()
+                        await reply("334 UGFzc3dvcmQ6")
+                        await reader.readline()
+                    elif parts[1].upper() == "LOGIN":
+                        await reply("334 UGFzc3dvcmQ6")
+                        await reader.readline()
+                    await reply("235 Authentication successful")
+                elif verb == "MAIL":
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    self.stats["recipients"] += 1
+                    await reply("250 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    size = 0
+                    while True:
+                        line = await reader.readline()
+                        if not line or line in (b".\r\n", b".\n"):
+                            break
+                        size += len(line)
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                    self.stats["messages"] += 1
+                    self.stats["bytes"] += size
+                    sent_here += 1
+                    await reply("250 OK queued")
+                    if self.drop_after and sent_here >= self.drop_after:
+                        break
+                elif verb == "NOOP":
+                    self.stats["noops"] += 1
+                    await reply("250 OK")
+                elif verb == "RSET":
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args):
+    sink = SMTPSink(delay_ms=args.delay_ms, drop_after=args.drop_after, connect_delay_ms=args.connect_delay_ms)
+    port = await sink.start(args.host, args.port)
+    print(f"📭 SMTP sink listening on {args.host}:{port}")
+    started = time.monotonic()
+    try:
+        while True:
+            await asyncio.sleep(args.report_every)
+            elapsed = time.monotonic() - started
+            print(f"   {sink.stats} ({sink.stats['messages'] / elapsed:.1f} msg/s)")
+    finally:
+        await sink.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--delay-ms", type=float, default=0, help="time taken to accept each message")
+    parser.add_argument("--connect-delay-ms", type=float, default=0, help="time taken to greet a new connection")
+    parser.add_argument("--drop-after", type=int, default=0, help="close connections after N messages")
+    parser.add_argument("--report-every", type=float, default=10, help="seconds between stats lines")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
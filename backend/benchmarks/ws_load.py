@@ -0,0 +1,259 @@
+"""
+WebSocket load driver for the Lola chat endpoint.
+
+Opens many concurrent chat sessions against /ws/ws/chat, sends a few
+messages per session and reports p50/p95/p99 time-to-first-token, total
+reply latency, frames per second and server RSS.
+
+Start the API against the mock LLM first:
+    python -m benchmarks.mock_llm --port 8100 &
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 uvicorn app.main:app --port 8000 &
+
+Then:
+    python -m benchmarks.ws_load --sessions 2000 --messages 3 --server-pid <uvicorn pid>
+    python -m benchmarks.ws_load ... --save-baseline        # record a baseline
+    python -m benchmarks.ws_load ... --compare              # exit 1 on regression
+
+Thousands of sockets need a raised file descriptor limit (ulimit -n 65536).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import websockets
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "ws_chat.json")
+
+QUESTIONS = [
+    "What services does DPH offer?",
+    "Tell me about Asset Management.",
+    "How can I contact DPH?",
+    "What is Private Equity at DPH?",
+    "Do you offer Securities Trading?",
+]
+
+# Lower is better for all of these; a run regresses if any grows past tolerance
+COMPARED_METRICS = [
+    "ttft_ms.p50", "ttft_ms.p95", "ttft_ms.p99",
+    "total_ms.p50", "total_ms.p95", "total_ms.p99",
+    "server_rss_mb.peak", "error_rate",
+]
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[rank], 2)
+
+
+def summarize(values: List[float]) -> dict:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": round(max(values), 2) if values else None,
+    }
+
+
+class Results:
+    def __init__(self):
+        self.ttft_ms: List[float] = []
+        self.total_ms: List[float] = []
+        self.frames = 0
+        self.queued_frames = 0
+        self.replies = 0
+        self.errors = 0
+        self.connect_errors = 0
+        self.rss_samples: List[int] = []
+
+
+async def run_session(args, results: Results, start_delay: float, semaphore: asyncio.Semaphore):
+    await asyncio.sleep(start_delay)
+    session_id = f"bench-{uuid.uuid4().hex}"
+
+    async with semaphore:
+        try:
+            async with websockets.connect(args.url, max_size=None, open_timeout=30) as ws:
+                for i in range(args.messages):
+                    if random.random() < args.repeat_ratio:
+                        question = random.choice(QUESTIONS)
+                    else:
+                        question = f"{random.choice(QUESTIONS)} ({uuid.uuid4().hex[:8]})"
+                    payload = {"session_id": session_id, "message": question}
+                    if args.coalesce:
+                        payload["coalesce"] = True
+
+                    sent_at = time.perf_counter()
+                    first_at = None
+                    await ws.send(json.dumps(payload))
+
+                    while True:
+                        raw = await asyncio.wait_for(ws.recv(), timeout=args.reply_timeout)
+                        frame = json.loads(raw)
+                        results.frames += 1
+                        kind = frame.get("type")
+                        if kind == "queued":
+                            results.queued_frames += 1
+                            continue
+                        if first_at is None and kind in ("chunk", "done"):
+                            first_at = time.perf_counter()
+                        if kind == "done":
+                            results.replies += 1
+                            results.ttft_ms.append((first_at - sent_at) * 1000)
+                            results.total_ms.append((time.perf_counter() - sent_at) * 1000)
+                            break
+                        if kind == "error":
+                            results.errors += 1
+                            break
+
+                    if args.think_ms and i < args.messages - 1:
+                        await asyncio.sleep(args.think_ms / 1000)
+        except (OSError, asyncio.TimeoutError, websockets.WebSocketException):
+            results.connect_errors += 1
+
+
+async def sample_rss(pid: int, results: Results, stop: asyncio.Event):
+    import psutil
+
+    process = psutil.Process(pid)
+    while not stop.is_set():
+        try:
+            results.rss_samples.append(process.memory_info().rss)
+        except psutil.Error:
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(args) -> dict:
+    results = Results()
+    semaphore = asyncio.Semaphore(args.concurrency or args.sessions)
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(args.server_pid, results, stop)) if args.server_pid else None
+
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        run_session(args, results, args.ramp_seconds * i / args.sessions, semaphore)
+        for i in range(args.sessions)
+    ])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    if sampler:
+        await sampler
+
+    attempted = args.sessions * args.messages
+    rss_mb = [s / 1024 / 1024 for s in results.rss_samples]
+    return {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "host": platform.node(),
+        "params": {
+            "sessions": args.sessions,
+            "messages": args.messages,
+            "concurrency": args.concurrency or args.sessions,
+            "ramp_seconds": args.ramp_seconds,
+            "think_ms": args.think_ms,
+            "coalesce": args.coalesce,
+            "repeat_ratio": args.repeat_ratio,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "replies": results.replies,
+        "errors": results.errors,
+        "connect_errors": results.connect_errors,
+        "error_rate": round(1 - results.replies / attempted, 4) if attempted else 0,
+        "ttft_ms": summarize(results.ttft_ms),
+        "total_ms": summarize(results.total_ms),
+        "frames": results.frames,
+        "queued_frames": results.queued_frames,
+        "frames_per_sec": round(results.frames / elapsed, 1) if elapsed else 0,
+        "replies_per_sec": round(results.replies / elapsed, 1) if elapsed else 0,
+        "server_rss_mb": {
+            "start": round(rss_mb[0], 1) if rss_mb else None,
+            "peak": round(max(rss_mb), 1) if rss_mb else None,
+            "end": round(rss_mb[-1], 1) if rss_mb else None,
+        },
+    }
+
+
+def _lookup(report: dict, dotted: str):
+    value = report
+    for part in dotted.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name in COMPARED_METRICS:
+        current, previous = _lookup(report, name), _lookup(baseline, name)
+        if current is None or previous is None:
+            continue
+        # Small absolute slack so near-zero baselines (e.g. error_rate 0) stay usable
+        limit = previous * (1 + tolerance) + (0.01 if name == "error_rate" else 0)
+        if current > limit:
+            regressions.append(f"{name}: {current} > {previous} (+{tolerance:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/ws/ws/chat")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=0, help="max sessions open at once (0 = all)")
+    parser.add_argument("--messages", type=int, default=3, help="messages sent per session")
+    parser.add_argument("--ramp-seconds", type=float, default=10)
+    parser.add_argument("--think-ms", type=float, default=500, help="pause between messages of a session")
+    parser.add_argument("--reply-timeout", type=float, default=120)
+    parser.add_argument("--repeat-ratio", type=float, default=0.0, help="share of questions repeated verbatim")
+    parser.add_argument("--coalesce", action="store_true", help="opt in to coalesced chunk frames")
+    parser.add_argument("--server-pid", type=int, help="sample RSS of this process during the run")
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    parser.add_argument("--baseline-path", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--compare", action="store_true", help="compare against the stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline_path), exist_ok=True)
+        with open(args.baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Baseline saved to {args.baseline_path}")
+
+    if args.compare:
+        with open(args.baseline_path) as f:
+            baseline = json.load(f)
+        if baseline.get("params") != report["params"]:
+            print("⚠️ Baseline was recorded with different parameters")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()